@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
+from datetime import timedelta
+from typing import Optional, Dict, Any, List
 
-from app.models.user import User, SkillLevel
+from app.core.database import pool_status
+from app.core.monitoring import refresh_queue_depths, request_summary, uptime_seconds
+from app.core.security import password_hasher
+from app.models.user import User
 from app.api.endpoints.auth import get_current_user
+from app.core.config import settings
+from app.services.file_service import FileService, get_file_service
+from app.services.result_cache import result_cache
+from app.services.request_profiler import list_profiles, profile_object_name, set_sample_rate
 
 router = APIRouter()
 
@@ -11,6 +20,9 @@ class APIConfigUpdate(BaseModel):
     openai_api_key: Optional[str] = None
     hugging_face_api_key: Optional[str] = None
 
+class ProfilingConfig(BaseModel):
+    sample_rate: float = Field(..., ge=0.0, le=1.0)
+
 class SystemConfig(BaseModel):
     openai_configured: bool
     hugging_face_configured: bool
@@ -19,9 +31,7 @@ class SystemConfig(BaseModel):
 
 def require_admin_user(current_user: User = Depends(get_current_user)) -> User:
     """Require admin user access"""
-    if current_user.skill_level != SkillLevel.EXPERT:
-        # For now, only expert level users can access admin
-        # In future, implement proper admin role
+    if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
@@ -64,30 +74,83 @@ async def update_api_config(
 
 @router.get("/status")
 async def get_admin_status(
-    current_user: User = Depends(require_admin_user)
+    current_user: User = Depends(require_admin_user),
+    file_service: FileService = Depends(get_file_service)
 ):
     """Get admin dashboard status"""
-    # TODO: Add real system metrics
+    storage_health = await file_service.health_check()
+    try:
+        queue_depths = await refresh_queue_depths()
+        queues = {
+            "status": "healthy",
+            "pending_jobs": sum(queue_depths.values()),
+            "depth": queue_depths
+        }
+    except Exception:
+        queues = {"status": "unavailable", "pending_jobs": None, "depth": {}}
+    
     return {
         "system": {
             "status": "healthy",
-            "uptime": "running",
+            "uptime": str(timedelta(seconds=int(uptime_seconds()))),
+            "uptime_seconds": round(uptime_seconds(), 1),
             "version": "1.0.0"
         },
+        "requests": request_summary(),
         "database": {
             "status": "connected",
-            "pool_size": 10
+            **pool_status()
         },
         "storage": {
-            "status": "connected",
-            "available_space": "unlimited"
-        },
-        "queues": {
-            "status": "healthy",
-            "pending_jobs": 0
+            **storage_health,
+            "available_space": "unlimited",
+            **file_service.storage.metrics.snapshot()
         },
+        "password_hashing": password_hasher.metrics.snapshot(),
+        "analysis_cache": result_cache.stats(),
+        "queues": queues,
         "external_apis": {
             "openai": "not_configured",
             "hugging_face": "not_configured"
         }
-    }
\ No newline at end of file
+    }
+
+@router.get("/profiles")
+async def get_request_profiles(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(require_admin_user)
+) -> List[Dict[str, Any]]:
+    """List recent request profiles, newest first"""
+    return await list_profiles(limit)
+
+@router.get("/profiles/{profile_id}")
+async def get_request_profile(
+    profile_id: str = Path(..., pattern="^[0-9a-f]{32}$"),
+    current_user: User = Depends(require_admin_user),
+    file_service: FileService = Depends(get_file_service)
+):
+    """Get a stored request profile as an interactive HTML call tree"""
+    try:
+        content = await file_service.storage.run(
+            "get_profile",
+            file_service.read_range,
+            profile_object_name(profile_id),
+            0,
+            0,
+            bucket=settings.CACHE_BUCKET
+        )
+    except HTTPException:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return Response(content, media_type="text/html")
+
+@router.put("/profiles/config")
+async def update_profiling_config(
+    config: ProfilingConfig,
+    current_user: User = Depends(require_admin_user)
+):
+    """Change the fraction of requests profiled; every API process picks it up within seconds"""
+    await set_sample_rate(config.sample_rate)
+    return {"sample_rate": config.sample_rate}
@@ -0,0 +1,306 @@
+import time
+from typing import List, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, update
+
+from app.core.celery_app import ANALYSIS_QUEUES
+from app.core.config import settings
+
+from app.core.database import get_db
+from app.models.user import User
+from app.models.dataset import Dataset, DatasetStatus
+from app.models.analysis import AnalysisHistory, AnalysisStatus
+from app.schemas.analysis import (
+    Analysis as AnalysisSchema, AnalysisCreate, AnalysisJob, AnalysisJobCreate, AnalysisSummary
+)
+from app.api.endpoints.auth import get_current_user
+from app.services.analysis import AnalysisEngine, plan_intent
+from app.services.analysis_jobs import CANCELLED_MESSAGE, read_progress, request_cancel, stale_job_updates
+from app.services.file_service import FileService, get_file_service
+from app.services.result_cache import result_cache
+from app.tasks.analysis import run_analysis_job
+from app.utils.responses import orm_response
+
+router = APIRouter()
+
+async def _get_ready_dataset(dataset_id: UUID, current_user: User, db: AsyncSession) -> Dataset:
+    result = await db.execute(
+        select(Dataset).where(
+            Dataset.id == dataset_id,
+            Dataset.user_id == current_user.id
+        )
+    )
+    dataset = result.scalar_one_or_none()
+    
+    if not dataset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dataset not found"
+        )
+    if dataset.status != DatasetStatus.READY:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Dataset is not ready for analysis"
+        )
+    return dataset
+
+async def _get_job(analysis_id: UUID, current_user: User, db: AsyncSession) -> AnalysisHistory:
+    """Load a job, failing it if its worker died past the time limit or it expired in the queue"""
+    result = await db.execute(
+        select(AnalysisHistory).where(
+            AnalysisHistory.id == analysis_id,
+            AnalysisHistory.user_id == current_user.id
+        )
+    )
+    analysis = result.scalar_one_or_none()
+    
+    if not analysis:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Analysis not found"
+        )
+    
+    if analysis.status in (AnalysisStatus.PENDING, AnalysisStatus.RUNNING):
+        failed = 0
+        for statement in stale_job_updates(AnalysisHistory.id == analysis.id):
+            failed += (await db.execute(statement)).rowcount
+        if failed:
+            await db.commit()
+            await db.refresh(analysis)
+    return analysis
+
+async def _job_response(analysis: AnalysisHistory) -> AnalysisJob:
+    return AnalysisJob(
+        id=analysis.id,
+        dataset_id=analysis.dataset_id,
+        status=analysis.status,
+        priority=analysis.execution_plan.get("priority", "interactive"),
+        progress=await read_progress(analysis.id),
+        execution_time=analysis.execution_time,
+        error_message=analysis.error_message,
+        created_at=analysis.created_at
+    )
+
+@router.post("/", response_model=AnalysisSchema, status_code=status.HTTP_201_CREATED)
+async def run_analysis(
+    analysis_data: AnalysisCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    file_service: FileService = Depends(get_file_service)
+):
+    """Run an analysis plan on a dataset and record it in the history"""
+    dataset = await _get_ready_dataset(analysis_data.dataset_id, current_user, db)
+    
+    plan = analysis_data.plan.model_dump(exclude_none=True)
+    analysis = AnalysisHistory(
+        user_id=current_user.id,
+        dataset_id=dataset.id,
+        query_text=analysis_data.query_text,
+        query_intent=plan_intent(plan),
+        execution_plan={"plan": plan},
+        status=AnalysisStatus.RUNNING
+    )
+    db.add(analysis)
+    await db.commit()
+    
+    start = time.perf_counter()
+    try:
+        outcome = await run_in_threadpool(result_cache.get, dataset, plan)
+        cache_status = "hit"
+        if outcome is None:
+            engine = AnalysisEngine(file_service)
+            outcome = await run_in_threadpool(engine.execute, dataset, plan)
+            await run_in_threadpool(result_cache.set, dataset, plan, outcome)
+            cache_status = "miss"
+    except ValueError as e:
+        analysis.status = AnalysisStatus.ERROR
+        analysis.error_message = str(e)
+        analysis.execution_time = int((time.perf_counter() - start) * 1000)
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid analysis plan: {str(e)}"
+        )
+    except Exception as e:
+        analysis.status = AnalysisStatus.ERROR
+        analysis.error_message = str(e)
+        analysis.execution_time = int((time.perf_counter() - start) * 1000)
+        await db.commit()
+        raise
+    
+    analysis.execution_time = int((time.perf_counter() - start) * 1000)
+    analysis.execution_plan = {**outcome["execution_plan"], "cache": cache_status}
+    analysis.results = outcome["results"]
+    analysis.status = AnalysisStatus.COMPLETED
+    await db.commit()
+    await db.refresh(analysis)
+    
+    return orm_response(analysis, AnalysisSchema, status_code=status.HTTP_201_CREATED)
+
+@router.post("/jobs", response_model=AnalysisJob, status_code=status.HTTP_202_ACCEPTED)
+async def submit_analysis_job(
+    job_data: AnalysisJobCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue an analysis plan to run on a worker"""
+    dataset = await _get_ready_dataset(job_data.dataset_id, current_user, db)
+    
+    # Lock the user row so concurrent submits cannot both pass the limit
+    await db.execute(select(User.id).where(User.id == current_user.id).with_for_update())
+    # Jobs whose worker died or that expired in the queue no longer hold a slot
+    for statement in stale_job_updates(AnalysisHistory.user_id == current_user.id):
+        await db.execute(statement)
+    active = await db.scalar(
+        select(func.count()).select_from(AnalysisHistory).where(
+            AnalysisHistory.user_id == current_user.id,
+            AnalysisHistory.status.in_([AnalysisStatus.PENDING, AnalysisStatus.RUNNING])
+        )
+    )
+    if active >= settings.ANALYSIS_JOBS_PER_USER:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"At most {settings.ANALYSIS_JOBS_PER_USER} analysis jobs can be in progress at once"
+        )
+    
+    plan = job_data.plan.model_dump(exclude_none=True)
+    analysis = AnalysisHistory(
+        user_id=current_user.id,
+        dataset_id=dataset.id,
+        query_text=job_data.query_text,
+        query_intent=plan_intent(plan),
+        execution_plan={"plan": plan, "priority": job_data.priority},
+        status=AnalysisStatus.PENDING
+    )
+    db.add(analysis)
+    await db.commit()
+    await db.refresh(analysis)
+    
+    try:
+        # The job id doubles as the Celery task id
+        await run_in_threadpool(
+            run_analysis_job.apply_async,
+            args=[str(analysis.id)],
+            task_id=str(analysis.id),
+            queue=ANALYSIS_QUEUES[job_data.priority],
+            expires=settings.ANALYSIS_JOB_QUEUE_TIMEOUT_SECONDS
+        )
+    except Exception as e:
+        analysis.status = AnalysisStatus.ERROR
+        analysis.error_message = f"Could not queue analysis: {str(e)}"
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Analysis queue is unavailable"
+        )
+    
+    return await _job_response(analysis)
+
+@router.get("/jobs/{analysis_id}", response_model=AnalysisJob)
+async def get_analysis_job(
+    analysis_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Poll a job's status and progress"""
+    analysis = await _get_job(analysis_id, current_user, db)
+    return await _job_response(analysis)
+
+@router.post("/jobs/{analysis_id}/cancel", response_model=AnalysisJob)
+async def cancel_analysis_job(
+    analysis_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Cancel a queued or running job"""
+    analysis = await _get_job(analysis_id, current_user, db)
+    
+    # Queued jobs fail at once and are skipped by the worker. Running ones keep
+    # their slot until the worker stops at its next progress check and fails them
+    cancelled = (await db.execute(
+        update(AnalysisHistory)
+        .where(AnalysisHistory.id == analysis.id, AnalysisHistory.status == AnalysisStatus.PENDING)
+        .values(status=AnalysisStatus.ERROR, error_message=CANCELLED_MESSAGE)
+    )).rowcount or (await db.execute(
+        update(AnalysisHistory)
+        .where(AnalysisHistory.id == analysis.id, AnalysisHistory.status == AnalysisStatus.RUNNING)
+        .values(error_message=CANCELLED_MESSAGE)
+    )).rowcount
+    await db.commit()
+    
+    if not cancelled:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Analysis job has already finished"
+        )
+    await request_cancel(analysis.id)
+    
+    await db.refresh(analysis)
+    return await _job_response(analysis)
+
+@router.get("/jobs/{analysis_id}/result", response_model=AnalysisSchema)
+async def get_analysis_job_result(
+    analysis_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the results of a completed job"""
+    analysis = await _get_job(analysis_id, current_user, db)
+    
+    if analysis.status == AnalysisStatus.ERROR:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Analysis job failed: {analysis.error_message}"
+        )
+    if analysis.status != AnalysisStatus.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Analysis job has not finished"
+        )
+    
+    return orm_response(analysis, AnalysisSchema)
+
+@router.get("/", response_model=List[AnalysisSummary])
+async def list_analyses(
+    dataset_id: Optional[UUID] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List the user's recent analyses without their results"""
+    query = select(
+        AnalysisHistory.id, AnalysisHistory.user_id, AnalysisHistory.dataset_id,
+        AnalysisHistory.query_text, AnalysisHistory.query_intent, AnalysisHistory.execution_time,
+        AnalysisHistory.status, AnalysisHistory.error_message, AnalysisHistory.created_at
+    ).where(AnalysisHistory.user_id == current_user.id)
+    if dataset_id:
+        query = query.where(AnalysisHistory.dataset_id == dataset_id)
+    
+    result = await db.execute(query.order_by(AnalysisHistory.created_at.desc()).limit(limit))
+    return orm_response(result.all(), AnalysisSummary)
+
+@router.get("/{analysis_id}", response_model=AnalysisSchema)
+async def get_analysis(
+    analysis_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get an analysis with its plan and results"""
+    result = await db.execute(
+        select(AnalysisHistory).where(
+            AnalysisHistory.id == analysis_id,
+            AnalysisHistory.user_id == current_user.id
+        )
+    )
+    analysis = result.scalar_one_or_none()
+    
+    if not analysis:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Analysis not found"
+        )
+    
+    return orm_response(analysis, AnalysisSchema)
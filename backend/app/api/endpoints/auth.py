@@ -5,10 +5,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, decode_access_token
+from app.core.security import password_hasher, create_access_token, decode_access_token
 from app.models.user import User
 from app.schemas.user import UserLogin, Token, User as UserSchema
 from app.core.config import settings
+from app.services.user_cache import user_cache
+from app.utils.responses import orm_response
 
 router = APIRouter()
 security = HTTPBearer()
@@ -25,7 +27,10 @@ async def login(
     )
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(user_credentials.password, user.password_hash):
+    verified, new_hash = (False, None)
+    if user:
+        verified, new_hash = await password_hasher.verify(user_credentials.password, user.password_hash)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -37,6 +42,11 @@ async def login(
             detail="Inactive user"
         )
     
+    # Rehash with the current cost factor after BCRYPT_ROUNDS changes
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+    
     # Create access token
     access_token_expires = timedelta(minutes=settings.JWT_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -69,6 +79,11 @@ async def get_current_user(
             detail="Could not validate credentials"
         )
     
+    # Cache hits skip the database entirely
+    user = await user_cache.get(user_id)
+    if user is not None:
+        return user
+    
     result = await db.execute(
         select(User).where(User.id == user_id)
     )
@@ -78,6 +93,7 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
+    await user_cache.set(user)
     return user
 
 @router.get("/me", response_model=UserSchema)
@@ -85,4 +101,4 @@ async def get_current_user_info(
     current_user: User = Depends(get_current_user)
 ):
     """Get current user information"""
-    return current_user
\ No newline at end of file
+    return orm_response(current_user, UserSchema)
\ No newline at end of file
@@ -0,0 +1,97 @@
+import itertools
+import time
+from typing import Any, Dict, Iterator
+from uuid import UUID
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.user import User
+from app.models.dataset import Dataset
+from app.models.dashboard import Dashboard
+from app.schemas.dashboard import DashboardConfig
+from app.api.endpoints.auth import get_current_user
+from app.services.dashboard import DashboardRenderer
+from app.services.file_service import FileService, get_file_service
+
+router = APIRouter()
+
+def _ndjson(messages: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    start = time.perf_counter()
+    for message in messages:
+        yield orjson.dumps(message) + b"\n"
+    yield orjson.dumps({"type": "complete", "execution_time": int((time.perf_counter() - start) * 1000)}) + b"\n"
+
+@router.get("/{dashboard_id}/data")
+async def get_dashboard_data(
+    dashboard_id: UUID,
+    refresh: bool = Query(False, description="Recompute widgets older than DASHBOARD_MIN_REFRESH_SECONDS"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    file_service: FileService = Depends(get_file_service)
+):
+    """Stream a dashboard's widget results as newline-delimited JSON, one line per widget as it finishes"""
+    result = await db.execute(
+        select(Dashboard).where(
+            Dashboard.id == dashboard_id,
+            or_(Dashboard.user_id == current_user.id, Dashboard.is_public.is_(True))
+        )
+    )
+    dashboard = result.scalar_one_or_none()
+    
+    if not dashboard:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dashboard not found"
+        )
+    
+    try:
+        config = DashboardConfig.model_validate(dashboard.config or {})
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid dashboard config: {str(e)}"
+        )
+    
+    # Widgets read the owner's datasets, also when the dashboard is shared
+    dataset_ids = {widget.dataset_id for widget in config.widgets}
+    result = await db.execute(
+        select(Dataset).where(
+            Dataset.id.in_(dataset_ids),
+            Dataset.user_id == dashboard.user_id
+        )
+    )
+    datasets = {str(dataset.id): dataset for dataset in result.scalars().all()}
+    
+    refresh_interval = config.refresh_interval
+    if refresh_interval:
+        refresh_interval = max(refresh_interval, settings.DASHBOARD_MIN_REFRESH_SECONDS)
+    widgets = [
+        {
+            "id": widget.id or str(index),
+            "dataset_id": widget.dataset_id,
+            "plan": widget.plan.model_dump(exclude_none=True)
+        }
+        for index, widget in enumerate(config.widgets)
+    ]
+    
+    header = {
+        "type": "dashboard",
+        "id": str(dashboard.id),
+        "widgets": len(widgets),
+        "refresh_interval": refresh_interval
+    }
+    messages = DashboardRenderer(file_service).render(widgets, datasets, refresh_interval, refresh)
+    headers = {"Cache-Control": f"private, max-age={refresh_interval}" if refresh_interval else "no-cache"}
+    # The renderer is synchronous; Starlette iterates it in the thread pool
+    return StreamingResponse(
+        _ndjson(itertools.chain([header], messages)),
+        media_type="application/x-ndjson",
+        headers=headers
+    )
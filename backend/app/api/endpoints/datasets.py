@@ -1,36 +1,80 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+import asyncio
+import base64
+import json
+import mimetypes
+import re
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from pathlib import PurePath
+from typing import AsyncIterator, List, Optional, Tuple
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Path, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select, tuple_
 
-from app.core.database import get_db
+from app.core.database import get_db, stored_object_lock
 from app.models.user import User
-from app.models.dataset import Dataset
-from app.schemas.dataset import Dataset as DatasetSchema, DatasetCreate, DatasetUpdate
+from app.models.dataset import Dataset, DatasetStatus
+from app.schemas.dataset import (
+    Dataset as DatasetSchema, DatasetCreate, DatasetUpdate, DatasetPreview, DatasetSummary,
+    MultipartUploadCreate, MultipartUploadSession, MultipartUploadComplete, UploadedPart
+)
 from app.api.endpoints.auth import get_current_user
-from app.services.file_service import FileService
+from app.services.file_service import FileService, get_file_service, storage_busy
+from app.services.preview import PreviewService
+from app.services.result_cache import result_cache
+from app.services.storage import StorageBusyError
+from app.tasks.datasets import infer_dataset_schema
 from app.core.config import settings
+from app.core.redis import get_redis
+from app.utils.responses import orm_response
 
 router = APIRouter()
 
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Storage signs each part body, so parts are buffered whole; this bounds how many at once
+_part_slots = asyncio.Semaphore(settings.MULTIPART_MAX_CONCURRENT_PARTS)
+
+# Record one part's size and return the session total with the size it replaced, if retried
+RECORD_PART_SIZE = """
+local previous = redis.call('HGET', KEYS[1], ARGV[1])
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+local total = 0
+for _, size in ipairs(redis.call('HVALS', KEYS[1])) do
+    total = total + tonumber(size)
+end
+return {total, previous}
+"""
+
+# Columns returned by the dataset list; the JSONB blobs are only loaded per dataset
+SUMMARY_COLUMNS = (
+    Dataset.id, Dataset.user_id, Dataset.name, Dataset.description, Dataset.file_size,
+    Dataset.file_type, Dataset.content_hash, Dataset.status, Dataset.created_at, Dataset.updated_at
+)
+
 @router.post("/upload", response_model=DatasetSchema, status_code=status.HTTP_201_CREATED)
 async def upload_dataset(
     file: UploadFile = File(...),
     name: str = Form(...),
     description: str = Form(None),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    file_service: FileService = Depends(get_file_service)
 ):
     """Upload a new dataset"""
-    # Validate file size
-    if file.size > settings.max_file_size_bytes:
+    # Validate file size (size may be unknown; the streaming upload enforces the limit too)
+    if file.size is not None and file.size > settings.max_file_size_bytes:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail=f"File size exceeds maximum limit of {settings.MAX_FILE_SIZE_MB}MB"
         )
     
     # Save file using FileService
-    file_service = FileService()
     file_info = await file_service.save_uploaded_file(file, current_user.id)
     
     # Create dataset record
@@ -41,30 +85,289 @@ async def upload_dataset(
         file_path=file_info["file_path"],
         file_size=file_info["file_size"],
         file_type=file_info["file_type"],
+        content_hash=file_info["content_hash"],
         metadata=file_info.get("metadata", {})
     )
     
+    # Held until the row is committed: a delete of the object's last other reference
+    # either finishes first (and the object is stored again here) or sees this row
+    await db.execute(stored_object_lock(file_info["content_hash"]))
+    deduplicated = await file_service.promote_upload(file_info["staged_path"], file_info["file_path"])
+    
+    # Identical content the user already profiled: reuse its schema (and Parquet cache).
+    # Other users' datasets are not consulted, so an upload reveals nothing about them
+    source = None
+    if deduplicated:
+        result = await db.execute(
+            select(Dataset).where(
+                Dataset.content_hash == file_info["content_hash"],
+                Dataset.user_id == current_user.id,
+                Dataset.status == DatasetStatus.READY
+            ).limit(1)
+        )
+        source = result.scalar_one_or_none()
+    if source is not None:
+        dataset.schema_info = source.schema_info
+        dataset.status = DatasetStatus.READY
+    
+    db.add(dataset)
+    await db.commit()
+    await db.refresh(dataset)
+    
+    if source is None:
+        # Infer schema in the background so the upload returns right away
+        infer_dataset_schema.delay(str(dataset.id))
+    
+    return dataset
+
+def _upload_session_key(upload_id: str) -> str:
+    return f"upload_session:{upload_id}"
+
+def _upload_parts_key(upload_id: str) -> str:
+    return f"upload_parts:{upload_id}"
+
+async def _record_part_size(redis, upload_id: str, part_number: int, size: int) -> Tuple[int, Optional[str]]:
+    """Count a part toward the upload's running byte total; a retried part replaces its earlier size"""
+    ttl = int(timedelta(hours=settings.MULTIPART_SESSION_TTL_HOURS).total_seconds())
+    total, previous = await redis.eval(RECORD_PART_SIZE, 1, _upload_parts_key(upload_id), part_number, size, ttl)
+    return int(total), previous
+
+async def _restore_part_size(redis, upload_id: str, part_number: int, previous: Optional[str]):
+    """Undo _record_part_size for a part that was not stored"""
+    if previous is None:
+        await redis.hdel(_upload_parts_key(upload_id), part_number)
+    else:
+        await redis.hset(_upload_parts_key(upload_id), part_number, previous)
+
+async def _get_upload_session(redis, upload_id: str, user: User) -> dict:
+    """Load a multipart upload session owned by the user"""
+    raw = await redis.get(_upload_session_key(upload_id))
+    session = json.loads(raw) if raw else None
+    if not session or session["user_id"] != str(user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload session not found"
+        )
+    return session
+
+@router.post("/uploads", response_model=MultipartUploadSession, status_code=status.HTTP_201_CREATED)
+async def create_multipart_upload(
+    upload: MultipartUploadCreate,
+    current_user: User = Depends(get_current_user),
+    redis = Depends(get_redis),
+    file_service: FileService = Depends(get_file_service)
+):
+    """Start a resumable multipart upload session"""
+    content_type = (
+        upload.content_type
+        or mimetypes.guess_type(upload.filename)[0]
+        or "application/octet-stream"
+    )
+    location = await file_service.create_multipart_upload(current_user.id, upload.filename, content_type)
+    
+    session = {
+        "user_id": str(current_user.id),
+        "name": upload.name,
+        "description": upload.description,
+        "filename": upload.filename,
+        "content_type": content_type,
+        "file_path": location["file_path"]
+    }
+    await redis.set(
+        _upload_session_key(location["upload_id"]),
+        json.dumps(session),
+        ex=timedelta(hours=settings.MULTIPART_SESSION_TTL_HOURS)
+    )
+    
+    return {
+        "upload_id": location["upload_id"],
+        "part_size": settings.upload_chunk_size_bytes,
+        "max_part_size": settings.MULTIPART_MAX_PART_SIZE_MB * 1024 * 1024,
+        "parts": []
+    }
+
+@router.get("/uploads/{upload_id}", response_model=MultipartUploadSession)
+async def get_multipart_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    redis = Depends(get_redis),
+    file_service: FileService = Depends(get_file_service)
+):
+    """Get upload session state, including stored parts, to resume an upload"""
+    session = await _get_upload_session(redis, upload_id, current_user)
+    parts = await file_service.list_parts(session["file_path"], upload_id)
+    
+    return {
+        "upload_id": upload_id,
+        "part_size": settings.upload_chunk_size_bytes,
+        "max_part_size": settings.MULTIPART_MAX_PART_SIZE_MB * 1024 * 1024,
+        "parts": parts
+    }
+
+@router.put("/uploads/{upload_id}/parts/{part_number}", response_model=UploadedPart)
+async def upload_part(
+    request: Request,
+    upload_id: str,
+    part_number: int = Path(..., ge=1, le=10000),
+    current_user: User = Depends(get_current_user),
+    redis = Depends(get_redis),
+    file_service: FileService = Depends(get_file_service)
+):
+    """Upload one numbered part; parts may be sent in parallel and retried independently"""
+    session = await _get_upload_session(redis, upload_id, current_user)
+    
+    try:
+        await asyncio.wait_for(_part_slots.acquire(), settings.STORAGE_POOL_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise storage_busy(StorageBusyError("Too many part uploads in progress"))
+    try:
+        max_part_size = settings.MULTIPART_MAX_PART_SIZE_MB * 1024 * 1024
+        body = bytearray()
+        async for chunk in request.stream():
+            body.extend(chunk)
+            if len(body) > max_part_size:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Part size exceeds maximum limit of {settings.MULTIPART_MAX_PART_SIZE_MB}MB"
+                )
+        if not body:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Empty part"
+            )
+        
+        total, previous = await _record_part_size(redis, upload_id, part_number, len(body))
+        if total > settings.max_file_size_bytes:
+            await _restore_part_size(redis, upload_id, part_number, previous)
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File size exceeds maximum limit of {settings.MAX_FILE_SIZE_MB}MB"
+            )
+        
+        try:
+            etag = await file_service.upload_part(session["file_path"], upload_id, part_number, bytes(body))
+        except Exception:
+            await _restore_part_size(redis, upload_id, part_number, previous)
+            raise
+    finally:
+        _part_slots.release()
+    
+    return {"part_number": part_number, "etag": etag, "size": len(body)}
+
+@router.post("/uploads/{upload_id}/complete", response_model=DatasetSchema, status_code=status.HTTP_201_CREATED)
+async def complete_multipart_upload(
+    upload_id: str,
+    completion: MultipartUploadComplete,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    redis = Depends(get_redis),
+    file_service: FileService = Depends(get_file_service)
+):
+    """Assemble uploaded parts and create the dataset"""
+    session = await _get_upload_session(redis, upload_id, current_user)
+    
+    if completion.parts is not None:
+        parts = [part.dict() for part in completion.parts]
+    else:
+        parts = await file_service.list_parts(session["file_path"], upload_id)
+    if not parts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No parts uploaded"
+        )
+    
+    file_info = await file_service.complete_multipart_upload(session["file_path"], upload_id, parts)
+    await redis.delete(_upload_session_key(upload_id), _upload_parts_key(upload_id))
+    
+    if file_info["file_size"] > settings.max_file_size_bytes:
+        await file_service.delete_file(file_info["file_path"])
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size exceeds maximum limit of {settings.MAX_FILE_SIZE_MB}MB"
+        )
+    
+    dataset = Dataset(
+        user_id=current_user.id,
+        name=session["name"],
+        description=session["description"],
+        file_path=file_info["file_path"],
+        file_size=file_info["file_size"],
+        file_type=file_info["file_type"],
+        metadata={
+            "original_filename": session["filename"],
+            "content_type": session["content_type"],
+            "detected_type": file_info["detected_type"],
+            "upload_id": upload_id,
+            "parts": len(parts)
+        }
+    )
+    
     db.add(dataset)
     await db.commit()
     await db.refresh(dataset)
     
-    # TODO: Trigger async schema inference
-    # await trigger_schema_inference(dataset.id)
+    infer_dataset_schema.delay(str(dataset.id))
     
     return dataset
 
-@router.get("/", response_model=List[DatasetSchema])
+@router.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_multipart_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    redis = Depends(get_redis),
+    file_service: FileService = Depends(get_file_service)
+):
+    """Abort a multipart upload and discard stored parts"""
+    session = await _get_upload_session(redis, upload_id, current_user)
+    await file_service.abort_multipart_upload(session["file_path"], upload_id)
+    await redis.delete(_upload_session_key(upload_id), _upload_parts_key(upload_id))
+
+def _encode_cursor(created_at: datetime, dataset_id) -> str:
+    payload = json.dumps([created_at.isoformat(), str(dataset_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, dataset_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), uuid.UUID(dataset_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+@router.get("/", response_model=List[DatasetSummary])
 async def list_datasets(
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    status_filter: Optional[DatasetStatus] = Query(None, alias="status"),
+    file_type: Optional[str] = Query(None),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List user's datasets"""
+    """List user's datasets, newest first, one page at a time"""
+    query = select(*SUMMARY_COLUMNS).where(Dataset.user_id == current_user.id)
+    if status_filter:
+        query = query.where(Dataset.status == status_filter)
+    if file_type:
+        query = query.where(Dataset.file_type == file_type)
+    if cursor:
+        # Keyset pagination: continue strictly after the last row of the previous page
+        created_at, dataset_id = _decode_cursor(cursor)
+        query = query.where(tuple_(Dataset.created_at, Dataset.id) < (created_at, dataset_id))
+    
     result = await db.execute(
-        select(Dataset).where(Dataset.user_id == current_user.id)
-        .order_by(Dataset.created_at.desc())
+        query.order_by(Dataset.created_at.desc(), Dataset.id.desc()).limit(limit + 1)
     )
-    datasets = result.scalars().all()
-    return datasets
+    datasets = result.all()
+    
+    headers = {}
+    if len(datasets) > limit:
+        datasets = datasets[:limit]
+        last = datasets[-1]
+        headers["X-Next-Cursor"] = _encode_cursor(last.created_at, last.id)
+    return orm_response(datasets, DatasetSummary, headers=headers)
 
 @router.get("/{dataset_id}", response_model=DatasetSchema)
 async def get_dataset(
@@ -87,7 +390,162 @@ async def get_dataset(
             detail="Dataset not found"
         )
     
-    return dataset
+    return orm_response(dataset, DatasetSchema)
+
+@router.get("/{dataset_id}/preview", response_model=DatasetPreview)
+async def preview_dataset(
+    dataset_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    file_service: FileService = Depends(get_file_service)
+):
+    """Get a page of dataset rows"""
+    result = await db.execute(
+        select(Dataset).where(
+            Dataset.id == dataset_id,
+            Dataset.user_id == current_user.id
+        )
+    )
+    dataset = result.scalar_one_or_none()
+    
+    if not dataset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dataset not found"
+        )
+    
+    try:
+        preview_service = PreviewService(file_service)
+        return await run_in_threadpool(preview_service.get_preview, dataset, offset, limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Preview not available: {str(e)}"
+        )
+
+def _parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range Range header into an inclusive (start, end) pair"""
+    match = RANGE_PATTERN.match(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        # Multi-range or malformed requests get the full body
+        return None
+    
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check: * matches any stored file, listed tags compare weakly (W/ ignored)"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(","))
+
+async def _gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        # Compression is CPU-bound; keep it off the event loop
+        compressed = await run_in_threadpool(compressor.compress, chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+@router.get("/{dataset_id}/download")
+async def download_dataset(
+    dataset_id: str,
+    request: Request,
+    compress: bool = Query(False, description="Gzip the response on the fly"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    file_service: FileService = Depends(get_file_service)
+):
+    """Stream the raw dataset file, honoring Range and If-None-Match"""
+    result = await db.execute(
+        select(Dataset).where(
+            Dataset.id == dataset_id,
+            Dataset.user_id == current_user.id
+        )
+    )
+    dataset = result.scalar_one_or_none()
+    
+    if not dataset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dataset not found"
+        )
+    
+    stat = await file_service.stat_file(dataset.file_path)
+    gzipped = compress and "gzip" in request.headers.get("accept-encoding", "")
+    # The gzip body differs from the stored bytes, so it is a separate representation
+    etag = f'"{stat.etag}-gzip"' if gzipped else f'"{stat.etag}"'
+    # Content-addressed objects have no extension; fall back to the detected type
+    suffix = PurePath(dataset.file_path).suffix
+    if not suffix and dataset.file_type and dataset.file_type != "unknown":
+        suffix = f".{dataset.file_type}"
+    filename = f"{dataset.name}{suffix}"
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"
+    }
+    if compress:
+        # Caches must key compressible responses on the encoding the client accepts
+        headers["Vary"] = "Accept-Encoding"
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    content_type = stat.content_type or "application/octet-stream"
+    
+    if gzipped:
+        # Compressed length is unknown up front, so ranges are not offered
+        headers.pop("Accept-Ranges")
+        headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(
+            _gzip_chunks(file_service.iter_file(dataset.file_path)),
+            media_type=content_type,
+            headers=headers
+        )
+    
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range == etag):
+        byte_range = _parse_range(range_header, stat.size)
+    
+    if byte_range is None:
+        headers["Content-Length"] = str(stat.size)
+        return StreamingResponse(
+            file_service.iter_file(dataset.file_path),
+            media_type=content_type,
+            headers=headers
+        )
+    
+    start, end = byte_range
+    headers["Content-Length"] = str(end - start + 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{stat.size}"
+    return StreamingResponse(
+        file_service.iter_file(dataset.file_path, offset=start, length=end - start + 1),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=content_type,
+        headers=headers
+    )
 
 @router.put("/{dataset_id}", response_model=DatasetSchema)
 async def update_dataset(
@@ -117,6 +575,7 @@ async def update_dataset(
     
     await db.commit()
     await db.refresh(dataset)
+    await run_in_threadpool(result_cache.invalidate_dataset, dataset.id)
     
     return dataset
 
@@ -124,7 +583,8 @@ async def update_dataset(
 async def delete_dataset(
     dataset_id: str,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    file_service: FileService = Depends(get_file_service)
 ):
     """Delete a dataset"""
     result = await db.execute(
@@ -141,9 +601,22 @@ async def delete_dataset(
             detail="Dataset not found"
         )
     
-    # TODO: Delete associated files from storage
-    # file_service = FileService()
-    # await file_service.delete_file(dataset.file_path)
-    
+    file_path, content_hash = dataset.file_path, dataset.content_hash
     await db.delete(dataset)
+    await db.commit()
+    await run_in_threadpool(result_cache.invalidate_dataset, dataset_id)
+    
+    # Stored content is shared by every dataset with the same hash; free it with the last one.
+    # Only once the row is gone, so a failed delete never leaves a row without its file.
+    # The lock keeps an upload of the same content from reusing the object while it is removed
+    await db.execute(stored_object_lock(content_hash or file_path))
+    path_refs = await db.scalar(
+        select(func.count()).select_from(Dataset).where(Dataset.file_path == file_path)
+    )
+    hash_refs = 0
+    if content_hash:
+        hash_refs = await db.scalar(
+            select(func.count()).select_from(Dataset).where(Dataset.content_hash == content_hash)
+        )
+    await file_service.release_file(file_path, content_hash, path_refs, hash_refs)
     await db.commit()
\ No newline at end of file
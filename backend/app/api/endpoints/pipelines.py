@@ -0,0 +1,248 @@
+from typing import List
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.core.database import get_db
+from app.models.user import User
+from app.models.dataset import Dataset, DatasetStatus
+from app.models.pipeline import PipelineRun, PipelineRunStatus, TransformationPipeline
+from app.schemas.pipeline import (
+    Pipeline as PipelineSchema,
+    PipelineCreate,
+    PipelineRun as PipelineRunSchema,
+    PipelineRunCreate,
+    PipelineUpdate
+)
+from app.api.endpoints.auth import get_current_user
+from app.services.materialization import arrow_schema
+from app.services.pipeline import compile_pipeline, target_steps
+from app.tasks.pipelines import run_pipeline
+from app.utils.responses import orm_response
+
+router = APIRouter()
+
+async def _get_pipeline(pipeline_id: UUID, current_user: User, db: AsyncSession) -> TransformationPipeline:
+    result = await db.execute(
+        select(TransformationPipeline).where(
+            TransformationPipeline.id == pipeline_id,
+            TransformationPipeline.user_id == current_user.id
+        )
+    )
+    pipeline = result.scalar_one_or_none()
+    
+    if not pipeline:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pipeline not found"
+        )
+    return pipeline
+
+async def _validate_pipeline(
+    steps: List[dict],
+    source_datasets: List[UUID],
+    target_schema: dict,
+    current_user: User,
+    db: AsyncSession
+) -> List[Dataset]:
+    """Check the sources belong to the user and the steps compile against their schemas"""
+    if not source_datasets:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pipelines need at least one source dataset"
+        )
+    result = await db.execute(
+        select(Dataset).where(
+            Dataset.id.in_(source_datasets),
+            Dataset.user_id == current_user.id
+        )
+    )
+    found = {dataset.id: dataset for dataset in result.scalars().all()}
+    if len(found) != len(set(source_datasets)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Source dataset not found"
+        )
+    # The first source is the one steps run over; join and union steps read the others
+    sources = [found[dataset_id] for dataset_id in dict.fromkeys(source_datasets)]
+    
+    # Sources still being profiled are checked when the pipeline runs
+    if all((source.schema_info or {}).get("columns") for source in sources):
+        datasets = {str(source.id): source.schema_info for source in sources[1:]}
+        try:
+            compile_pipeline(
+                list(steps) + target_steps(target_schema), arrow_schema(sources[0].schema_info), datasets
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid pipeline: {str(e)}"
+            )
+    return sources
+
+@router.post("/", response_model=PipelineSchema, status_code=status.HTTP_201_CREATED)
+async def create_pipeline(
+    pipeline_data: PipelineCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create a transformation pipeline"""
+    await _validate_pipeline(
+        pipeline_data.steps, pipeline_data.source_datasets, pipeline_data.target_schema, current_user, db
+    )
+    
+    pipeline = TransformationPipeline(user_id=current_user.id, **pipeline_data.model_dump())
+    db.add(pipeline)
+    await db.commit()
+    await db.refresh(pipeline)
+    
+    return orm_response(pipeline, PipelineSchema, status_code=status.HTTP_201_CREATED)
+
+@router.get("/", response_model=List[PipelineSchema])
+async def list_pipelines(
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List the user's pipelines, newest first"""
+    result = await db.execute(
+        select(TransformationPipeline)
+        .where(TransformationPipeline.user_id == current_user.id)
+        .order_by(TransformationPipeline.created_at.desc())
+        .limit(limit)
+    )
+    return orm_response(result.scalars().all(), PipelineSchema)
+
+@router.get("/{pipeline_id}", response_model=PipelineSchema)
+async def get_pipeline(
+    pipeline_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a pipeline"""
+    pipeline = await _get_pipeline(pipeline_id, current_user, db)
+    return orm_response(pipeline, PipelineSchema)
+
+@router.put("/{pipeline_id}", response_model=PipelineSchema)
+async def update_pipeline(
+    pipeline_id: UUID,
+    pipeline_update: PipelineUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Update a pipeline's steps, sources or settings"""
+    pipeline = await _get_pipeline(pipeline_id, current_user, db)
+    changes = pipeline_update.model_dump(exclude_unset=True)
+    
+    if {"steps", "source_datasets", "target_schema"} & set(changes):
+        await _validate_pipeline(
+            changes.get("steps", pipeline.steps or []),
+            changes.get("source_datasets", pipeline.source_datasets or []),
+            changes.get("target_schema", pipeline.target_schema or {}),
+            current_user,
+            db
+        )
+    
+    for field, value in changes.items():
+        setattr(pipeline, field, value)
+    
+    await db.commit()
+    await db.refresh(pipeline)
+    
+    return orm_response(pipeline, PipelineSchema)
+
+@router.delete("/{pipeline_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_pipeline(
+    pipeline_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a pipeline and its run history; output datasets are kept"""
+    pipeline = await _get_pipeline(pipeline_id, current_user, db)
+    await db.delete(pipeline)
+    await db.commit()
+
+@router.post("/{pipeline_id}/runs", response_model=PipelineRunSchema, status_code=status.HTTP_202_ACCEPTED)
+async def start_pipeline_run(
+    pipeline_id: UUID,
+    run_data: PipelineRunCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue a run that writes the pipeline's output as a new dataset"""
+    pipeline = await _get_pipeline(pipeline_id, current_user, db)
+    sources = await _validate_pipeline(
+        pipeline.steps or [], pipeline.source_datasets or [], pipeline.target_schema or {}, current_user, db
+    )
+    if any(source.status != DatasetStatus.READY for source in sources):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Source datasets are not ready"
+        )
+    
+    run = PipelineRun(
+        pipeline_id=pipeline.id,
+        user_id=current_user.id,
+        status=PipelineRunStatus.PENDING,
+        stats={"output_name": run_data.output_name} if run_data.output_name else {}
+    )
+    db.add(run)
+    await db.commit()
+    await db.refresh(run)
+    
+    try:
+        await run_in_threadpool(run_pipeline.apply_async, args=[str(run.id)], task_id=str(run.id))
+    except Exception as e:
+        run.status = PipelineRunStatus.ERROR
+        run.error_message = f"Could not queue pipeline run: {str(e)}"
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Pipeline queue is unavailable"
+        )
+    
+    return orm_response(run, PipelineRunSchema, status_code=status.HTTP_202_ACCEPTED)
+
+@router.get("/{pipeline_id}/runs", response_model=List[PipelineRunSchema])
+async def list_pipeline_runs(
+    pipeline_id: UUID,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List a pipeline's runs, newest first"""
+    pipeline = await _get_pipeline(pipeline_id, current_user, db)
+    result = await db.execute(
+        select(PipelineRun)
+        .where(PipelineRun.pipeline_id == pipeline.id)
+        .order_by(PipelineRun.created_at.desc())
+        .limit(limit)
+    )
+    return orm_response(result.scalars().all(), PipelineRunSchema)
+
+@router.get("/{pipeline_id}/runs/{run_id}", response_model=PipelineRunSchema)
+async def get_pipeline_run(
+    pipeline_id: UUID,
+    run_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a run's status, stats and output dataset"""
+    result = await db.execute(
+        select(PipelineRun).where(
+            PipelineRun.id == run_id,
+            PipelineRun.pipeline_id == pipeline_id,
+            PipelineRun.user_id == current_user.id
+        )
+    )
+    run = result.scalar_one_or_none()
+    
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pipeline run not found"
+        )
+    
+    return orm_response(run, PipelineRunSchema)
@@ -3,10 +3,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.database import get_db
-from app.core.security import get_password_hash
+from app.core.security import password_hasher
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, User as UserSchema
 from app.api.endpoints.auth import get_current_user
+from app.services.user_cache import user_cache
+from app.utils.responses import orm_response
 
 router = APIRouter()
 
@@ -29,7 +31,7 @@ async def create_user(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     user = User(
         email=user_data.email,
         password_hash=hashed_password,
@@ -48,7 +50,7 @@ async def get_user_profile(
     current_user: User = Depends(get_current_user)
 ):
     """Get user profile"""
-    return current_user
+    return orm_response(current_user, UserSchema)
 
 @router.put("/profile", response_model=UserSchema)
 async def update_user_profile(
@@ -57,11 +59,20 @@ async def update_user_profile(
     db: AsyncSession = Depends(get_db)
 ):
     """Update user profile"""
+    # current_user may come from the auth cache, so load the persistent row to update it
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
     # Update user fields
     for field, value in user_update.dict(exclude_unset=True).items():
-        setattr(current_user, field, value)
+        setattr(user, field, value)
     
     await db.commit()
-    await db.refresh(current_user)
+    await db.refresh(user)
+    await user_cache.invalidate(user.id)
     
-    return current_user
\ No newline at end of file
+    return user
\ No newline at end of file
@@ -1,9 +1,12 @@
 from fastapi import APIRouter
-from app.api.endpoints import auth, users, datasets, admin
+from app.api.endpoints import auth, users, datasets, analysis, pipelines, dashboards, admin
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["Users"])
 api_router.include_router(datasets.router, prefix="/datasets", tags=["Datasets"])
+api_router.include_router(analysis.router, prefix="/analysis", tags=["Analysis"])
+api_router.include_router(pipelines.router, prefix="/pipelines", tags=["Pipelines"])
+api_router.include_router(dashboards.router, prefix="/dashboards", tags=["Dashboards"])
 api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
\ No newline at end of file
@@ -0,0 +1,28 @@
+from celery import Celery
+from app.core.config import settings
+
+# Priority lanes for analysis jobs and the queue each is routed to. Interactive
+# jobs get a dedicated worker so a backlog of batch jobs never delays them.
+ANALYSIS_QUEUES = {
+    "interactive": "analysis.interactive",
+    "batch": "analysis.batch"
+}
+
+celery_app = Celery(
+    "data_intelligence",
+    broker=settings.REDIS_URL,
+    backend=settings.REDIS_URL,
+    include=["app.tasks.datasets", "app.tasks.analysis", "app.tasks.pipelines"]
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    timezone="UTC",
+    enable_utc=True,
+    # Dataset jobs are long-running: hand out one at a time and only ack when done
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    result_expires=3600
+)
@@ -7,6 +7,13 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = Field(..., description="Database connection URL")
     TEST_DATABASE_URL: Optional[str] = Field(None, description="Test database URL")
+    DB_POOL_SIZE: int = Field(10, description="Connections kept open per API process")
+    DB_MAX_OVERFLOW: int = Field(20, description="Extra connections opened under load beyond the pool size")
+    DB_POOL_TIMEOUT_SECONDS: float = Field(30.0, description="Wait for a free connection before failing the request")
+    DB_POOL_RECYCLE_SECONDS: int = Field(1800, description="Replace connections older than this; -1 disables recycling")
+    DB_POOL_PRE_PING: bool = Field(True, description="Check connections on checkout so dropped ones are replaced transparently")
+    DB_STATEMENT_CACHE_SIZE: int = Field(100, description="asyncpg prepared statement cache per connection; set 0 behind pgbouncer transaction pooling")
+    DB_ECHO: bool = Field(False, description="Log every SQL statement")
     
     # Redis
     REDIS_URL: str = Field(..., description="Redis connection URL")
@@ -22,6 +29,17 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = Field("HS256", description="JWT algorithm")
     JWT_EXPIRE_MINUTES: int = Field(30, description="JWT expiration time in minutes")
     
+    # Password hashing
+    BCRYPT_ROUNDS: int = Field(12, description="bcrypt cost factor; existing hashes are upgraded on next login")
+    PASSWORD_HASH_WORKERS: int = Field(4, description="Threads hashing passwords concurrently per process")
+    PASSWORD_HASH_MAX_PENDING: int = Field(64, description="Password operations queued or running before logins are rejected with 503")
+    
+    # Authenticated user cache
+    USER_CACHE_SIZE: int = Field(10000, description="Max users kept in the in-process auth cache")
+    USER_CACHE_TTL_SECONDS: float = Field(30.0, description="In-process auth cache TTL; bounds staleness across workers")
+    USER_CACHE_REDIS_ENABLED: bool = Field(False, description="Share the auth cache across workers through Redis")
+    USER_CACHE_REDIS_TTL_SECONDS: int = Field(300, description="Redis auth cache TTL")
+    
     # External APIs
     OPENAI_API_KEY: Optional[str] = Field(None, description="OpenAI API key")
     HUGGING_FACE_API_KEY: Optional[str] = Field(None, description="Hugging Face API key")
@@ -29,14 +47,66 @@ class Settings(BaseSettings):
     # App Settings
     ENVIRONMENT: str = Field("development", description="Environment")
     LOG_LEVEL: str = Field("INFO", description="Log level")
+    PROFILING_SAMPLE_RATE: float = Field(0.0, description="Default fraction of requests profiled; admins can change it at runtime")
+    PROFILING_INTERVAL_MS: float = Field(1.0, description="Sampling interval of the request profiler")
+    PROFILING_MAX_STORED: int = Field(500, description="Most recent request profiles kept in the admin listing")
+    FAST_RESPONSES: bool = Field(True, description="Hot endpoints skip response_model re-validation of ORM results")
     
     # File Upload
     MAX_FILE_SIZE_MB: int = Field(2048, description="Max file size in MB")
     MAX_FILES_PER_UPLOAD: int = Field(10, description="Max files per upload")
+    UPLOAD_CHUNK_SIZE_MB: int = Field(8, description="Chunk size in MB for streaming uploads (min 5 for S3 multipart)")
+    MULTIPART_MAX_PART_SIZE_MB: int = Field(64, description="Max size in MB of a single multipart upload part")
+    MULTIPART_SESSION_TTL_HOURS: int = Field(24, description="Lifetime of an unfinished multipart upload session")
+    MULTIPART_MAX_CONCURRENT_PARTS: int = Field(8, description="Part bodies held in memory at once per process; further parts wait for a slot")
+    
+    # Storage client
+    STORAGE_THREAD_POOL_SIZE: int = Field(16, description="Threads for blocking MinIO calls made from async code")
+    STORAGE_MAX_CONNECTIONS: int = Field(64, description="Pooled HTTP connections to MinIO per process, shared by every caller")
+    STORAGE_MAX_STREAMS: int = Field(32, description="Downloads and file scans holding a MinIO connection open at once per process")
+    STORAGE_POOL_TIMEOUT_SECONDS: float = Field(10.0, description="Wait for a free MinIO connection or stream slot before failing")
+    STORAGE_MAX_CONCURRENT_OPS: int = Field(64, description="Max storage operations queued or running at once per process")
+    STORAGE_CONNECT_TIMEOUT_SECONDS: float = Field(5.0, description="MinIO connect timeout")
+    STORAGE_READ_TIMEOUT_SECONDS: float = Field(300.0, description="MinIO read timeout")
+    
+    # Background processing
+    SCHEMA_INFERENCE_CHUNK_ROWS: int = Field(50000, description="Rows per chunk when streaming datasets for schema inference")
+    PROFILE_SAMPLE_SIZE: int = Field(20, description="Reservoir sample size kept per column")
+    PROFILE_HLL_PRECISION: int = Field(12, description="HyperLogLog precision (2^p registers) for distinct counts")
+    PROFILE_QUANTILE_K: int = Field(200, description="KLL sketch size for quantile estimates")
+    PROFILE_TOP_K: int = Field(10, description="Most frequent values reported per column")
+    ROW_INDEX_INTERVAL: int = Field(1000, description="Rows between entries of the CSV byte-offset index used for previews")
+    PARQUET_ROW_GROUP_ROWS: int = Field(100000, description="Rows per Parquet row group in the materialization cache")
+    
+    # Parallel execution
+    PARALLEL_WORKERS: int = Field(0, description="Worker processes for partitioned execution; 0 uses every CPU, 1 runs in-process")
+    PARALLEL_MEMORY_MB: int = Field(2048, description="Estimated memory of partitions in flight across the workers of one process")
+    PARALLEL_PARTITION_MB: int = Field(64, description="Target stored size of one partition: consecutive Parquet row groups or a CSV byte range")
+    
+    # Analysis
+    ANALYSIS_CHUNK_ROWS: int = Field(1000000, description="Rows aggregated per chunk before partial results are merged")
+    ANALYSIS_MAX_RESULT_ROWS: int = Field(10000, description="Max rows returned and stored for one analysis")
+    ANALYSIS_CACHE_LOCAL_MB: int = Field(256, description="In-process analysis result cache size")
+    ANALYSIS_CACHE_REDIS_MAX_KB: int = Field(512, description="Larger cached results are spilled to the cache bucket")
+    ANALYSIS_CACHE_TTL_SECONDS: int = Field(86400, description="Lifetime of analysis results cached in Redis")
+    ANALYSIS_JOB_TIMEOUT_SECONDS: int = Field(900, description="Run time after which a queued analysis job is failed")
+    ANALYSIS_JOB_QUEUE_TIMEOUT_SECONDS: int = Field(3600, description="Queue wait after which a pending analysis job expires without running")
+    ANALYSIS_JOBS_PER_USER: int = Field(3, description="Max pending or running analysis jobs per user")
+    
+    # Dashboards
+    DASHBOARD_MIN_REFRESH_SECONDS: int = Field(10, description="Widget results younger than this are reused even when a refresh is requested")
+    
+    # Pipelines
+    PIPELINE_CHUNK_ROWS: int = Field(100000, description="Rows parsed per chunk when a pipeline reads a raw file")
+    PIPELINE_RUN_TIMEOUT_SECONDS: int = Field(3600, description="Run time after which a pipeline run is failed")
+    PIPELINE_STEP_CACHE: bool = Field(True, description="Cache pipeline step outputs so re-runs only recompute changed steps")
+    PIPELINE_CACHE_TTL_DAYS: int = Field(7, description="Days before cached pipeline step outputs expire")
+    PIPELINE_JOIN_MEMORY_MB: int = Field(512, description="Memory a join may use for its build side before spilling partitions to disk")
     
     # Security
     ALLOWED_HOSTS: List[str] = Field(["*"], description="Allowed hosts")
     ALLOWED_ORIGINS: List[str] = Field(["*"], description="Allowed CORS origins")
+    ADMIN_USER_IDS: List[str] = Field([], description="IDs of the users with admin access, such as the request profiler")
     
     # Buckets
     DATASETS_BUCKET: str = Field("datasets", description="MinIO bucket for datasets")
@@ -54,6 +124,11 @@ class Settings(BaseSettings):
     @property
     def max_file_size_bytes(self) -> int:
         return self.MAX_FILE_SIZE_MB * 1024 * 1024
+    
+    @property
+    def upload_chunk_size_bytes(self) -> int:
+        # S3 requires every multipart part except the last to be >= 5MB
+        return max(self.UPLOAD_CHUNK_SIZE_MB, 5) * 1024 * 1024
 
     class Config:
         env_file = ".env"
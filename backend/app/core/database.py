@@ -1,18 +1,46 @@
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import MetaData
+from typing import Any, Dict
+from sqlalchemy import MetaData, Select, create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.monitoring import DB_POOL_CONNECTIONS, DB_QUERY_LATENCY, record_time
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL.replace('postgresql://', 'postgresql+asyncpg://'),
-    echo=settings.is_development,
+    echo=settings.DB_ECHO,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={
+        # asyncpg's own cache and SQLAlchemy's cache of prepared statements on each connection
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+    },
     future=True
 )
 
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _observe_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    DB_QUERY_LATENCY.observe(elapsed)
+    record_time("db", elapsed)
+
+DB_POOL_CONNECTIONS.labels(state="checked_out").set_function(lambda: engine.pool.checkedout())
+DB_POOL_CONNECTIONS.labels(state="checked_in").set_function(lambda: engine.pool.checkedin())
+DB_POOL_CONNECTIONS.labels(state="overflow").set_function(lambda: max(engine.pool.overflow(), 0))
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -20,6 +48,34 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False
 )
 
+# Sync engine for background workers (Celery tasks run outside the event loop)
+sync_engine = create_engine(
+    settings.DATABASE_URL,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    future=True
+)
+
+SyncSessionLocal = sessionmaker(
+    sync_engine,
+    expire_on_commit=False
+)
+
+def pool_status() -> Dict[str, Any]:
+    """Live connection counts for the API engine's pool"""
+    pool = engine.pool
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0)
+    }
+
+def stored_object_lock(key: str) -> Select:
+    """Transaction-scoped advisory lock on a stored object, taken by uploads that reuse it and deletes that free it"""
+    return select(func.pg_advisory_xact_lock(func.hashtextextended(key, 0)))
+
 # Create base class for models
 Base = declarative_base()
 
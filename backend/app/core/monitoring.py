@@ -0,0 +1,190 @@
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.core.celery_app import ANALYSIS_QUEUES, celery_app
+from app.core.redis import redis_client
+from app.utils.metrics import OperationMetrics
+
+START_TIME = time.time()
+
+# Request bodies at least this large count towards upload throughput
+THROUGHPUT_MIN_BYTES = 1024 * 1024
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests served", ["method", "route", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being served", ["method"]
+)
+UPLOAD_BYTES = Counter(
+    "http_upload_bytes_total", "Request body bytes received", ["route"]
+)
+UPLOAD_THROUGHPUT = Histogram(
+    "http_upload_throughput_bytes_per_second", "Receive rate of large request bodies", ["route"],
+    buckets=(1e5, 1e6, 5e6, 1e7, 2.5e7, 5e7, 1e8, 2.5e8, 5e8, 1e9)
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time", buckets=LATENCY_BUCKETS
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "API database pool connections by state", ["state"]
+)
+OPERATION_LATENCY = Histogram(
+    "pool_operation_duration_seconds", "Time spent running an operation on a worker pool",
+    ["pool", "operation"], buckets=LATENCY_BUCKETS
+)
+OPERATION_ERRORS = Counter(
+    "pool_operation_errors_total", "Failed or rejected worker pool operations", ["pool", "operation"]
+)
+POOL_IN_FLIGHT = Gauge(
+    "pool_operations_in_flight", "Operations running on a worker pool", ["pool"]
+)
+POOL_WAITING = Gauge(
+    "pool_operations_waiting", "Operations queued for a worker pool", ["pool"]
+)
+ANALYSIS_CACHE_REQUESTS = Counter(
+    "analysis_cache_requests_total", "Analysis result cache lookups by tier and outcome", ["tier", "result"]
+)
+ANALYSIS_CACHE_BYTES = Gauge(
+    "analysis_cache_local_bytes", "Bytes held by the in-process analysis result cache"
+)
+QUEUE_DEPTH = Gauge(
+    "background_queue_depth", "Celery tasks waiting in the broker", ["queue"]
+)
+
+class RequestTimings:
+    """Time spent per subsystem (db, storage, serialization) during one profiled request"""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+
+    def add(self, category: str, seconds: float):
+        self.seconds[category] += seconds
+        self.calls[category] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        timings = {}
+        for category, seconds in self.seconds.items():
+            timings[f"{category}_ms"] = round(seconds * 1000, 3)
+            timings[f"{category}_calls"] = self.calls[category]
+        return timings
+
+# Set only while a request is being profiled, so recording is free otherwise
+request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def record_time(category: str, seconds: float):
+    timings = request_timings.get()
+    if timings is not None:
+        timings.add(category, seconds)
+
+def pool_metrics(pool: str) -> OperationMetrics:
+    """OperationMetrics for a worker pool, mirrored into the Prometheus collectors"""
+    metrics = OperationMetrics(
+        histogram=OPERATION_LATENCY,
+        errors=OPERATION_ERRORS,
+        labels={"pool": pool}
+    )
+    POOL_IN_FLIGHT.labels(pool=pool).set_function(lambda: metrics.in_flight)
+    POOL_WAITING.labels(pool=pool).set_function(lambda: metrics.waiting)
+    return metrics
+
+def background_queues() -> List[str]:
+    return [celery_app.conf.task_default_queue, *ANALYSIS_QUEUES.values()]
+
+async def refresh_queue_depths() -> Dict[str, int]:
+    """Read the broker queue lengths into QUEUE_DEPTH and return them"""
+    depths = {}
+    for queue in background_queues():
+        depths[queue] = await redis_client.llen(queue)
+        QUEUE_DEPTH.labels(queue=queue).set(depths[queue])
+    return depths
+
+def uptime_seconds() -> float:
+    return time.time() - START_TIME
+
+def request_summary() -> Dict[str, Any]:
+    """Totals across all routes, read back from the request collectors"""
+    total = errors = 0
+    for metric in REQUESTS.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_total"):
+                total += sample.value
+                if sample.labels["status"].startswith("5"):
+                    errors += sample.value
+    in_progress = sum(
+        sample.value for metric in REQUESTS_IN_PROGRESS.collect() for sample in metric.samples
+    )
+    uploaded = sum(
+        sample.value
+        for metric in UPLOAD_BYTES.collect()
+        for sample in metric.samples
+        if sample.name.endswith("_total")
+    )
+    return {
+        "requests_total": int(total),
+        "server_errors_total": int(errors),
+        "in_progress": int(in_progress),
+        "upload_bytes_total": int(uploaded)
+    }
+
+def _route_label(scope) -> str:
+    # The route template keeps label cardinality bounded; unmatched paths share one label
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class PrometheusMiddleware:
+    """ASGI middleware recording request latency, in-flight requests and upload throughput"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        start = time.perf_counter()
+        state = {"status": 500, "body_bytes": 0, "body_done": start}
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request":
+                state["body_bytes"] += len(message.get("body", b""))
+                state["body_done"] = time.perf_counter()
+            return message
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            in_progress.dec()
+            elapsed = time.perf_counter() - start
+            route = _route_label(scope)
+            status = str(state["status"])
+            REQUESTS.labels(method=method, route=route, status=status).inc()
+            REQUEST_LATENCY.labels(method=method, route=route, status=status).observe(elapsed)
+
+            body_bytes = state["body_bytes"]
+            if body_bytes:
+                UPLOAD_BYTES.labels(route=route).inc(body_bytes)
+                receive_seconds = state["body_done"] - start
+                if body_bytes >= THROUGHPUT_MIN_BYTES and receive_seconds > 0:
+                    UPLOAD_THROUGHPUT.labels(route=route).observe(body_bytes / receive_seconds)
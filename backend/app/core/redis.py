@@ -0,0 +1,13 @@
+import redis as sync_redis
+import redis.asyncio as redis
+from app.core.config import settings
+
+# Shared async Redis client (connection pool is managed by redis-py)
+redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+# Blocking client for worker threads and Celery tasks
+sync_redis_client = sync_redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+async def get_redis() -> redis.Redis:
+    """Redis dependency"""
+    return redis_client
@@ -1,12 +1,20 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from app.core.config import settings
+from app.core.monitoring import pool_metrics
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -16,6 +24,49 @@ def get_password_hash(password: str) -> str:
     """Generate password hash"""
     return pwd_context.hash(password)
 
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so password checks never block the event loop"""
+
+    def __init__(self):
+        self.metrics = pool_metrics("password")
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password"
+        )
+        self._workers = asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS)
+
+    async def _run(self, operation: str, func, *args):
+        # Shed load instead of letting a login storm build an unbounded queue
+        if self.metrics.waiting + self.metrics.in_flight >= settings.PASSWORD_HASH_MAX_PENDING:
+            self.metrics.observe("rejected", 0.0, error=True)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        self.metrics.waiting += 1
+        async with self._workers:
+            self.metrics.waiting -= 1
+            self.metrics.in_flight += 1
+            start = time.perf_counter()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+            finally:
+                self.metrics.in_flight -= 1
+                self.metrics.observe(operation, time.perf_counter() - start)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; also returns a new hash when the stored one uses outdated settings"""
+        return await self._run("verify", pwd_context.verify_and_update, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", pwd_context.hash, password)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+password_hasher = PasswordHasher()
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
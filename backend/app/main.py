@@ -1,13 +1,20 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 import logging
 from contextlib import asynccontextmanager
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from app.core.config import settings
 from app.core.database import engine, Base
+from app.core.monitoring import PrometheusMiddleware, refresh_queue_depths
 from app.api.router import api_router
+from app.services.file_service import FileService
+from app.services.parallel import shutdown_partition_pool
+from app.core.security import password_hasher
+from app.services.request_profiler import RequestProfilerMiddleware
+from app.services.storage import get_storage
 
 # Configure logging
 logging.basicConfig(
@@ -25,10 +32,18 @@ async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
+    # Storage client and buckets are set up once per process
+    file_service = FileService()
+    await file_service.initialize()
+    app.state.file_service = file_service
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Data Intelligence Platform API")
+    get_storage().shutdown()
+    password_hasher.shutdown()
+    shutdown_partition_pool()
 
 # Create FastAPI app
 app = FastAPI(
@@ -37,6 +52,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -53,15 +69,36 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Profile-Id"],
 )
 
+# Profiles sampled requests and admin requests sent with an X-Profile header
+app.add_middleware(RequestProfilerMiddleware)
+
+# Metrics middleware is added last so it wraps everything else and times the full request
+app.add_middleware(PrometheusMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "version": "1.0.0"}
+    storage = await app.state.file_service.health_check()
+    return {
+        "status": "healthy" if storage["status"] == "connected" else "degraded",
+        "version": "1.0.0",
+        "storage": storage
+    }
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    try:
+        await refresh_queue_depths()
+    except Exception as e:
+        logger.warning(f"Could not read background queue depth: {e}")
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
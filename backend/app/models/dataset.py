@@ -1,16 +1,10 @@
-from sqlalchemy import Column, String, Integer, DateTime, Enum, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, Enum, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
-import enum
 from app.core.database import Base
-
-class DatasetStatus(str, enum.Enum):
-    UPLOADED = "uploaded"
-    PROCESSING = "processing"
-    READY = "ready"
-    ERROR = "error"
+from app.models.status import DatasetStatus
 
 class Dataset(Base):
     __tablename__ = "datasets"
@@ -22,12 +16,19 @@ class Dataset(Base):
     file_path = Column(String(500))
     file_size = Column(Integer)
     file_type = Column(String(50))
+    content_hash = Column(String(64), index=True)  # SHA-256 of the raw file
     schema_info = Column(JSONB, default={})
     metadata = Column(JSONB, default={})
     status = Column(Enum(DatasetStatus), default=DatasetStatus.UPLOADED, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # Keyset pagination of a user's datasets, newest first, optionally by status
+        Index("idx_datasets_user_created", "user_id", "created_at", "id"),
+        Index("idx_datasets_user_status_created", "user_id", "status", "created_at", "id"),
+    )
+
     # Relationships
     user = relationship("User", back_populates="datasets")
     analyses = relationship("AnalysisHistory", back_populates="dataset", cascade="all, delete-orphan")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Enum, Text, ForeignKey, ARRAY
+from sqlalchemy import Column, String, Integer, DateTime, Enum, Text, ForeignKey, ARRAY
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -11,6 +11,12 @@ class PipelineStatus(str, enum.Enum):
     ACTIVE = "active"
     ARCHIVED = "archived"
 
+class PipelineRunStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    ERROR = "error"
+
 class TransformationPipeline(Base):
     __tablename__ = "transformation_pipelines"
 
@@ -29,4 +35,22 @@ class TransformationPipeline(Base):
     user = relationship("User", back_populates="pipelines")
 
     def __repr__(self):
-        return f"<TransformationPipeline(name='{self.name}', status='{self.status}')>"
\ No newline at end of file
+        return f"<TransformationPipeline(name='{self.name}', status='{self.status}')>"
+
+class PipelineRun(Base):
+    __tablename__ = "pipeline_runs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    pipeline_id = Column(
+        UUID(as_uuid=True), ForeignKey("transformation_pipelines.id", ondelete="CASCADE"), nullable=False
+    )
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    output_dataset_id = Column(UUID(as_uuid=True), ForeignKey("datasets.id", ondelete="SET NULL"))
+    status = Column(Enum(PipelineRunStatus), default=PipelineRunStatus.PENDING, nullable=False)
+    stats = Column(JSONB, default={})
+    execution_time = Column(Integer)  # milliseconds
+    error_message = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<PipelineRun(id='{self.id}', status='{self.status}')>"
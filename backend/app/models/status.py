@@ -0,0 +1,8 @@
+import enum
+
+# Kept apart from the Dataset model so schemas and scripts can use it without mapping tables
+class DatasetStatus(str, enum.Enum):
+    UPLOADED = "uploaded"
+    PROCESSING = "processing"
+    READY = "ready"
+    ERROR = "error"
@@ -4,6 +4,7 @@ from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
 import enum
+from app.core.config import settings
 from app.core.database import Base
 
 class SkillLevel(str, enum.Enum):
@@ -29,5 +30,10 @@ class User(Base):
     pipelines = relationship("TransformationPipeline", back_populates="user", cascade="all, delete-orphan")
     dashboards = relationship("Dashboard", back_populates="user", cascade="all, delete-orphan")
 
+    @property
+    def is_admin(self) -> bool:
+        # Granted by deployment config only; users choose their own skill level
+        return str(self.id) in settings.ADMIN_USER_IDS
+
     def __repr__(self):
         return f"<User(email='{self.email}', skill_level='{self.skill_level}')>"
\ No newline at end of file
@@ -0,0 +1,64 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Literal
+from datetime import datetime
+from uuid import UUID
+from app.models.analysis import AnalysisStatus
+
+class FilterCondition(BaseModel):
+    column: str
+    op: Literal["==", "!=", "<", "<=", ">", ">=", "in", "not_in", "is_null", "not_null", "contains"]
+    value: Any = None
+
+class Aggregation(BaseModel):
+    function: Literal["count", "sum", "mean", "min", "max", "std", "var"]
+    # Omitted for count, which then counts rows
+    column: Optional[str] = None
+    alias: Optional[str] = None
+
+class SortKey(BaseModel):
+    column: str
+    descending: bool = False
+
+class AnalysisPlan(BaseModel):
+    columns: Optional[List[str]] = None
+    filters: List[FilterCondition] = []
+    group_by: List[str] = []
+    aggregations: List[Aggregation] = []
+    sort: List[SortKey] = []
+    limit: Optional[int] = Field(None, ge=1)
+
+class AnalysisCreate(BaseModel):
+    dataset_id: UUID
+    plan: AnalysisPlan
+    query_text: Optional[str] = None
+
+class AnalysisJobCreate(AnalysisCreate):
+    priority: Literal["interactive", "batch"] = "interactive"
+
+class AnalysisJob(BaseModel):
+    id: UUID
+    dataset_id: UUID
+    status: AnalysisStatus
+    priority: str
+    progress: Optional[Dict[str, Any]] = None
+    execution_time: Optional[int] = None
+    error_message: Optional[str] = None
+    created_at: datetime
+
+class AnalysisSummary(BaseModel):
+    id: UUID
+    user_id: UUID
+    dataset_id: UUID
+    query_text: Optional[str] = None
+    query_intent: Dict[str, Any]
+    execution_time: Optional[int]
+    status: AnalysisStatus
+    error_message: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class Analysis(AnalysisSummary):
+    execution_plan: Dict[str, Any]
+    results: Dict[str, Any]
@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from uuid import UUID
+from app.schemas.analysis import AnalysisPlan
+
+class DashboardWidget(BaseModel):
+    # Defaults to the widget's position in the config
+    id: Optional[str] = None
+    dataset_id: UUID
+    plan: AnalysisPlan
+    title: Optional[str] = None
+
+class DashboardConfig(BaseModel):
+    widgets: List[DashboardWidget] = []
+    # Seconds before cached widget results are recomputed; clients poll at this interval
+    refresh_interval: Optional[int] = Field(None, ge=1)
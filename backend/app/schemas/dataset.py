@@ -1,7 +1,8 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
-from app.models.dataset import DatasetStatus
+from uuid import UUID
+from app.models.status import DatasetStatus
 
 class DatasetBase(BaseModel):
     name: str
@@ -18,11 +19,12 @@ class DatasetUpdate(BaseModel):
     status: Optional[DatasetStatus] = None
 
 class DatasetInDB(DatasetBase):
-    id: str
-    user_id: str
+    id: UUID
+    user_id: UUID
     file_path: Optional[str]
     file_size: Optional[int]
     file_type: Optional[str]
+    content_hash: Optional[str] = None
     schema_info: Dict[str, Any]
     metadata: Dict[str, Any]
     status: DatasetStatus
@@ -35,6 +37,20 @@ class DatasetInDB(DatasetBase):
 class Dataset(DatasetInDB):
     pass
 
+class DatasetSummary(DatasetBase):
+    """List view of a dataset without the schema_info and metadata blobs"""
+    id: UUID
+    user_id: UUID
+    file_size: Optional[int]
+    file_type: Optional[str]
+    content_hash: Optional[str] = None
+    status: DatasetStatus
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
 class DatasetPreview(BaseModel):
     columns: list[str]
     data: list[list[Any]]
@@ -44,4 +60,23 @@ class DatasetPreview(BaseModel):
 class DatasetSchema(BaseModel):
     columns: Dict[str, Dict[str, Any]]
     basic_stats: Optional[Dict[str, Any]] = None
-    data_quality: Optional[Dict[str, Any]] = None
\ No newline at end of file
+    data_quality: Optional[Dict[str, Any]] = None
+
+class MultipartUploadCreate(DatasetBase):
+    filename: str
+    content_type: Optional[str] = None
+
+class UploadedPart(BaseModel):
+    part_number: int
+    etag: str
+    size: Optional[int] = None
+
+class MultipartUploadSession(BaseModel):
+    upload_id: str
+    part_size: int
+    max_part_size: int
+    parts: List[UploadedPart] = []
+
+class MultipartUploadComplete(BaseModel):
+    # When omitted, all parts stored for the upload are used
+    parts: Optional[List[UploadedPart]] = None
@@ -0,0 +1,51 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+from uuid import UUID
+from app.models.pipeline import PipelineStatus, PipelineRunStatus
+
+class PipelineBase(BaseModel):
+    name: str
+    description: Optional[str] = None
+    # Each step is a dict with a "type": filter, project, rename, map, aggregate, limit,
+    # join or union; join and union steps name another of source_datasets as "dataset"
+    steps: List[Dict[str, Any]] = []
+    source_datasets: List[UUID]
+    target_schema: Dict[str, Any] = {}
+
+class PipelineCreate(PipelineBase):
+    pass
+
+class PipelineUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    steps: Optional[List[Dict[str, Any]]] = None
+    source_datasets: Optional[List[UUID]] = None
+    target_schema: Optional[Dict[str, Any]] = None
+    status: Optional[PipelineStatus] = None
+
+class Pipeline(PipelineBase):
+    id: UUID
+    user_id: UUID
+    status: PipelineStatus
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+class PipelineRunCreate(BaseModel):
+    output_name: Optional[str] = None
+
+class PipelineRun(BaseModel):
+    id: UUID
+    pipeline_id: UUID
+    status: PipelineRunStatus
+    output_dataset_id: Optional[UUID] = None
+    stats: Dict[str, Any]
+    execution_time: Optional[int] = None
+    error_message: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional, Dict, Any
 from datetime import datetime
+from uuid import UUID
 from app.models.user import SkillLevel
 
 class UserBase(BaseModel):
@@ -18,7 +19,7 @@ class UserUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 class UserInDB(UserBase):
-    id: str
+    id: UUID
     password_hash: str
     is_active: bool
     created_at: datetime
@@ -28,7 +29,7 @@ class UserInDB(UserBase):
         from_attributes = True
 
 class User(UserBase):
-    id: str
+    id: UUID
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime]
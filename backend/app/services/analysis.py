@@ -0,0 +1,724 @@
+import json
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from app.core.config import settings
+from app.services.file_service import FileService
+from app.services.materialization import MaterializationService, arrow_schema, coerce_chunk
+from app.services.parallel import partition_map, row_group_partitions
+from app.services.schema_inference import iter_dataframe_chunks
+
+if TYPE_CHECKING:
+    # Annotation only, so partition workers and benchmarks load this module without the ORM models
+    from app.models.dataset import Dataset
+
+AGGREGATIONS = ("count", "sum", "mean", "min", "max", "std", "var")
+
+COMPARISONS = {
+    "==": lambda field, value: field == value,
+    "!=": lambda field, value: field != value,
+    "<": lambda field, value: field < value,
+    "<=": lambda field, value: field <= value,
+    ">": lambda field, value: field > value,
+    ">=": lambda field, value: field >= value
+}
+
+# Called with (rows scanned, total rows to scan or None) as a scan advances
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+# Helper column holding 1 per row, summed to count rows without depending on any column's nulls
+ROWS_COLUMN = "__rows"
+
+def aggregation_alias(aggregation: Dict[str, Any]) -> str:
+    if aggregation.get("alias"):
+        return aggregation["alias"]
+    if aggregation.get("column"):
+        return f"{aggregation['function']}_{aggregation['column']}"
+    return aggregation["function"]
+
+def plan_intent(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Short description of what a plan asks for, stored as the analysis query intent"""
+    aggregated = bool(plan.get("aggregations") or plan.get("group_by"))
+    return {
+        "operation": "aggregate" if aggregated else "select",
+        "group_by": plan.get("group_by") or [],
+        "aggregations": [aggregation_alias(a) for a in plan.get("aggregations") or []],
+        "filters": len(plan.get("filters") or []),
+        "top_k": bool(plan.get("sort") and plan.get("limit"))
+    }
+
+def _m2_column(column: str) -> str:
+    return f"__m2_{column}"
+
+def _group_codes(table: pa.Table, group_by: List[str]) -> np.ndarray:
+    """Dense group number of each row, with null keys forming groups of their own"""
+    if not group_by:
+        return np.zeros(len(table), dtype=np.int64)
+    keys = table.select(group_by).to_pandas()
+    return keys.groupby(group_by, dropna=False, sort=False).ngroup().to_numpy()
+
+def _floats(column: Any) -> np.ndarray:
+    return pc.fill_null(pc.cast(column, pa.float64()), 0.0).to_numpy(zero_copy_only=False)
+
+def _literal(value: Any, data_type: pa.DataType) -> pa.Scalar:
+    """Convert a JSON plan value to a scalar of the column's type"""
+    if pa.types.is_timestamp(data_type):
+        timestamp = pd.Timestamp(value)
+        if timestamp.tzinfo is None and data_type.tz:
+            timestamp = timestamp.tz_localize(data_type.tz)
+        return pa.scalar(timestamp.to_pydatetime(), type=data_type)
+    try:
+        return pa.scalar(value, type=data_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        return pa.scalar(value).cast(data_type)
+
+def filter_expression(
+    filters: List[Dict[str, Any]],
+    schema: pa.Schema,
+    fields: Optional[Dict[str, pc.Expression]] = None
+) -> Optional[pc.Expression]:
+    """AND the plan's filters into one Arrow expression, pushed down into the scan.
+
+    Columns given in fields are replaced by the expressions that compute them,
+    so filters on derived columns are still evaluated against the source.
+    """
+    expression = None
+    for condition in filters:
+        field = fields[condition["column"]] if fields is not None else pc.field(condition["column"])
+        data_type = schema.field(condition["column"]).type
+        op, value = condition["op"], condition.get("value")
+        try:
+            if op in COMPARISONS:
+                term = COMPARISONS[op](field, _literal(value, data_type))
+            elif op in ("in", "not_in"):
+                values = pa.array([_literal(item, data_type).as_py() for item in value], type=data_type)
+                term = field.isin(values)
+                if op == "not_in":
+                    term = ~term
+            elif op == "is_null":
+                term = field.is_null()
+            elif op == "not_null":
+                term = field.is_valid()
+            elif op == "contains":
+                term = pc.match_substring(field, str(value))
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError) as e:
+            raise ValueError(f"Invalid value for filter on {condition['column']}: {e}")
+        expression = term if expression is None else expression & term
+    return expression
+
+def validate_aggregations(aggregations: List[Dict[str, Any]], schema: pa.Schema):
+    for aggregation in aggregations:
+        if aggregation["function"] not in AGGREGATIONS:
+            raise ValueError(f"Unsupported aggregation: {aggregation['function']}")
+        if aggregation["function"] != "count" and not aggregation.get("column"):
+            raise ValueError(f"Aggregation {aggregation['function']} needs a column")
+        if aggregation["function"] in ("sum", "mean", "std", "var"):
+            data_type = schema.field(aggregation["column"]).type
+            if not (pa.types.is_integer(data_type) or pa.types.is_floating(data_type)):
+                raise ValueError(f"Aggregation {aggregation['function']} needs a numeric column")
+
+class PartialAggregate:
+    """Group-by aggregation computed as mergeable partial states.
+
+    Each chunk of rows is reduced to per-group partial states (counts, sums,
+    minima, maxima, and for std/var the sum of squared deviations from the
+    group's mean, M2). Partials from any number of chunks or partitions combine
+    by re-aggregating, M2 with Chan's update, and finalize() derives the
+    requested aggregations from the merged states.
+    """
+
+    def __init__(self, group_by: List[str], aggregations: List[Dict[str, Any]]):
+        self.group_by = list(group_by)
+        self.aggregations = aggregations
+        # (source column, Arrow function, function used to merge partials), deduplicated
+        self.states: Dict[str, Tuple[str, str, str]] = {}
+        self.deviations: List[str] = []
+        for aggregation in aggregations:
+            function, column = aggregation["function"], aggregation.get("column")
+            if function == "count" and not column:
+                self._add_state(ROWS_COLUMN, "sum", "sum")
+            elif function == "count":
+                self._add_state(column, "count", "sum")
+            elif function in ("sum", "min", "max"):
+                self._add_state(column, function, function)
+            elif function in ("mean", "std", "var"):
+                self._add_state(column, "count", "sum")
+                self._add_state(column, "sum", "sum")
+                if function != "mean":
+                    if column not in self.deviations:
+                        self.deviations.append(column)
+                    self._add_state(_m2_column(column), "sum", "sum")
+
+    def _add_state(self, column: str, function: str, merge_function: str):
+        self.states.setdefault(f"{column}_{function}", (column, function, merge_function))
+
+    @property
+    def input_columns(self) -> List[str]:
+        """Dataset columns the aggregation reads"""
+        columns = list(self.group_by)
+        for column, _, _ in self.states.values():
+            if column != ROWS_COLUMN and not column.startswith("__m2_") and column not in columns:
+                columns.append(column)
+        return columns
+
+    def partial(self, table: pa.Table) -> pa.Table:
+        """Reduce a chunk of rows to one row of partial states per group"""
+        if any(column == ROWS_COLUMN for column, _, _ in self.states.values()):
+            table = table.append_column(ROWS_COLUMN, pa.array(np.ones(len(table), dtype=np.int64)))
+        if self.deviations:
+            # Squared deviations from the chunk's group mean; raw squares lose precision when
+            # values are large relative to their spread
+            codes = _group_codes(table, self.group_by)
+            for column in self.deviations:
+                valid = table[column].is_valid().to_numpy(zero_copy_only=False)
+                values = _floats(table[column])
+                counts = np.bincount(codes, weights=valid.astype(np.float64), minlength=1)
+                sums = np.bincount(codes, weights=values, minlength=1)
+                means = np.divide(sums, counts, out=np.zeros(len(sums)), where=counts > 0)
+                deviations = np.where(valid, (values - means[codes]) ** 2, 0.0)
+                table = table.append_column(_m2_column(column), pa.array(deviations))
+        result = table.group_by(self.group_by).aggregate([
+            (column, function) for column, function, _ in self.states.values()
+        ])
+        return result.select(self.group_by + list(self.states))
+
+    def merge(self, partials: List[pa.Table]) -> pa.Table:
+        """Combine partial states of the same groups from different chunks"""
+        if len(partials) == 1:
+            return partials[0]
+        combined = pa.concat_tables(partials)
+        if self.deviations:
+            combined = self._shift_deviations(combined)
+        result = combined.group_by(self.group_by).aggregate([
+            (name, merge_function) for name, (_, _, merge_function) in self.states.items()
+        ])
+        names = {f"{name}_{merge_function}": name for name, (_, _, merge_function) in self.states.items()}
+        return result.rename_columns([names.get(name, name) for name in result.column_names]).select(
+            self.group_by + list(self.states)
+        )
+
+    def _shift_deviations(self, combined: pa.Table) -> pa.Table:
+        """Add each partial's n * (mean - merged mean)^2 to its M2, so summing M2 merges them (Chan et al.)"""
+        codes = _group_codes(combined, self.group_by)
+        for column in self.deviations:
+            counts = _floats(combined[f"{column}_count"])
+            sums = _floats(combined[f"{column}_sum"])
+            total_counts = np.bincount(codes, weights=counts, minlength=1)
+            total_sums = np.bincount(codes, weights=sums, minlength=1)
+            merged_means = np.divide(total_sums, total_counts, out=np.zeros(len(total_sums)), where=total_counts > 0)
+            means = np.divide(sums, counts, out=np.zeros(len(sums)), where=counts > 0)
+            shift = counts * (means - merged_means[codes]) ** 2
+            name = f"{_m2_column(column)}_sum"
+            m2 = pc.add(pc.fill_null(pc.cast(combined[name], pa.float64()), 0.0), pa.array(shift))
+            combined = combined.set_column(combined.column_names.index(name), name, m2)
+        return combined
+
+    def finalize(self, merged: pa.Table) -> pa.Table:
+        """Derive the requested aggregations from merged partial states"""
+        columns = [merged[key] for key in self.group_by]
+        names = list(self.group_by)
+        for aggregation in self.aggregations:
+            function, column = aggregation["function"], aggregation.get("column")
+            if function == "count":
+                state = merged[f"{ROWS_COLUMN}_sum" if not column else f"{column}_count"]
+                values = pc.fill_null(pc.cast(state, pa.int64()), 0)
+            elif function in ("sum", "min", "max"):
+                values = merged[f"{column}_{function}"]
+            else:
+                count = pc.cast(merged[f"{column}_count"], pa.float64())
+                total = pc.cast(merged[f"{column}_sum"], pa.float64())
+                mean = pc.divide(total, count)
+                if function == "mean":
+                    values = pc.if_else(pc.greater(count, 0), mean, pa.scalar(None, pa.float64()))
+                else:
+                    # Sample variance from the merged sum of squared deviations
+                    m2 = pc.cast(merged[f"{_m2_column(column)}_sum"], pa.float64())
+                    variance = pc.divide(m2, pc.subtract(count, 1.0))
+                    if function == "std":
+                        variance = pc.sqrt(variance)
+                    values = pc.if_else(pc.greater(count, 1), variance, pa.scalar(None, pa.float64()))
+            columns.append(values)
+            names.append(aggregation_alias(aggregation))
+        return pa.Table.from_arrays(columns, names=names)
+
+def aggregate_partition(
+    task: Tuple[ds.Fragment, pa.Schema, List[str], Optional[pc.Expression], PartialAggregate]
+) -> Tuple[pa.Table, int]:
+    """Partial state and matched rows of one row-group partition; runs in a partition worker"""
+    fragment, schema, columns, expression, aggregate = task
+    table = fragment.to_table(schema=schema, columns=columns, filter=expression)
+    return aggregate.partial(table), len(table)
+
+def aggregate_row_groups(
+    source: ds.Dataset,
+    aggregate: PartialAggregate,
+    columns: List[str],
+    expression: Optional[pc.Expression],
+    progress: Optional[ProgressCallback] = None
+) -> Iterator[Tuple[pa.Table, int]]:
+    """Partial states and matched rows of a Parquet source's row-group partitions, computed on the partition pool"""
+    partitions = row_group_partitions(source, expression)
+    total = sum(rows for _, _, rows in partitions)
+    tasks = (
+        ((fragment, source.schema, columns, expression, aggregate), size)
+        for fragment, size, _ in partitions
+    )
+    scanned = 0
+    if progress is not None:
+        progress(scanned, total)
+    for (partial, rows_matched), (_, _, rows) in zip(partition_map(aggregate_partition, tasks), partitions):
+        scanned += rows
+        if progress is not None:
+            progress(scanned, total)
+        yield partial, rows_matched
+
+def fold_partials(aggregate: PartialAggregate, partials: List[pa.Table]) -> List[pa.Table]:
+    """Merge partial states once they hold ANALYSIS_CHUNK_ROWS groups, to bound memory on high-cardinality group-bys"""
+    if sum(len(partial) for partial in partials) >= settings.ANALYSIS_CHUNK_ROWS:
+        return [aggregate.merge(partials)]
+    return partials
+
+def result_limit(plan: Dict[str, Any]) -> int:
+    return min(plan.get("limit") or settings.ANALYSIS_MAX_RESULT_ROWS, settings.ANALYSIS_MAX_RESULT_ROWS)
+
+def plan_columns(plan: Dict[str, Any], schema: pa.Schema) -> List[str]:
+    """Columns a select plan reads: its output columns and sort keys"""
+    columns = list(plan.get("columns") or schema.names)
+    for key in plan.get("sort") or []:
+        if key["column"] not in columns:
+            columns.append(key["column"])
+    return columns
+
+def sort_keys(sort: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    return [(key["column"], "descending" if key.get("descending") else "ascending") for key in sort]
+
+def order_and_limit(table: pa.Table, sort: List[Dict[str, Any]], limit: int) -> pa.Table:
+    """Sort a result table and keep its first `limit` rows; top-k avoids a full sort"""
+    if sort and len(table) > limit:
+        table = table.take(pc.select_k_unstable(table, limit, sort_keys(sort)))
+    if sort:
+        table = table.sort_by(sort_keys(sort))
+    return table.slice(0, limit)
+
+def table_to_result(table: pa.Table) -> Dict[str, Any]:
+    frame = table.to_pandas()
+    return {
+        "columns": [str(column) for column in table.column_names],
+        "data": json.loads(frame.to_json(orient="values", date_format="iso")),
+        "row_count": len(table)
+    }
+
+class QueryBatch:
+    """Several plans over one dataset, answered from a single scan.
+
+    The scan reads the union of the plans' columns, and is filtered by the OR
+    of their filters when every plan has one; each plan's own filter is then
+    applied to the scanned rows. Aggregate plans with the same group-by and
+    filters share one set of partial states covering all their aggregations.
+    """
+
+    def __init__(self, plans: Dict[str, Dict[str, Any]], schema: pa.Schema):
+        self.plans = plans
+        self.expressions = {key: filter_expression(plan.get("filters") or [], schema) for key, plan in plans.items()}
+        # Plans that need no more rows; later partitions skip them
+        self.finished: Set[str] = set()
+        self.aggregates: Dict[str, PartialAggregate] = {}
+        self.group_of: Dict[str, str] = {}
+        self.selects: Dict[str, List[str]] = {}
+        shared: Dict[str, List[Dict[str, Any]]] = {}
+        for key, plan in plans.items():
+            if plan.get("aggregations") or plan.get("group_by"):
+                aggregate = PartialAggregate(
+                    plan.get("group_by") or [],
+                    plan.get("aggregations") or [{"function": "count"}]
+                )
+                self.aggregates[key] = aggregate
+                group = json.dumps([aggregate.group_by, str(self.expressions[key])])
+                self.group_of[key] = group
+                shared.setdefault(group, []).extend(aggregate.aggregations)
+            else:
+                self.selects[key] = plan_columns(plan, schema)
+
+        # Shared partial states per group, with the filter of the plans in it
+        self.groups: Dict[str, Tuple[PartialAggregate, Optional[pc.Expression]]] = {}
+        for key, group in self.group_of.items():
+            if group not in self.groups:
+                self.groups[group] = (
+                    PartialAggregate(self.aggregates[key].group_by, shared[group]),
+                    self.expressions[key]
+                )
+
+        columns: List[str] = []
+        for aggregate, _ in self.groups.values():
+            columns += aggregate.input_columns
+        for key, plan in plans.items():
+            columns += self.selects.get(key, [])
+            columns += [condition["column"] for condition in plan.get("filters") or []]
+        # Counting rows still needs one column to scan
+        self.columns = list(dict.fromkeys(columns)) or schema.names[:1]
+
+        self.filter = None
+        if all(expression is not None for expression in self.expressions.values()):
+            for expression in self.expressions.values():
+                self.filter = expression if self.filter is None else self.filter | expression
+
+    def reduce(
+        self,
+        table: pa.Table
+    ) -> Tuple[Dict[str, Tuple[pa.Table, int]], Dict[str, Tuple[pa.Table, int]]]:
+        """Partial states of each aggregate group and candidate rows of each unfinished select, with matched rows"""
+        partials = {}
+        for group, (aggregate, expression) in self.groups.items():
+            rows = table if expression is None else table.filter(expression)
+            partials[group] = (aggregate.partial(rows.select(aggregate.input_columns)), len(rows))
+        candidates = {}
+        for key, columns in self.selects.items():
+            if key in self.finished:
+                continue
+            plan, expression = self.plans[key], self.expressions[key]
+            rows = (table if expression is None else table.filter(expression)).select(columns)
+            limit = result_limit(plan)
+            if plan.get("sort"):
+                candidates[key] = (order_and_limit(rows, plan["sort"], limit), len(rows))
+            else:
+                # One row past the limit tells the plan it has stopped early
+                candidates[key] = (rows.slice(0, limit + 1), len(rows))
+        return partials, candidates
+
+def batch_partition(
+    task: Tuple[ds.Fragment, pa.Schema, QueryBatch]
+) -> Tuple[Dict[str, Tuple[pa.Table, int]], Dict[str, Tuple[pa.Table, int]]]:
+    """Reduction of one row-group partition for a query batch; runs in a partition worker"""
+    fragment, schema, batch = task
+    return batch.reduce(fragment.to_table(schema=schema, columns=batch.columns, filter=batch.filter))
+
+class AnalysisEngine:
+    """Runs structured analysis plans (filter, group-by, aggregate, sort, top-k) on Arrow data.
+
+    Plans run against the dataset's materialized Parquet copy when it exists,
+    with column projection and filters pushed into the scan so only the needed
+    columns and row groups are read; otherwise the raw file is streamed and
+    converted to Arrow chunk by chunk. Aggregations over the Parquet copy run
+    per row-group partition across the worker pool, merging partial states.
+    """
+
+    def __init__(self, file_service: Optional[FileService] = None):
+        self.file_service = file_service or FileService()
+        self.materialization = MaterializationService(self.file_service)
+
+    def execute(
+        self,
+        dataset: "Dataset",
+        plan: Dict[str, Any],
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """Run a plan and return its results and the execution plan that produced them"""
+        materialized = self.materialization.is_materialized(dataset.content_hash)
+        if materialized:
+            source = self.materialization.dataset(dataset.content_hash)
+            schema = source.schema
+        else:
+            schema = arrow_schema(dataset.schema_info or {})
+        self._validate(plan, schema)
+        expression = filter_expression(plan.get("filters") or [], schema)
+
+        aggregate = None
+        if plan.get("aggregations") or plan.get("group_by"):
+            aggregate = PartialAggregate(
+                plan.get("group_by") or [],
+                plan.get("aggregations") or [{"function": "count"}]
+            )
+            columns = aggregate.input_columns
+        else:
+            columns = plan_columns(plan, schema)
+        # Counting rows still needs one column to scan
+        columns = columns or schema.names[:1]
+
+        if aggregate and materialized:
+            # Row-group partitions are aggregated across the worker pool
+            partials = aggregate_row_groups(source, aggregate, columns, expression, progress)
+            results = self._run_aggregate(aggregate, partials, plan, schema)
+        else:
+            if materialized:
+                chunks = self._scan_parquet(source, columns, expression, progress)
+            else:
+                chunks = self._scan_raw(dataset, schema, columns, expression, progress)
+            if aggregate:
+                partials = ((aggregate.partial(table), len(table)) for table in chunks)
+                results = self._run_aggregate(aggregate, partials, plan, schema)
+            else:
+                results = self._run_select(chunks, plan, columns)
+
+        execution_plan = {
+            "plan": plan,
+            "operation": "aggregate" if aggregate else "select",
+            "source": "parquet" if materialized else "raw",
+            "columns_read": columns,
+            "filter": str(expression) if expression is not None else None
+        }
+        return {"results": results, "execution_plan": execution_plan}
+
+    def execute_batch(
+        self,
+        dataset: "Dataset",
+        plans: Dict[str, Dict[str, Any]]
+    ) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """Run several plans in one scan, yielding (key, outcome, error) for each plan as it finishes.
+
+        Selects without a sort finish once they have their rows, aggregates and
+        sorted selects when the scan ends; invalid plans are reported first.
+        """
+        materialized = self.materialization.is_materialized(dataset.content_hash)
+        if materialized:
+            source = self.materialization.dataset(dataset.content_hash)
+            schema = source.schema
+        else:
+            schema = arrow_schema(dataset.schema_info or {})
+
+        valid = {}
+        for key, plan in plans.items():
+            try:
+                self._validate(plan, schema)
+                filter_expression(plan.get("filters") or [], schema)
+            except ValueError as e:
+                yield key, None, str(e)
+                continue
+            valid[key] = plan
+        if not valid:
+            return
+
+        batch = QueryBatch(valid, schema)
+        if materialized:
+            # Row-group partitions are reduced across the worker pool
+            tasks = (
+                ((fragment, source.schema, batch), size)
+                for fragment, size, _ in row_group_partitions(source, batch.filter)
+            )
+            reductions = partition_map(batch_partition, tasks)
+        else:
+            reductions = (
+                batch.reduce(table)
+                for table in self._scan_raw(dataset, schema, batch.columns, batch.filter)
+            )
+
+        def outcome(key: str, results: Dict[str, Any]) -> Dict[str, Any]:
+            plan = valid[key]
+            return {"results": results, "execution_plan": {
+                "plan": plan,
+                "operation": "aggregate" if key in batch.aggregates else "select",
+                "source": "parquet" if materialized else "raw",
+                "columns_read": batch.columns,
+                "filter": str(batch.filter) if batch.filter is not None else None,
+                "batched": len(valid)
+            }}
+
+        partials: Dict[str, List[pa.Table]] = {group: [] for group in batch.groups}
+        group_rows: Dict[str, int] = {group: 0 for group in batch.groups}
+        kept: Dict[str, List[pa.Table]] = {key: [] for key in batch.selects}
+        select_rows: Dict[str, int] = {key: 0 for key in batch.selects}
+        for group_partials, candidates in reductions:
+            for group, (partial, rows) in group_partials.items():
+                group_rows[group] += rows
+                partials[group] = fold_partials(batch.groups[group][0], partials[group] + [partial])
+            for key, (rows, matched) in candidates.items():
+                if key in batch.finished:
+                    continue
+                plan = valid[key]
+                select_rows[key] += matched
+                if plan.get("sort"):
+                    # Running top-k: memory stays bounded by the limit, not the dataset
+                    kept[key] = [order_and_limit(pa.concat_tables(kept[key] + [rows]), plan["sort"], result_limit(plan))]
+                    continue
+                kept[key].append(rows)
+                if sum(len(part) for part in kept[key]) > result_limit(plan):
+                    batch.finished.add(key)
+                    table = pa.concat_tables(kept[key]).slice(0, result_limit(plan))
+                    output_columns = list(plan.get("columns") or schema.names)
+                    yield key, outcome(key, self._select_result(table, plan, output_columns, None, True)), None
+            if not batch.aggregates and len(batch.finished) == len(batch.selects):
+                break
+
+        for key in batch.selects:
+            if key in batch.finished:
+                continue
+            plan = valid[key]
+            table = pa.concat_tables(kept[key]).slice(0, result_limit(plan)) if kept[key] else None
+            output_columns = list(plan.get("columns") or schema.names)
+            yield key, outcome(key, self._select_result(table, plan, output_columns, select_rows[key], False)), None
+        merged: Dict[str, pa.Table] = {}
+        for key, aggregate in batch.aggregates.items():
+            group = batch.group_of[key]
+            if group not in merged:
+                shared = batch.groups[group][0]
+                merged[group] = shared.merge(
+                    partials[group] or [shared.partial(schema.empty_table().select(shared.input_columns))]
+                )
+            result = self._aggregate_result(aggregate, merged[group], group_rows[group], valid[key])
+            yield key, outcome(key, result), None
+
+    def _validate(self, plan: Dict[str, Any], schema: pa.Schema):
+        known = set(schema.names)
+        referenced = list(plan.get("columns") or []) + list(plan.get("group_by") or [])
+        referenced += [condition["column"] for condition in plan.get("filters") or []]
+        referenced += [a["column"] for a in plan.get("aggregations") or [] if a.get("column")]
+        missing = sorted(set(referenced) - known)
+        if missing:
+            raise ValueError(f"Unknown columns: {', '.join(missing)}")
+
+        validate_aggregations(plan.get("aggregations") or [], schema)
+
+        if plan.get("aggregations") or plan.get("group_by"):
+            outputs = set(plan.get("group_by") or [])
+            outputs |= {aggregation_alias(a) for a in plan.get("aggregations") or [{"function": "count"}]}
+        else:
+            outputs = known
+        unknown_sort = [key["column"] for key in plan.get("sort") or [] if key["column"] not in outputs]
+        if unknown_sort:
+            raise ValueError(f"Cannot sort by: {', '.join(unknown_sort)}")
+
+    def _scan_parquet(
+        self,
+        source: ds.Dataset,
+        columns: List[str],
+        expression: Optional[pc.Expression],
+        progress: Optional[ProgressCallback] = None
+    ) -> Iterator[pa.Table]:
+        if progress is None:
+            scanned = source.scanner(columns=columns, filter=expression).to_batches()
+        else:
+            scanned = self._scan_row_groups(source, columns, expression, progress)
+        batches, rows = [], 0
+        for batch in scanned:
+            batches.append(batch)
+            rows += batch.num_rows
+            if rows >= settings.ANALYSIS_CHUNK_ROWS:
+                yield pa.Table.from_batches(batches)
+                batches, rows = [], 0
+        if batches:
+            yield pa.Table.from_batches(batches)
+
+    def _scan_row_groups(
+        self,
+        source: ds.Dataset,
+        columns: List[str],
+        expression: Optional[pc.Expression],
+        progress: ProgressCallback
+    ) -> Iterator[pa.RecordBatch]:
+        """Scan one row group at a time, so progress is known against the row groups left after pruning"""
+        row_groups = [
+            row_group
+            for fragment in source.get_fragments(filter=expression)
+            for row_group in fragment.split_by_row_group(filter=expression, schema=source.schema)
+        ]
+        total = sum(row_group.row_groups[0].num_rows for row_group in row_groups)
+        scanned = 0
+        progress(scanned, total)
+        for row_group in row_groups:
+            yield from row_group.to_batches(columns=columns, filter=expression, schema=source.schema)
+            scanned += row_group.row_groups[0].num_rows
+            progress(scanned, total)
+
+    def _scan_raw(
+        self,
+        dataset: "Dataset",
+        schema: pa.Schema,
+        columns: List[str],
+        expression: Optional[pc.Expression],
+        progress: Optional[ProgressCallback] = None
+    ) -> Iterator[pa.Table]:
+        total = ((dataset.schema_info or {}).get("basic_stats") or {}).get("row_count")
+        scanned = 0
+        with self.file_service.open_file(dataset.file_path) as stream:
+            for chunk in iter_dataframe_chunks(stream, dataset.file_type, settings.ANALYSIS_CHUNK_ROWS):
+                scanned += len(chunk)
+                if progress is not None:
+                    progress(scanned, total)
+                table = coerce_chunk(chunk, schema)
+                if expression is not None:
+                    table = table.filter(expression)
+                yield table.select(columns)
+
+    def _run_aggregate(
+        self,
+        aggregate: PartialAggregate,
+        chunk_partials: Iterator[Tuple[pa.Table, int]],
+        plan: Dict[str, Any],
+        schema: pa.Schema
+    ) -> Dict[str, Any]:
+        partials, rows_matched = [], 0
+        for partial, rows in chunk_partials:
+            rows_matched += rows
+            partials = fold_partials(aggregate, partials + [partial])
+        if not partials:
+            partials = [aggregate.partial(schema.empty_table().select(aggregate.input_columns))]
+        return self._aggregate_result(aggregate, aggregate.merge(partials), rows_matched, plan)
+
+    def _aggregate_result(
+        self,
+        aggregate: PartialAggregate,
+        merged: pa.Table,
+        rows_matched: int,
+        plan: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        table = aggregate.finalize(merged)
+        limit = result_limit(plan)
+        groups = len(table)
+        table = order_and_limit(table, plan.get("sort") or [], limit)
+        return {
+            **table_to_result(table),
+            "rows_matched": rows_matched,
+            "groups": groups,
+            "truncated": groups > len(table) and not plan.get("limit")
+        }
+
+    def _run_select(self, chunks: Iterator[pa.Table], plan: Dict[str, Any], columns: List[str]) -> Dict[str, Any]:
+        sort = plan.get("sort") or []
+        limit = result_limit(plan)
+        output_columns = list(plan.get("columns") or columns)
+
+        kept: Optional[pa.Table] = None
+        pending: List[pa.Table] = []
+        rows_matched = 0
+        stopped_early = False
+        for table in chunks:
+            rows_matched += len(table)
+            if sort:
+                # Running top-k: memory stays bounded by the limit, not the dataset
+                candidates = pa.concat_tables([kept, table]) if kept is not None else table
+                kept = order_and_limit(candidates, sort, limit)
+            else:
+                pending.append(table)
+                if sum(len(part) for part in pending) > limit:
+                    stopped_early = True
+                    break
+
+        if sort:
+            table = kept
+        else:
+            table = pa.concat_tables(pending).slice(0, limit) if pending else None
+        return self._select_result(table, plan, output_columns, rows_matched, stopped_early)
+
+    def _select_result(
+        self,
+        table: Optional[pa.Table],
+        plan: Dict[str, Any],
+        output_columns: List[str],
+        rows_matched: Optional[int],
+        stopped_early: bool
+    ) -> Dict[str, Any]:
+        if table is None:
+            table = pa.table({name: [] for name in output_columns})
+        table = table.select(output_columns)
+        return {
+            **table_to_result(table),
+            # A scan stopped at the limit has not counted every matching row
+            "rows_matched": None if stopped_early else rows_matched,
+            "truncated": (stopped_early or rows_matched > len(table)) and not plan.get("limit")
+        }
@@ -0,0 +1,101 @@
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import DateTime, Update, update
+
+from app.core.config import settings
+from app.core.redis import redis_client, sync_redis_client
+from app.models.analysis import AnalysisHistory, AnalysisStatus
+
+# Progress is published at most this often, and cancellation checked as often
+PROGRESS_INTERVAL_SECONDS = 0.5
+
+# Progress and cancel flags outlive any job that reads them
+KEY_TTL_SECONDS = 24 * 3600
+
+# Grace period after the time limit before a job whose worker died is failed
+STALE_GRACE_SECONDS = 60
+
+# Recorded by the cancel endpoint; a running job keeps its slot until the worker stops
+CANCELLED_MESSAGE = "Cancelled by user"
+
+def progress_key(analysis_id: Any) -> str:
+    return f"analysis-job:{analysis_id}:progress"
+
+def cancel_key(analysis_id: Any) -> str:
+    return f"analysis-job:{analysis_id}:cancel"
+
+def stale_job_updates(*criteria: Any) -> List[Update]:
+    """Statements failing matching jobs whose worker died past the time limit or that expired in the queue"""
+    now = datetime.now(timezone.utc)
+    started_at = AnalysisHistory.execution_plan["started_at"].astext.cast(DateTime(timezone=True))
+    running_limit = settings.ANALYSIS_JOB_TIMEOUT_SECONDS + STALE_GRACE_SECONDS
+    return [
+        update(AnalysisHistory)
+        .where(
+            *criteria,
+            AnalysisHistory.status == AnalysisStatus.RUNNING,
+            started_at < now - timedelta(seconds=running_limit)
+        )
+        .values(
+            status=AnalysisStatus.ERROR,
+            error_message=f"Analysis exceeded the {settings.ANALYSIS_JOB_TIMEOUT_SECONDS} second time limit"
+        ),
+        update(AnalysisHistory)
+        .where(
+            *criteria,
+            AnalysisHistory.status == AnalysisStatus.PENDING,
+            AnalysisHistory.created_at < now - timedelta(seconds=settings.ANALYSIS_JOB_QUEUE_TIMEOUT_SECONDS)
+        )
+        .values(
+            status=AnalysisStatus.ERROR,
+            error_message=f"Analysis waited more than {settings.ANALYSIS_JOB_QUEUE_TIMEOUT_SECONDS} seconds in the queue"
+        )
+    ]
+
+async def read_progress(analysis_id: Any) -> Optional[Dict[str, Any]]:
+    raw = await redis_client.get(progress_key(analysis_id))
+    return json.loads(raw) if raw else None
+
+async def request_cancel(analysis_id: Any):
+    await redis_client.set(cancel_key(analysis_id), 1, ex=KEY_TTL_SECONDS)
+
+class AnalysisCancelled(Exception):
+    pass
+
+class JobProgress:
+    """Progress callback for the analysis engine that publishes to Redis and stops cancelled jobs.
+
+    Updates are throttled so a fast scan does not turn into a Redis round trip
+    per row group; the final update is always written.
+    """
+
+    def __init__(self, analysis_id: Any):
+        self.analysis_id = analysis_id
+        self._published_at = 0.0
+
+    def __call__(self, rows_scanned: int, total_rows: Optional[int]):
+        now = time.monotonic()
+        if now - self._published_at < PROGRESS_INTERVAL_SECONDS and rows_scanned != total_rows:
+            return
+        self._published_at = now
+        if self.cancel_requested():
+            raise AnalysisCancelled()
+        self.publish(
+            "scanning",
+            rows_scanned=rows_scanned,
+            total_rows=total_rows,
+            fraction=round(min(rows_scanned / total_rows, 1.0), 4) if total_rows else None
+        )
+
+    def cancel_requested(self) -> bool:
+        return bool(sync_redis_client.exists(cancel_key(self.analysis_id)))
+
+    def publish(self, stage: str, **details: Any):
+        sync_redis_client.set(
+            progress_key(self.analysis_id),
+            json.dumps({"stage": stage, **details}),
+            ex=KEY_TTL_SECONDS
+        )
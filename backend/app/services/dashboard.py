@@ -0,0 +1,92 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+from app.models.dataset import Dataset, DatasetStatus
+from app.services.analysis import AnalysisEngine
+from app.services.file_service import FileService
+from app.services.result_cache import AnalysisResultCache, plan_hash, result_cache
+
+logger = logging.getLogger(__name__)
+
+def _is_fresh(outcome: Dict[str, Any], max_age: Optional[int]) -> bool:
+    if max_age is None:
+        return True
+    computed_at = outcome.get("computed_at")
+    if not computed_at:
+        return False
+    age = datetime.now(timezone.utc) - datetime.fromisoformat(computed_at)
+    return age.total_seconds() < max_age
+
+class DashboardRenderer:
+    """Computes a dashboard's widgets, yielding each one's message as it finishes.
+
+    Widget results share the analysis result cache, so cached widgets are sent
+    first. The rest are grouped by dataset and each group is answered by one
+    batched scan; widgets with the same dataset and plan are computed once.
+    """
+
+    def __init__(self, file_service: Optional[FileService] = None, cache: AnalysisResultCache = result_cache):
+        self.engine = AnalysisEngine(file_service)
+        self.cache = cache
+
+    def render(
+        self,
+        widgets: List[Dict[str, Any]],
+        datasets: Dict[str, Dataset],
+        refresh_interval: Optional[int] = None,
+        refresh: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """Messages for each widget; a widget is {"id", "dataset_id", "plan"}"""
+        max_age = settings.DASHBOARD_MIN_REFRESH_SECONDS if refresh else refresh_interval
+        # Widgets still to compute, per dataset and plan
+        pending: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        for widget in widgets:
+            dataset = datasets.get(str(widget["dataset_id"]))
+            if dataset is None:
+                yield self._error(widget, "Dataset not found")
+                continue
+            if dataset.status != DatasetStatus.READY:
+                yield self._error(widget, "Dataset is not ready for analysis")
+                continue
+            outcome = self.cache.get(dataset, widget["plan"])
+            if outcome is not None and _is_fresh(outcome, max_age):
+                yield self._result(widget, outcome, "hit")
+                continue
+            pending.setdefault(str(dataset.id), {}).setdefault(plan_hash(widget["plan"]), []).append(widget)
+
+        for dataset_id, plans in pending.items():
+            dataset = datasets[dataset_id]
+            done = set()
+            try:
+                batch = {key: group[0]["plan"] for key, group in plans.items()}
+                for key, outcome, error in self.engine.execute_batch(dataset, batch):
+                    done.add(key)
+                    if error:
+                        for widget in plans[key]:
+                            yield self._error(widget, f"Invalid analysis plan: {error}")
+                        continue
+                    outcome["computed_at"] = datetime.now(timezone.utc).isoformat()
+                    self.cache.set(dataset, batch[key], outcome)
+                    for widget in plans[key]:
+                        yield self._result(widget, outcome, "miss")
+            except Exception as e:
+                logger.error(f"Dashboard widgets on dataset {dataset_id} failed: {e}")
+                for key, group in plans.items():
+                    if key not in done:
+                        for widget in group:
+                            yield self._error(widget, str(e))
+
+    def _result(self, widget: Dict[str, Any], outcome: Dict[str, Any], cache_status: str) -> Dict[str, Any]:
+        return {
+            "type": "widget",
+            "id": widget["id"],
+            "cache": cache_status,
+            "computed_at": outcome.get("computed_at"),
+            "results": outcome["results"],
+            "execution_plan": outcome["execution_plan"]
+        }
+
+    def _error(self, widget: Dict[str, Any], message: str) -> Dict[str, Any]:
+        return {"type": "widget", "id": widget["id"], "error": message}
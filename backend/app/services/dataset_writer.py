@@ -0,0 +1,165 @@
+import hashlib
+import io
+import os
+import tempfile
+from typing import Any, Callable, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pcsv
+import pyarrow.parquet as pq
+from minio.error import S3Error
+
+from app.core.config import settings
+from app.services.file_service import FileService, content_object_name
+from app.services.materialization import ARROW_TYPES, MaterializationService, RowGroupHasher, parquet_object_name
+from app.services.profiler import DatasetProfile
+from app.services.row_index import RowIndexBuilder, row_index_object_name
+
+def canonical_type(data_type: pa.DataType) -> pa.DataType:
+    """The materialization type a derived column is stored as"""
+    if pa.types.is_boolean(data_type):
+        return ARROW_TYPES["boolean"]
+    if pa.types.is_integer(data_type):
+        return ARROW_TYPES["integer"]
+    if pa.types.is_floating(data_type) or pa.types.is_decimal(data_type):
+        return ARROW_TYPES["float"]
+    if pa.types.is_timestamp(data_type) or pa.types.is_date(data_type):
+        return ARROW_TYPES["datetime"]
+    return ARROW_TYPES["string"]
+
+def canonical_schema(schema: pa.Schema) -> pa.Schema:
+    return pa.schema([pa.field(field.name, canonical_type(field.type)) for field in schema])
+
+class HashingWriter(io.RawIOBase):
+    """Writable file wrapper that computes SHA-256 of everything written through it"""
+
+    def __init__(self, stream: io.BufferedIOBase):
+        super().__init__()
+        self._stream = stream
+        self._hash = hashlib.sha256()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._hash.update(data)
+        return self._stream.write(data)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+class DatasetWriter:
+    """Streams record batches into a new dataset in a single pass.
+
+    Each batch is appended to the raw CSV file, the typed Parquet copy and the
+    dataset profile at once, so the output is stored, materialized and profiled
+    without being read back. Both files are spooled to local disk, which keeps
+    memory bounded by one row group whatever the output size.
+    """
+
+    def __init__(self, schema: pa.Schema, file_service: Optional[FileService] = None):
+        self.file_service = file_service or FileService()
+        self.schema = canonical_schema(schema)
+        self.profile = DatasetProfile()
+        self._spool = tempfile.TemporaryDirectory()
+        self._csv_path = os.path.join(self._spool.name, "output.csv")
+        self._parquet_path = os.path.join(self._spool.name, "output.parquet")
+        self._csv_file = open(self._csv_path, "wb")
+        self._csv_hash = HashingWriter(self._csv_file)
+        self._csv = pcsv.CSVWriter(self._csv_hash, self.schema)
+        self._parquet = pq.ParquetWriter(self._parquet_path, self.schema, compression="zstd")
+        self._pending: List[pa.RecordBatch] = []
+        self._pending_rows = 0
+        self._hasher = RowGroupHasher(self.schema)
+        self.partitions: List[str] = []
+
+    def __enter__(self) -> "DatasetWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cleanup()
+
+    def write(self, batch: pa.RecordBatch):
+        # Canonical types only widen, apart from nanosecond timestamps and decimals
+        batch = pa.RecordBatch.from_arrays(
+            [pc.cast(column, field.type, safe=False) for column, field in zip(batch.columns, self.schema)],
+            schema=self.schema
+        )
+        self._csv.write_batch(batch)
+        frame = batch.to_pandas()
+        self.profile.update(frame)
+
+        # Row groups of exactly PARQUET_ROW_GROUP_ROWS rows, like materialized uploads,
+        # so the fingerprints of leading row groups survive appends
+        offset = 0
+        while offset < batch.num_rows:
+            part = batch.slice(offset, settings.PARQUET_ROW_GROUP_ROWS - self._pending_rows)
+            self._pending.append(part)
+            self._hasher.update(frame.iloc[offset:offset + part.num_rows])
+            self._pending_rows += part.num_rows
+            offset += part.num_rows
+            if self._pending_rows >= settings.PARQUET_ROW_GROUP_ROWS:
+                self._flush_row_group()
+
+    def _flush_row_group(self):
+        if self._pending:
+            self._parquet.write_table(pa.Table.from_batches(self._pending, schema=self.schema))
+            self.partitions.append(self._hasher.hexdigest())
+        self._pending, self._pending_rows = [], 0
+        self._hasher = RowGroupHasher(self.schema)
+
+    def close(self, lock_object: Optional[Callable[[str], Any]] = None) -> Dict[str, Any]:
+        """Finish both files, upload them and return the new dataset's storage fields.
+
+        lock_object is called with the content hash before the stored copy is
+        checked, so the caller can keep a concurrent delete from freeing an
+        existing copy until the new dataset row references it.
+        """
+        self._flush_row_group()
+        self._parquet.close()
+        self._csv.close()
+        self._csv_file.close()
+        content_hash = self._csv_hash.hexdigest()
+        file_path = content_object_name(content_hash)
+        client = self.file_service.minio_client
+        if lock_object is not None:
+            lock_object(content_hash)
+
+        # Content-addressed like uploads: identical output is stored once
+        try:
+            client.stat_object(settings.DATASETS_BUCKET, file_path)
+        except S3Error:
+            client.fput_object(settings.DATASETS_BUCKET, file_path, self._csv_path, content_type="text/csv")
+        materialization = MaterializationService(self.file_service)
+        if not materialization.is_materialized(content_hash):
+            client.fput_object(
+                settings.CACHE_BUCKET,
+                parquet_object_name(content_hash),
+                self._parquet_path,
+                content_type="application/vnd.apache.parquet"
+            )
+            materialization.put_partitions(content_hash, self.partitions)
+
+        with open(self._csv_path, "rb") as stream:
+            indexer = RowIndexBuilder(stream, settings.ROW_INDEX_INTERVAL)
+            while indexer.read(1024 * 1024):
+                pass
+        self.file_service.put_cache_object(row_index_object_name(file_path), indexer.to_bytes())
+
+        schema_info = self.profile.to_schema()
+        schema_info["row_index"] = {"interval": indexer.interval, "entries": len(indexer.offsets)}
+        return {
+            "file_path": file_path,
+            "file_size": os.path.getsize(self._csv_path),
+            "file_type": "csv",
+            "content_hash": content_hash,
+            "schema_info": schema_info
+        }
+
+    def cleanup(self):
+        if self._parquet.is_open:
+            self._parquet.close()
+        if not self._csv_file.closed:
+            self._csv_file.close()
+        self._spool.cleanup()
@@ -1,24 +1,84 @@
+import hashlib
+import io
 import os
+import time
 import uuid
 import magic
 import aiofiles
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional
-from fastapi import UploadFile, HTTPException, status
-from minio import Minio
+from typing import Dict, Any, AsyncIterator, List, Optional
+from fastapi import Request, UploadFile, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from minio.commonconfig import ENABLED, ComposeSource, Filter
+from minio.datatypes import Part
 from minio.error import S3Error
+from minio.lifecycleconfig import Expiration, LifecycleConfig, Rule
+from urllib3.exceptions import EmptyPoolError
 
 from app.core.config import settings
+from app.services.storage import StorageBusyError, async_stream_slot, get_storage, stream_slot
+
+# Bytes needed by libmagic to identify common dataset formats
+MIME_SNIFF_BYTES = 2048
+
+# Chunk size for streaming downloads
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# Uploads are stored here while they are hashed, then promoted to their content key
+STAGING_PREFIX = "staging/"
+
+def storage_busy(error: Exception) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"Storage is busy, retry shortly: {str(error)}",
+        headers={"Retry-After": "5"}
+    )
+
+class HashingUpload:
+    """Reads an upload while hashing it, so storing it is the only pass over the bytes"""
+    
+    def __init__(self, file: UploadFile):
+        self.file = file
+        self.digest = hashlib.sha256()
+        self.size = 0
+    
+    async def read(self, size: int) -> bytes:
+        chunk = await self.file.read(size)
+        self.size += len(chunk)
+        if chunk:
+            await run_in_threadpool(self.digest.update, chunk)
+        return chunk
+
+def content_object_name(content_hash: str) -> str:
+    """Content-addressed object name; identical uploads share one object"""
+    return f"objects/{content_hash[:2]}/{content_hash}"
 
 class FileService:
     def __init__(self):
-        self.minio_client = Minio(
-            settings.MINIO_ENDPOINT,
-            access_key=settings.MINIO_ACCESS_KEY,
-            secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_SECURE
-        )
-        self._ensure_buckets_exist()
+        # Blocking client calls from async code go through the shared storage pool
+        self.storage = get_storage()
+        self.minio_client = self.storage.client
+    
+    async def initialize(self):
+        """One-time bucket bootstrap, run at application startup"""
+        await self.storage.run("ensure_buckets", self._ensure_buckets_exist)
+    
+    async def health_check(self) -> Dict[str, Any]:
+        """Report whether storage is reachable and how fast it answers"""
+        start = time.perf_counter()
+        try:
+            await self.storage.run(
+                "bucket_exists",
+                self.minio_client.bucket_exists,
+                settings.DATASETS_BUCKET
+            )
+        except Exception as e:
+            return {"status": "unavailable", "error": str(e)}
+        return {
+            "status": "connected",
+            "latency_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
     
     def _ensure_buckets_exist(self):
         """Ensure required buckets exist"""
@@ -34,35 +94,50 @@ class FileService:
                     self.minio_client.make_bucket(bucket)
             except S3Error as e:
                 print(f"Error creating bucket {bucket}: {e}")
+        
+        # Pipeline step outputs are only reused by re-runs of a recent pipeline
+        try:
+            self.minio_client.set_bucket_lifecycle(
+                settings.CACHE_BUCKET,
+                LifecycleConfig([
+                    Rule(
+                        ENABLED,
+                        rule_filter=Filter(prefix="pipeline-cache/"),
+                        rule_id="expire-pipeline-cache",
+                        expiration=Expiration(days=settings.PIPELINE_CACHE_TTL_DAYS)
+                    )
+                ])
+            )
+        except S3Error as e:
+            print(f"Error setting lifecycle on bucket {settings.CACHE_BUCKET}: {e}")
+        
+        # Staged uploads are promoted or dropped within the request; this catches ones left by a crash
+        try:
+            self.minio_client.set_bucket_lifecycle(
+                settings.DATASETS_BUCKET,
+                LifecycleConfig([
+                    Rule(
+                        ENABLED,
+                        rule_filter=Filter(prefix=STAGING_PREFIX),
+                        rule_id="expire-staged-uploads",
+                        expiration=Expiration(days=1)
+                    )
+                ])
+            )
+        except S3Error as e:
+            print(f"Error setting lifecycle on bucket {settings.DATASETS_BUCKET}: {e}")
     
     async def save_uploaded_file(self, file: UploadFile, user_id: str) -> Dict[str, Any]:
-        """Save uploaded file and return file info"""
+        """Stage an upload in storage, hashing it in the same pass; promote_upload then files it by content"""
         try:
-            # Generate unique filename
-            file_extension = Path(file.filename).suffix
-            unique_filename = f"{user_id}/{uuid.uuid4()}{file_extension}"
+            head = await file.read(MIME_SNIFF_BYTES)
+            file_type = magic.from_buffer(head, mime=True) if head else "application/x-empty"
+            await file.seek(0)
             
-            # Read file content
-            content = await file.read()
-            file_size = len(content)
-            
-            # Detect file type
-            file_type = magic.from_buffer(content, mime=True)
-            
-            # Save to MinIO
-            try:
-                self.minio_client.put_object(
-                    bucket_name=settings.DATASETS_BUCKET,
-                    object_name=unique_filename,
-                    data=content,
-                    length=file_size,
-                    content_type=file_type
-                )
-            except S3Error as e:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to save file: {str(e)}"
-                )
+            upload = HashingUpload(file)
+            staged_path = f"{STAGING_PREFIX}{user_id}/{uuid.uuid4()}"
+            await self.put_upload(upload, staged_path, file_type)
+            content_hash = upload.digest.hexdigest()
             
             # Extract metadata
             metadata = {
@@ -73,18 +148,239 @@ class FileService:
             }
             
             return {
-                "file_path": unique_filename,
-                "file_size": file_size,
+                "file_path": content_object_name(content_hash),
+                "staged_path": staged_path,
+                "file_size": upload.size,
                 "file_type": self._get_file_category(file_type),
+                "content_hash": content_hash,
                 "metadata": metadata
             }
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"File upload failed: {str(e)}"
             )
     
+    async def promote_upload(self, staged_path: str, object_name: str) -> bool:
+        """File a staged upload under its content key, or drop it if that content is stored; True if it was"""
+        deduplicated = await self.file_exists(object_name)
+        if not deduplicated:
+            # Server-side copy: the bytes are not sent again
+            await self.storage.run(
+                "compose_object",
+                self.minio_client.compose_object,
+                settings.DATASETS_BUCKET,
+                object_name,
+                [ComposeSource(settings.DATASETS_BUCKET, staged_path)]
+            )
+        await self.delete_file(staged_path)
+        return deduplicated
+    
+    async def put_upload(self, file: HashingUpload, object_name: str, content_type: str):
+        """Store an upload from its current position"""
+        chunk_size = settings.upload_chunk_size_bytes
+        first_chunk = await file.read(chunk_size)
+        if len(first_chunk) < chunk_size:
+            # Small file: a single PUT is cheaper than a multipart session
+            await self._put_single(object_name, first_chunk, content_type)
+        else:
+            await self._put_multipart(object_name, file, first_chunk, content_type)
+    
+    async def file_exists(self, file_path: str) -> bool:
+        """Check whether an object is already stored"""
+        try:
+            await self.storage.run(
+                "stat_object",
+                self.minio_client.stat_object,
+                settings.DATASETS_BUCKET, file_path
+            )
+            return True
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject", "ResourceNotFound"):
+                return False
+            raise
+    
+    async def _put_single(self, object_name: str, content: bytes, content_type: str):
+        """Store a small object with a single PUT"""
+        try:
+            await self.storage.run(
+                "put_object",
+                self.minio_client.put_object,
+                bucket_name=settings.DATASETS_BUCKET,
+                object_name=object_name,
+                data=io.BytesIO(content),
+                length=len(content),
+                content_type=content_type
+            )
+        except S3Error as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to save file: {str(e)}"
+            )
+    
+    async def _put_multipart(
+        self,
+        object_name: str,
+        file: HashingUpload,
+        first_chunk: bytes,
+        content_type: str
+    ) -> int:
+        """Push the upload to storage as a multipart upload, one chunk in memory at a time"""
+        chunk_size = settings.upload_chunk_size_bytes
+        bucket = settings.DATASETS_BUCKET
+        
+        upload_id = await self.storage.run(
+            "create_multipart_upload",
+            self.minio_client._create_multipart_upload,
+            bucket, object_name, {"Content-Type": content_type}
+        )
+        parts = []
+        file_size = 0
+        chunk = first_chunk
+        try:
+            while chunk:
+                file_size += len(chunk)
+                if file_size > settings.max_file_size_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File size exceeds maximum limit of {settings.MAX_FILE_SIZE_MB}MB"
+                    )
+                
+                part_number = len(parts) + 1
+                etag = await self.storage.run(
+                    "upload_part",
+                    self.minio_client._upload_part,
+                    bucket, object_name, chunk, None, upload_id, part_number
+                )
+                parts.append(Part(part_number, etag))
+                
+                chunk = await file.read(chunk_size)
+            
+            await self.storage.run(
+                "complete_multipart_upload",
+                self.minio_client._complete_multipart_upload,
+                bucket, object_name, upload_id, parts
+            )
+            return file_size
+        except Exception as e:
+            try:
+                await self.storage.run(
+                    "abort_multipart_upload",
+                    self.minio_client._abort_multipart_upload,
+                    bucket, object_name, upload_id
+                )
+            except S3Error as abort_error:
+                print(f"Error aborting multipart upload {upload_id}: {abort_error}")
+            if isinstance(e, HTTPException):
+                raise
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to save file: {str(e)}"
+            )
+    
+    async def create_multipart_upload(self, user_id: str, filename: str, content_type: str) -> Dict[str, str]:
+        """Start a client-driven multipart upload and return its storage location"""
+        file_extension = Path(filename).suffix
+        unique_filename = f"{user_id}/{uuid.uuid4()}{file_extension}"
+        try:
+            upload_id = await self.storage.run(
+                "create_multipart_upload",
+                self.minio_client._create_multipart_upload,
+                settings.DATASETS_BUCKET, unique_filename, {"Content-Type": content_type}
+            )
+        except S3Error as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to start upload: {str(e)}"
+            )
+        return {"upload_id": upload_id, "file_path": unique_filename}
+    
+    async def upload_part(self, file_path: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """Upload a single numbered part and return its ETag"""
+        try:
+            return await self.storage.run(
+                "upload_part",
+                self.minio_client._upload_part,
+                settings.DATASETS_BUCKET, file_path, data, None, upload_id, part_number
+            )
+        except S3Error as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to upload part {part_number}: {str(e)}"
+            )
+    
+    async def list_parts(self, file_path: str, upload_id: str) -> List[Dict[str, Any]]:
+        """List the parts already stored for a multipart upload"""
+        parts = []
+        marker = None
+        try:
+            while True:
+                result = await self.storage.run(
+                    "list_parts",
+                    self.minio_client._list_parts,
+                    settings.DATASETS_BUCKET, file_path, upload_id,
+                    part_number_marker=marker
+                )
+                parts.extend(
+                    {"part_number": part.part_number, "etag": part.etag, "size": part.size}
+                    for part in result.parts
+                )
+                if not result.is_truncated:
+                    break
+                marker = result.next_part_number_marker
+        except S3Error as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Upload not found: {str(e)}"
+            )
+        return parts
+    
+    async def complete_multipart_upload(
+        self,
+        file_path: str,
+        upload_id: str,
+        parts: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Assemble the uploaded parts into the final object and return file info"""
+        ordered = sorted(parts, key=lambda part: part["part_number"])
+        try:
+            await self.storage.run(
+                "complete_multipart_upload",
+                self.minio_client._complete_multipart_upload,
+                settings.DATASETS_BUCKET, file_path, upload_id,
+                [Part(part["part_number"], part["etag"]) for part in ordered]
+            )
+            stat = await self.stat_file(file_path)
+        except S3Error as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Failed to complete upload: {str(e)}"
+            )
+        
+        # Detect file type from the head of the assembled object
+        head = await self.storage.run("get_object", self.read_range, file_path, 0, MIME_SNIFF_BYTES)
+        file_type = magic.from_buffer(head, mime=True)
+        return {
+            "file_path": file_path,
+            "file_size": stat.size,
+            "file_type": self._get_file_category(file_type),
+            "detected_type": file_type
+        }
+    
+    async def abort_multipart_upload(self, file_path: str, upload_id: str):
+        """Abort a multipart upload and discard its parts"""
+        try:
+            await self.storage.run(
+                "abort_multipart_upload",
+                self.minio_client._abort_multipart_upload,
+                settings.DATASETS_BUCKET, file_path, upload_id
+            )
+        except S3Error as e:
+            print(f"Error aborting multipart upload {upload_id}: {e}")
+    
     def _get_file_category(self, mime_type: str) -> str:
         """Categorize file based on MIME type"""
         if mime_type.startswith('text/'):
@@ -103,10 +399,95 @@ class FileService:
     
     async def get_file(self, file_path: str) -> bytes:
         """Retrieve file from storage"""
+        return await self.storage.run("get_object", self.read_range, file_path, 0, 0)
+    
+    @contextmanager
+    def open_file(self, file_path: str, offset: int = 0, length: int = 0):
+        """Open a stored file as a readable stream without buffering it in memory"""
+        try:
+            with stream_slot():
+                try:
+                    response = self.minio_client.get_object(
+                        bucket_name=settings.DATASETS_BUCKET,
+                        object_name=file_path,
+                        offset=offset,
+                        length=length
+                    )
+                except S3Error as e:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail=f"File not found: {str(e)}"
+                    )
+                try:
+                    yield response
+                finally:
+                    response.close()
+                    response.release_conn()
+        except (StorageBusyError, EmptyPoolError) as e:
+            raise storage_busy(e)
+    
+    async def stat_file(self, file_path: str):
+        """Get stored object info (size, ETag, content type)"""
+        try:
+            return await self.storage.run(
+                "stat_object",
+                self.minio_client.stat_object,
+                settings.DATASETS_BUCKET, file_path
+            )
+        except S3Error as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"File not found: {str(e)}"
+            )
+    
+    async def iter_file(
+        self,
+        file_path: str,
+        offset: int = 0,
+        length: int = 0,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Yield a stored file (or a byte range of it) in fixed-size chunks"""
+        async with async_stream_slot():
+            try:
+                response = await self.storage.run(
+                    "get_object",
+                    self.minio_client.get_object,
+                    bucket_name=settings.DATASETS_BUCKET,
+                    object_name=file_path,
+                    offset=offset,
+                    length=length
+                )
+            except S3Error as e:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"File not found: {str(e)}"
+                )
+            try:
+                while True:
+                    chunk = await self.storage.run("read", response.read, chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+            finally:
+                response.close()
+                response.release_conn()
+    
+    def read_range(
+        self,
+        file_path: str,
+        offset: int,
+        length: int,
+        bucket: Optional[str] = None
+    ) -> bytes:
+        """Read a byte range of a stored file (length 0 reads to the end)"""
+        response = None
         try:
             response = self.minio_client.get_object(
-                bucket_name=settings.DATASETS_BUCKET,
-                object_name=file_path
+                bucket_name=bucket or settings.DATASETS_BUCKET,
+                object_name=file_path,
+                offset=offset,
+                length=length
             )
             return response.read()
         except S3Error as e:
@@ -114,15 +495,67 @@ class FileService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"File not found: {str(e)}"
             )
+        except EmptyPoolError as e:
+            raise storage_busy(e)
+        finally:
+            if response is not None:
+                response.close()
+                response.release_conn()
+    
+    def put_cache_object(self, object_name: str, content: bytes, content_type: str = "application/octet-stream"):
+        """Store a derived artifact in the cache bucket"""
+        self.minio_client.put_object(
+            bucket_name=settings.CACHE_BUCKET,
+            object_name=object_name,
+            data=io.BytesIO(content),
+            length=len(content),
+            content_type=content_type
+        )
+    
+    def remove_file_artifacts(self, file_path: str, content_hash: Optional[str] = None):
+        """Remove a stored file, its row index and (if given) its Parquet copy"""
+        # Imported here: the derived-artifact modules depend on this one
+        from app.services.materialization import parquet_object_name, partitions_object_name
+        from app.services.row_index import row_index_object_name
+        
+        objects = [
+            (settings.DATASETS_BUCKET, file_path),
+            (settings.CACHE_BUCKET, row_index_object_name(file_path))
+        ]
+        if content_hash:
+            objects.append((settings.CACHE_BUCKET, parquet_object_name(content_hash)))
+            objects.append((settings.CACHE_BUCKET, partitions_object_name(content_hash)))
+        for bucket, object_name in objects:
+            try:
+                self.minio_client.remove_object(bucket, object_name)
+            except S3Error as e:
+                print(f"Error deleting {bucket}/{object_name}: {e}")
+    
+    async def release_file(self, file_path: str, content_hash: Optional[str], path_refs: int, hash_refs: int):
+        """Drop one dataset's reference; storage is freed once nothing references it"""
+        if path_refs > 0:
+            return
+        await self.storage.run(
+            "remove_object",
+            self.remove_file_artifacts,
+            file_path,
+            content_hash if hash_refs == 0 else None
+        )
     
     async def delete_file(self, file_path: str) -> bool:
         """Delete file from storage"""
         try:
-            self.minio_client.remove_object(
+            await self.storage.run(
+                "remove_object",
+                self.minio_client.remove_object,
                 bucket_name=settings.DATASETS_BUCKET,
                 object_name=file_path
             )
             return True
         except S3Error as e:
             print(f"Error deleting file {file_path}: {e}")
-            return False
\ No newline at end of file
+            return False
+
+def get_file_service(request: Request) -> FileService:
+    """FileService dependency (the instance is created once in the app lifespan)"""
+    return request.app.state.file_service
@@ -0,0 +1,231 @@
+import hashlib
+import io
+import json
+import tempfile
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterator, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+from minio.error import S3Error
+
+from app.core.config import settings
+from app.services.file_service import FileService
+from app.services.schema_inference import iter_dataframe_chunks
+
+if TYPE_CHECKING:
+    # Only materialize() names it; analysis imports this module and must not pull in the ORM
+    from app.models.dataset import Dataset
+
+# Arrow types for the column types produced by schema inference
+ARROW_TYPES = {
+    "integer": pa.int64(),
+    "float": pa.float64(),
+    "boolean": pa.bool_(),
+    "datetime": pa.timestamp("us", tz="UTC"),
+    "string": pa.string()
+}
+
+class HashingReader(io.RawIOBase):
+    """Readable stream wrapper that computes SHA-256 of everything read through it"""
+
+    def __init__(self, stream: BinaryIO):
+        super().__init__()
+        self._stream = stream
+        self._hash = hashlib.sha256()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self._hash.update(data)
+        return size
+
+    def drain(self, chunk_size: int = 1024 * 1024):
+        """Consume any bytes the parser did not read so the hash covers the whole file"""
+        while self.read(chunk_size):
+            pass
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+def parquet_object_name(content_hash: str) -> str:
+    return f"parquet/{content_hash}.parquet"
+
+def partitions_object_name(content_hash: str) -> str:
+    return f"parquet/{content_hash}.partitions.json"
+
+class RowGroupHasher:
+    """Content fingerprint of one row group, independent of how its rows were batched.
+
+    Equal rows under the same schema hash equally in any file, so a dataset
+    re-uploaded with rows appended shares the fingerprints of its unchanged
+    leading row groups.
+    """
+
+    def __init__(self, schema: pa.Schema):
+        self._hash = hashlib.sha256(str(schema).encode())
+
+    def update(self, frame: pd.DataFrame):
+        self._hash.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+def arrow_schema(schema_info: Dict[str, Any]) -> pa.Schema:
+    """Build the Parquet schema from a dataset's inferred column types"""
+    return pa.schema([
+        pa.field(name, ARROW_TYPES.get(info.get("type"), pa.string()))
+        for name, info in schema_info.get("columns", {}).items()
+    ])
+
+def coerce_chunk(chunk: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+    """Convert a raw DataFrame chunk to the dataset's typed Arrow schema"""
+    arrays = []
+    for field in schema:
+        series = chunk[field.name] if field.name in chunk.columns else pd.Series([None] * len(chunk))
+        if pa.types.is_integer(field.type):
+            series = pd.to_numeric(series, errors="coerce").round().astype("Int64")
+        elif pa.types.is_floating(field.type):
+            series = pd.to_numeric(series, errors="coerce")
+        elif pa.types.is_timestamp(field.type):
+            series = pd.to_datetime(series, errors="coerce", utc=True)
+        elif pa.types.is_boolean(field.type):
+            series = series.astype("boolean")
+        else:
+            series = series.where(series.isna(), series.astype(str))
+        arrays.append(pa.Array.from_pandas(series, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+class MaterializationService:
+    """Typed Parquet copies of datasets, stored in the cache bucket by content hash"""
+
+    def __init__(self, file_service: Optional[FileService] = None):
+        self.file_service = file_service or FileService()
+        self._filesystem = None
+
+    @property
+    def filesystem(self) -> fs.S3FileSystem:
+        # Arrow's S3 client issues ranged GETs, so footers and skipped row groups are never downloaded
+        if self._filesystem is None:
+            self._filesystem = fs.S3FileSystem(
+                access_key=settings.MINIO_ACCESS_KEY,
+                secret_key=settings.MINIO_SECRET_KEY,
+                endpoint_override=settings.MINIO_ENDPOINT,
+                scheme="https" if settings.MINIO_SECURE else "http"
+            )
+        return self._filesystem
+
+    def _parquet_path(self, content_hash: str) -> str:
+        return f"{settings.CACHE_BUCKET}/{parquet_object_name(content_hash)}"
+
+    def is_materialized(self, content_hash: Optional[str]) -> bool:
+        if not content_hash:
+            return False
+        try:
+            self.file_service.minio_client.stat_object(
+                settings.CACHE_BUCKET, parquet_object_name(content_hash)
+            )
+            return True
+        except S3Error:
+            return False
+
+    def materialize(self, dataset: "Dataset") -> str:
+        """Convert the raw dataset to Parquet once and return its content hash"""
+        if self.is_materialized(dataset.content_hash):
+            return dataset.content_hash
+
+        schema = arrow_schema(dataset.schema_info or {})
+        if not len(schema):
+            raise ValueError("Dataset has no inferred schema to materialize")
+
+        partitions = []
+        with tempfile.NamedTemporaryFile(suffix=".parquet") as spool:
+            with self.file_service.open_file(dataset.file_path) as stream:
+                reader = HashingReader(stream)
+                with pq.ParquetWriter(spool.name, schema, compression="zstd") as writer:
+                    chunks = iter_dataframe_chunks(
+                        reader, dataset.file_type, settings.PARQUET_ROW_GROUP_ROWS
+                    )
+                    for chunk in chunks:
+                        # One chunk is one row group
+                        table = coerce_chunk(chunk, schema)
+                        writer.write_table(table)
+                        hasher = RowGroupHasher(schema)
+                        hasher.update(table.to_pandas())
+                        partitions.append(hasher.hexdigest())
+                reader.drain()
+            content_hash = reader.hexdigest()
+
+            # Identical content may already have been materialized for another dataset
+            if not self.is_materialized(content_hash):
+                self.file_service.minio_client.fput_object(
+                    settings.CACHE_BUCKET,
+                    parquet_object_name(content_hash),
+                    spool.name,
+                    content_type="application/vnd.apache.parquet"
+                )
+                self.put_partitions(content_hash, partitions)
+        return content_hash
+
+    def put_partitions(self, content_hash: str, partitions: List[str]):
+        """Store the row group fingerprints used for partition-level incremental recompute"""
+        self.file_service.put_cache_object(
+            partitions_object_name(content_hash),
+            json.dumps({"row_groups": partitions}).encode(),
+            content_type="application/json"
+        )
+
+    def partitions(self, content_hash: str) -> Optional[List[str]]:
+        """Row group fingerprints of a materialized dataset, if they were recorded"""
+        try:
+            content = self.file_service.read_range(
+                partitions_object_name(content_hash), 0, 0, bucket=settings.CACHE_BUCKET
+            )
+        except Exception:
+            return None
+        return json.loads(content)["row_groups"]
+
+    def open(self, content_hash: str, buffer_size: int = 0) -> pq.ParquetFile:
+        """Open the materialized Parquet file without downloading it.
+
+        A positive buffer_size reads column chunks incrementally, so a reader that
+        stops early does not fetch whole row groups.
+        """
+        return pq.ParquetFile(
+            self._parquet_path(content_hash),
+            filesystem=self.filesystem,
+            buffer_size=buffer_size
+        )
+
+    def dataset(self, content_hash: str) -> ds.Dataset:
+        """Materialized dataset for scans with projection and filter pushdown"""
+        return ds.dataset(self._parquet_path(content_hash), filesystem=self.filesystem, format="parquet")
+
+    def read_table(
+        self,
+        content_hash: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Any]] = None
+    ) -> pa.Table:
+        """Read a materialized dataset with column projection and row-group skipping"""
+        return pq.read_table(
+            self._parquet_path(content_hash),
+            filesystem=self.filesystem,
+            columns=columns,
+            filters=filters
+        )
+
+    def iter_batches(
+        self,
+        content_hash: str,
+        columns: Optional[List[str]] = None,
+        batch_size: int = 65536
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream a materialized dataset as record batches"""
+        yield from self.open(content_hash).iter_batches(batch_size=batch_size, columns=columns)
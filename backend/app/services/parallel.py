@@ -0,0 +1,201 @@
+import collections
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from app.core.config import settings
+from app.core.monitoring import pool_metrics
+from app.services.row_index import RowIndexBuilder
+
+# In-memory size of parsed data relative to its stored size, for the memory budget
+CSV_EXPANSION = 5
+PARQUET_EXPANSION = 3
+
+# Bytes read from the source per step while splitting a CSV file
+CSV_READ_SIZE = 1024 * 1024
+
+# A task argument paired with its estimated memory in bytes
+Task = Tuple[Any, int]
+
+def worker_count() -> int:
+    return settings.PARALLEL_WORKERS or os.cpu_count() or 1
+
+class PartitionPool:
+    """Runs partition tasks on worker processes, bounded by the memory of tasks in flight.
+
+    Workers are spawned rather than forked, since the parent may hold threads
+    and open connections; each imports a task's module once and then serves
+    tasks until shutdown. The memory budget is shared by every map() running
+    in the process, whether called from request threads or tasks.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.metrics = pool_metrics("partitions")
+        self._budget = threading.Condition()
+        self._used = 0
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def map(self, function: Callable[[Any], Any], tasks: Iterable[Task]) -> Iterator[Any]:
+        """Apply function to each task's argument, yielding results in task order.
+
+        Submission waits while the tasks in flight across all callers would exceed
+        PARALLEL_MEMORY_MB, so a lazily produced task stream is never read far ahead
+        of the workers. A caller first drains its own tasks, then waits for others'.
+        """
+        in_flight: Deque[Tuple[Future, int, float]] = collections.deque()
+        try:
+            for argument, size in tasks:
+                reserved = False
+                while in_flight:
+                    if len(in_flight) < 2 * self.workers and self._reserve(size, wait=False):
+                        reserved = True
+                        break
+                    yield self._wait(in_flight.popleft())
+                if not reserved:
+                    self._reserve(size, wait=True)
+                self.metrics.in_flight += 1
+                in_flight.append((self._executor.submit(function, argument), size, time.perf_counter()))
+            while in_flight:
+                yield self._wait(in_flight.popleft())
+        finally:
+            # The consumer stopped early or a task failed: drop work nobody will read
+            for future, _, _ in in_flight:
+                future.cancel()
+            self._release(sum(size for _, size, _ in in_flight))
+            self.metrics.in_flight -= len(in_flight)
+
+    def _reserve(self, size: int, wait: bool) -> bool:
+        """Claim size bytes of the shared budget; a task larger than the budget runs alone"""
+        budget = settings.PARALLEL_MEMORY_MB * 1024 * 1024
+        with self._budget:
+            while self._used and self._used + size > budget:
+                if not wait:
+                    return False
+                self._budget.wait()
+            self._used += size
+            return True
+
+    def _release(self, size: int):
+        with self._budget:
+            self._used -= size
+            self._budget.notify_all()
+
+    def _wait(self, entry: Tuple[Future, int, float]) -> Any:
+        future, size, submitted = entry
+        error = False
+        try:
+            return future.result()
+        except Exception:
+            error = True
+            raise
+        finally:
+            self._release(size)
+            self.metrics.in_flight -= 1
+            self.metrics.observe("task", time.perf_counter() - submitted, error)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+_pool: Optional[PartitionPool] = None
+_pool_lock = threading.RLock()
+
+def get_partition_pool() -> Optional[PartitionPool]:
+    """Process-wide worker pool, or None when partitions should run in this process"""
+    global _pool
+    workers = worker_count()
+    # Daemonic processes (multiprocessing pool workers) cannot start children
+    if workers <= 1 or multiprocessing.current_process().daemon:
+        return None
+    with _pool_lock:
+        if _pool is None or _pool.workers != workers:
+            shutdown_partition_pool()
+            _pool = PartitionPool(workers)
+        return _pool
+
+def shutdown_partition_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+def partition_map(function: Callable[[Any], Any], tasks: Iterable[Task]) -> Iterator[Any]:
+    """Run tasks on the worker pool, in this process when there is only one or parallelism is off"""
+    tasks = iter(tasks)
+    head = list(itertools.islice(tasks, 2))
+    pool = get_partition_pool() if len(head) > 1 else None
+    tasks = itertools.chain(head, tasks)
+    if pool is None:
+        return (function(argument) for argument, _ in tasks)
+    return pool.map(function, tasks)
+
+def row_group_partitions(
+    dataset: ds.Dataset,
+    filter: Optional[pc.Expression] = None
+) -> List[Tuple[ds.ParquetFileFragment, int, int]]:
+    """Row groups left after statistics pruning, combined into partitions of about PARALLEL_PARTITION_MB.
+
+    Each partition is a fragment over consecutive row groups of one file,
+    with its estimated memory once read and its row count.
+    """
+    target = settings.PARALLEL_PARTITION_MB * 1024 * 1024
+    partitions = []
+    for fragment in dataset.get_fragments(filter=filter):
+        row_groups, size, rows = [], 0, 0
+        for row_group in fragment.split_by_row_group(filter=filter, schema=dataset.schema):
+            info = row_group.row_groups[0]
+            row_groups.append(info.id)
+            size += info.total_byte_size
+            rows += info.num_rows
+            if size >= target:
+                partitions.append((fragment.format.make_fragment(
+                    fragment.path, fragment.filesystem, row_groups=row_groups
+                ), size * PARQUET_EXPANSION, rows))
+                row_groups, size, rows = [], 0, 0
+        if row_groups:
+            partitions.append((fragment.format.make_fragment(
+                fragment.path, fragment.filesystem, row_groups=row_groups
+            ), size * PARQUET_EXPANSION, rows))
+    return partitions
+
+def csv_partitions(indexer: RowIndexBuilder) -> Iterator[Task]:
+    """Split a CSV stream into byte ranges of about PARALLEL_PARTITION_MB, each led by the header.
+
+    Ranges end at offsets from the row index built while reading, which tracks
+    quote parity, so a quoted newline never splits a row.
+    """
+    target = settings.PARALLEL_PARTITION_MB * 1024 * 1024
+    header: Optional[bytes] = None
+    buffer = bytearray()
+    start = 0
+    produced = False
+    while True:
+        data = indexer.read(CSV_READ_SIZE)
+        buffer += data
+        if header is None and indexer.offsets:
+            # The first indexed offset is the first data row
+            header = bytes(buffer[:indexer.offsets[0]])
+            del buffer[:len(header)]
+            start = len(header)
+        if header is not None and indexer.offsets[-1] - start >= target:
+            cut = indexer.offsets[-1] - start
+            yield header + bytes(buffer[:cut]), (len(header) + cut) * CSV_EXPANSION
+            del buffer[:cut]
+            start += cut
+            produced = True
+        if not data:
+            break
+    if buffer or not produced:
+        content = (header or b"") + bytes(buffer)
+        yield content, len(content) * CSV_EXPANSION
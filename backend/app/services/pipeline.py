@@ -0,0 +1,595 @@
+import functools
+import hashlib
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from app.core.config import settings
+from app.models.dataset import Dataset
+from app.services.analysis import PartialAggregate, filter_expression, validate_aggregations
+from app.services.dataset_writer import DatasetWriter
+from app.services.file_service import FileService
+from app.services.materialization import ARROW_TYPES, MaterializationService, arrow_schema, coerce_chunk
+from app.services.parallel import PARQUET_EXPANSION, partition_map
+from app.services.pipeline_cache import StepCache, output_key, step_fingerprints
+from app.services.pipeline_join import JoinStage, UnionStage
+from app.services.schema_inference import iter_dataframe_chunks
+
+# Row-wise steps; adjacent ones are fused into a single projection and filter
+STREAMING_STEPS = ("filter", "project", "rename", "map")
+# Steps that read another of the pipeline's source datasets
+SOURCE_STEPS = {"join": JoinStage, "union": UnionStage}
+STEP_TYPES = STREAMING_STEPS + ("aggregate", "limit") + tuple(SOURCE_STEPS)
+
+# Reads a source: callable(columns=None, filter=None) -> record batches
+Reader = Callable[..., Iterator[pa.RecordBatch]]
+
+# Map step functions and the Arrow compute functions behind them
+MAP_FUNCTIONS = {
+    "add": "add",
+    "subtract": "subtract",
+    "multiply": "multiply",
+    "divide": "divide",
+    "abs": "abs",
+    "negate": "negate",
+    "round": "round",
+    "upper": "utf8_upper",
+    "lower": "utf8_lower",
+    "trim": "utf8_trim_whitespace",
+    "length": "utf8_length",
+    "year": "year",
+    "month": "month",
+    "day": "day",
+    "coalesce": "coalesce"
+}
+
+def _argument(argument: Any, columns: Dict[str, pc.Expression]) -> pc.Expression:
+    """A map argument: {"column": name} for a column, anything else for a literal"""
+    if isinstance(argument, dict) and "column" in argument:
+        if argument["column"] not in columns:
+            raise ValueError(f"Unknown column: {argument['column']}")
+        return columns[argument["column"]]
+    value = argument.get("value") if isinstance(argument, dict) else argument
+    return pc.scalar(value)
+
+def map_expression(step: Dict[str, Any], columns: Dict[str, pc.Expression]) -> pc.Expression:
+    function = step.get("function")
+    arguments = [_argument(argument, columns) for argument in step.get("arguments") or []]
+    if not arguments:
+        raise ValueError(f"Map function {function} needs arguments")
+    if function == "cast":
+        if step.get("to") not in ARROW_TYPES:
+            raise ValueError(f"Cannot cast to {step.get('to')}")
+        return arguments[0].cast(ARROW_TYPES[step["to"]])
+    if function == "concat":
+        return pc.binary_join_element_wise(*[argument.cast(pa.string()) for argument in arguments], "")
+    if function == "divide":
+        # True division, also for integer columns
+        arguments = [argument.cast(pa.float64()) for argument in arguments]
+    if function not in MAP_FUNCTIONS:
+        raise ValueError(f"Unsupported map function: {function}")
+    return getattr(pc, MAP_FUNCTIONS[function])(*arguments)
+
+def target_steps(target_schema: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Steps that cast and order the output to the pipeline's target schema, if it sets columns"""
+    steps = []
+    columns = (target_schema or {}).get("columns") or {}
+    for name, info in columns.items():
+        data_type = info.get("type") if isinstance(info, dict) else info
+        steps.append({"type": "map", "column": name, "function": "cast", "arguments": [{"column": name}], "to": data_type})
+    if columns:
+        steps.append({"type": "project", "columns": list(columns)})
+    return steps
+
+class FusedStage:
+    """Adjacent row-wise steps evaluated as one projection and one filter.
+
+    Every output column is kept as an expression over the stage's input, so a
+    filter on a derived column is rewritten against the input columns and the
+    whole run of steps executes as a single scan, without intermediate tables.
+    """
+
+    def __init__(self, input_schema: pa.Schema):
+        self.input_schema = input_schema
+        self.schema = input_schema
+        self.steps: List[int] = []
+        self.columns: Dict[str, pc.Expression] = {name: pc.field(name) for name in input_schema.names}
+        self.filter: Optional[pc.Expression] = None
+
+    def _require(self, names):
+        missing = sorted(set(names) - set(self.columns))
+        if missing:
+            raise ValueError(f"Unknown columns: {', '.join(missing)}")
+
+    def add(self, index: int, step: Dict[str, Any]):
+        kind = step["type"]
+        if kind == "filter":
+            conditions = step.get("conditions") or []
+            self._require(condition["column"] for condition in conditions)
+            term = filter_expression(conditions, self.schema, self.columns)
+            if term is not None:
+                self.filter = term if self.filter is None else self.filter & term
+        elif kind == "project":
+            names = step.get("columns") or []
+            if not names:
+                raise ValueError("Project step needs at least one column")
+            self._require(names)
+            self.columns = {name: self.columns[name] for name in names}
+        elif kind == "rename":
+            mapping = step.get("columns") or {}
+            self._require(mapping)
+            renamed = [mapping.get(name, name) for name in self.columns]
+            if len(set(renamed)) != len(renamed):
+                raise ValueError("Rename step produces duplicate column names")
+            self.columns = dict(zip(renamed, self.columns.values()))
+        elif kind == "map":
+            if not step.get("column"):
+                raise ValueError("Map step needs an output column")
+            self.columns = {**self.columns, step["column"]: map_expression(step, self.columns)}
+        self.steps.append(index)
+        self.schema = self._output_schema()
+
+    def prune(self, names: List[str]):
+        """Compute only the columns a later stage reads"""
+        self.columns = {name: self.columns[name] for name in names}
+        self.schema = self._output_schema()
+
+    def _output_schema(self) -> pa.Schema:
+        # Evaluating on an empty table type-checks the expressions without reading data
+        try:
+            return ds.dataset(self.input_schema.empty_table()).to_table(
+                columns=self.columns, filter=self.filter
+            ).schema
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+            raise ValueError(str(e))
+
+    def scan(self, read: Reader) -> Iterator[pa.RecordBatch]:
+        """Read the source with this stage's projection and filter pushed into the scan"""
+        return read(columns=self.columns, filter=self.filter)
+
+    def apply(self, batches: Iterator[pa.RecordBatch]) -> Iterator[pa.RecordBatch]:
+        return ds.Scanner.from_batches(
+            batches, schema=self.input_schema, columns=self.columns, filter=self.filter
+        ).to_batches()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "stage": "fused",
+            "steps": self.steps,
+            "columns": list(self.columns),
+            "filter": str(self.filter) if self.filter is not None else None
+        }
+
+class AggregateStage:
+    """Group-by aggregation, a pipeline breaker whose memory is bounded by the number of groups"""
+
+    def __init__(self, index: int, step: Dict[str, Any], input_schema: pa.Schema):
+        group_by = step.get("group_by") or []
+        aggregations = step.get("aggregations") or [{"function": "count"}]
+        referenced = list(group_by) + [a["column"] for a in aggregations if a.get("column")]
+        missing = sorted(set(referenced) - set(input_schema.names))
+        if missing:
+            raise ValueError(f"Unknown columns: {', '.join(missing)}")
+        validate_aggregations(aggregations, input_schema)
+
+        self.steps = [index]
+        self.input_schema = input_schema
+        self.aggregate = PartialAggregate(group_by, aggregations)
+        self.schema = self.finalize([]).schema
+
+    @property
+    def input_columns(self) -> List[str]:
+        # Counting rows still needs one column to scan
+        return self.aggregate.input_columns or self.input_schema.names[:1]
+
+    def finalize(self, partials: Iterable[pa.Table]) -> pa.Table:
+        return self.aggregate.finalize(self.combine(partials))
+
+    def partials(self, batches: Iterable[pa.RecordBatch]) -> Iterator[pa.Table]:
+        """Partial states, one per chunk of PIPELINE_CHUNK_ROWS input rows"""
+        pending, pending_rows = [], 0
+        for batch in batches:
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            if pending_rows >= settings.PIPELINE_CHUNK_ROWS:
+                yield self.aggregate.partial(pa.Table.from_batches(pending))
+                pending, pending_rows = [], 0
+        if pending:
+            yield self.aggregate.partial(pa.Table.from_batches(pending))
+
+    def combine(self, partials: Iterable[pa.Table]) -> pa.Table:
+        """Merge partial states into one, unfinalized so it can be merged again"""
+        merged, merged_rows = [], 0
+        for partial in partials:
+            merged.append(partial)
+            merged_rows += len(partial)
+            if merged_rows >= settings.ANALYSIS_CHUNK_ROWS:
+                # High-cardinality group-bys: fold partials early to bound memory
+                merged = [self.aggregate.merge(merged)]
+                merged_rows = len(merged[0])
+        if not merged:
+            merged = [self.aggregate.partial(self.input_schema.empty_table().select(self.input_columns))]
+        return self.aggregate.merge(merged)
+
+    def partial(self, batches: Iterable[pa.RecordBatch]) -> pa.Table:
+        """Merged partial state of one input partition"""
+        return self.combine(self.partials(batches))
+
+    def scan(self, read: Reader) -> Iterator[pa.RecordBatch]:
+        return self.apply(read(columns=self.input_columns))
+
+    def apply(self, batches: Iterator[pa.RecordBatch]) -> Iterator[pa.RecordBatch]:
+        yield from self.finalize(self.partials(batches)).to_batches()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "stage": "aggregate",
+            "steps": self.steps,
+            "group_by": self.aggregate.group_by,
+            "columns_read": self.input_columns,
+            # Part of the cache fingerprint, so partials cached with other states are not merged
+            "states": list(self.aggregate.states)
+        }
+
+class LimitStage:
+    """First N rows; stops pulling from upstream once they are produced"""
+
+    def __init__(self, index: int, step: Dict[str, Any], input_schema: pa.Schema):
+        rows = step.get("rows")
+        if not isinstance(rows, int) or rows < 0:
+            raise ValueError("Limit step needs a non-negative number of rows")
+        self.steps = [index]
+        self.rows = rows
+        self.schema = input_schema
+
+    def scan(self, read: Reader) -> Iterator[pa.RecordBatch]:
+        return self.apply(read())
+
+    def apply(self, batches: Iterator[pa.RecordBatch]) -> Iterator[pa.RecordBatch]:
+        remaining = self.rows
+        for batch in batches:
+            if remaining <= 0:
+                break
+            batch = batch.slice(0, remaining)
+            remaining -= batch.num_rows
+            yield batch
+
+    def describe(self) -> Dict[str, Any]:
+        return {"stage": "limit", "steps": self.steps, "rows": self.rows}
+
+class PipelineSource:
+    """A dataset read as a stream of record batches, from its Parquet copy when materialized"""
+
+    def __init__(self, dataset: Dataset, file_service: FileService):
+        self.dataset = dataset
+        self.file_service = file_service
+        self.materialization = MaterializationService(file_service)
+        self.materialized = self.materialization.is_materialized(dataset.content_hash)
+        if self.materialized:
+            self._parquet = self.materialization.dataset(dataset.content_hash)
+            self.schema = self._parquet.schema
+        else:
+            self.schema = arrow_schema(dataset.schema_info or {})
+        if not len(self.schema):
+            raise ValueError(f"Dataset {dataset.id} has no inferred schema")
+
+    def partitions(self) -> List[Tuple[str, Optional[ds.Fragment]]]:
+        """(fingerprint, row group) pairs; the whole source is one partition unless materialized"""
+        if not self.materialized:
+            fingerprint = hashlib.sha256(f"{self.dataset.content_hash}:{self.schema}".encode()).hexdigest()
+            return [(fingerprint, None)]
+        row_groups = [
+            row_group
+            for fragment in self._parquet.get_fragments()
+            for row_group in fragment.split_by_row_group()
+        ]
+        fingerprints = self.materialization.partitions(self.dataset.content_hash)
+        if not fingerprints or len(fingerprints) != len(row_groups):
+            # Materialized before fingerprints were recorded: only reusable for the same content
+            fingerprints = [f"{self.dataset.content_hash}:{index}" for index in range(len(row_groups))]
+        return list(zip(fingerprints, row_groups))
+
+    def fingerprint(self, partitions: Optional[List[Tuple[str, Optional[ds.Fragment]]]] = None) -> str:
+        """Fingerprint of the whole source's content, changing whenever any partition does"""
+        partitions = self.partitions() if partitions is None else partitions
+        return hashlib.sha256("".join(fingerprint for fingerprint, _ in partitions).encode()).hexdigest()
+
+    def scan(
+        self,
+        columns: Optional[Any] = None,
+        filter: Optional[pc.Expression] = None
+    ) -> Iterator[pa.RecordBatch]:
+        if self.materialized:
+            # Only referenced columns are read, and row groups the filter excludes are skipped
+            return self._parquet.scanner(columns=columns, filter=filter).to_batches()
+        batches = self._raw_batches()
+        if columns is None and filter is None:
+            return batches
+        return ds.Scanner.from_batches(batches, schema=self.schema, columns=columns, filter=filter).to_batches()
+
+    def _raw_batches(self) -> Iterator[pa.RecordBatch]:
+        with self.file_service.open_file(self.dataset.file_path) as stream:
+            for chunk in iter_dataframe_chunks(stream, self.dataset.file_type, settings.PIPELINE_CHUNK_ROWS):
+                yield from coerce_chunk(chunk, self.schema).to_batches()
+
+class PipelinePlan:
+    """A compiled pipeline: a chain of stages pulled lazily, batch by batch, from the source"""
+
+    def __init__(self, source_schema: pa.Schema, stages: List[Any]):
+        self.source_schema = source_schema
+        self.stages = stages
+
+    @property
+    def schema(self) -> pa.Schema:
+        return self.stages[-1].schema if self.stages else self.source_schema
+
+    def bind(self, sources: Dict[str, PipelineSource]):
+        """Attach the source datasets that join and union stages read"""
+        for stage in self.stages:
+            if isinstance(stage, tuple(SOURCE_STEPS.values())):
+                stage.source = sources[stage.dataset_id]
+
+    def execute(self, source: PipelineSource) -> Iterator[pa.RecordBatch]:
+        if not self.stages:
+            return source.scan()
+        # The first stage reads the source itself, so its projection and filters push down
+        batches = self.stages[0].scan(source.scan)
+        for stage in self.stages[1:]:
+            batches = stage.apply(batches)
+        return batches
+
+    def describe(self) -> List[Dict[str, Any]]:
+        return [stage.describe() for stage in self.stages]
+
+def compile_pipeline(
+    steps: List[Dict[str, Any]],
+    source_schema: pa.Schema,
+    datasets: Optional[Dict[str, Dict[str, Any]]] = None
+) -> PipelinePlan:
+    """Validate steps against the source schema and group them into stages.
+
+    datasets maps the ids of the pipeline's other source datasets to their
+    schema_info, for join and union steps.
+    """
+    stages: List[Any] = []
+    schema = source_schema
+    for index, step in enumerate(steps):
+        kind = step.get("type") if isinstance(step, dict) else None
+        try:
+            if kind in STREAMING_STEPS:
+                if not stages or not isinstance(stages[-1], FusedStage):
+                    stages.append(FusedStage(schema))
+                stages[-1].add(index, step)
+            elif kind == "aggregate":
+                stages.append(AggregateStage(index, step, schema))
+            elif kind == "limit":
+                stages.append(LimitStage(index, step, schema))
+            elif kind in SOURCE_STEPS:
+                dataset_id = str(step.get("dataset"))
+                if dataset_id not in (datasets or {}):
+                    raise ValueError(f"Dataset {dataset_id} is not a source of this pipeline")
+                stages.append(SOURCE_STEPS[kind](index, step, schema, datasets[dataset_id]))
+            else:
+                raise ValueError(f"Unsupported step type: {kind}")
+        except (KeyError, TypeError, ValueError, pa.ArrowException) as e:
+            raise ValueError(f"Step {index + 1}: {e}")
+        schema = stages[-1].schema
+
+    # Projection pushdown: row-wise steps feeding an aggregate keep only its input columns
+    for stage, following in zip(stages, stages[1:]):
+        if isinstance(stage, FusedStage) and isinstance(following, AggregateStage):
+            stage.prune(following.input_columns)
+    return PipelinePlan(source_schema, stages)
+
+def partition_output(
+    task: Tuple[List[Any], List[str], ds.Fragment, pa.Schema, StepCache]
+) -> Tuple[pa.Table, Optional[int], int]:
+    """Output of the partitioned stages over one row group, from the deepest cached stage on.
+
+    Runs in a partition worker. Returns the output, the index of the stage read
+    from the cache (None if none was) and the index of the first stage computed.
+    """
+    stages, keys, partition, schema, cache = task
+    table, hit, start = None, None, 0
+    for index in reversed(range(len(stages))):
+        table = cache.get_table(keys[index])
+        if table is not None:
+            hit, start = index, index + 1
+            break
+
+    read = functools.partial(partition.to_batches, schema=schema)
+    for index in range(start, len(stages)):
+        stage = stages[index]
+        if isinstance(stage, AggregateStage):
+            table = stage.partial(read(columns=stage.input_columns) if table is None else table.to_batches())
+        else:
+            batches = stage.scan(read) if table is None else stage.apply(table.to_batches())
+            table = pa.Table.from_batches(list(batches), schema=stage.schema)
+        cache.put_table(keys[index], table)
+    return table, hit, start
+
+def stage_fingerprint(stage: Any, fingerprints: List[str]) -> str:
+    """Fingerprint of a stage's output: its last step's, plus the columns projection pushdown kept"""
+    description = json.dumps(stage.describe(), sort_keys=True, default=str)
+    return hashlib.sha256(f"{fingerprints[stage.steps[-1]]}:{description}".encode()).hexdigest()
+
+class IncrementalExecution:
+    """Executes a plan, reusing stage outputs cached by earlier runs.
+
+    Outputs are cached at stage boundaries: fused steps run as one pass, so only
+    the last one's output exists. The leading row-wise stage, and an aggregate
+    directly after it, run per source row group across the worker pool and are
+    cached per partition, so after an append only the new row groups are
+    computed; the aggregate's per-partition partial states are then merged.
+    Later stages are cached over their whole input, and a run resumes after the
+    deepest cached stage.
+    """
+
+    def __init__(self, plan: PipelinePlan, steps: List[Dict[str, Any]], source: PipelineSource, cache: StepCache):
+        self.plan = plan
+        self.steps = steps
+        self.source = source
+        self.cache = cache
+        # Steps reading another dataset also depend on its content
+        keyed = list(steps)
+        for stage in plan.stages:
+            if isinstance(stage, tuple(SOURCE_STEPS.values())):
+                keyed[stage.steps[0]] = {**keyed[stage.steps[0]], "source": stage.source.fingerprint()}
+        fingerprints = step_fingerprints(keyed)
+        self.fingerprints = [stage_fingerprint(stage, fingerprints) for stage in plan.stages]
+        self.partitions = source.partitions()
+        self.source_fingerprint = source.fingerprint(self.partitions)
+        # A raw source is read as one stream; per-partition caching would hold it all in memory
+        self.partitioned = self._partitioned_stages() if source.materialized else 0
+        self.hits = [0] * len(plan.stages)
+        self.computed = [0] * len(plan.stages)
+        self.recomputed_partitions = 0
+
+    def _partitioned_stages(self) -> int:
+        count = 0
+        for stage in self.plan.stages:
+            if isinstance(stage, AggregateStage):
+                return count + 1
+            if not isinstance(stage, FusedStage):
+                break
+            count += 1
+        return count
+
+    def _whole_key(self, index: int) -> str:
+        return output_key(self.fingerprints[index], self.source_fingerprint)
+
+    def execute(self) -> Iterator[pa.RecordBatch]:
+        stages = self.plan.stages
+        if not stages:
+            return self.source.scan()
+
+        # Whole outputs are stored past the partitioned stages, and for an aggregate ending them
+        first_whole = self.partitioned
+        if first_whole and isinstance(stages[first_whole - 1], AggregateStage):
+            first_whole -= 1
+        start, batches = 0, None
+        for index in reversed(range(first_whole, len(stages))):
+            key = self._whole_key(index)
+            if self.cache.exists(key):
+                # An aggregate ending the partitioned stages reuses every partition's state
+                self.hits[index] += len(self.partitions) if index < self.partitioned else 1
+                start, batches = index + 1, self.cache.scan(key)
+                break
+        if batches is None and self.partitioned:
+            start, batches = self.partitioned, self._partitioned_output()
+
+        for index in range(start, len(stages)):
+            stage = stages[index]
+            output = stage.scan(self.source.scan) if batches is None else stage.apply(batches)
+            batches = self._cached(index, output)
+        return batches
+
+    def _cached(self, index: int, batches: Iterator[pa.RecordBatch]) -> Iterator[pa.RecordBatch]:
+        self.computed[index] += 1
+        yield from self.cache.tee(self._whole_key(index), self.plan.stages[index].schema, batches)
+
+    def _partitioned_output(self) -> Iterator[pa.RecordBatch]:
+        outputs = self._partition_outputs()
+        last = self.partitioned - 1
+        stage = self.plan.stages[last]
+        if not isinstance(stage, AggregateStage):
+            for table in outputs:
+                yield from table.to_batches()
+            return
+        table = stage.finalize(outputs)
+        self.cache.put_table(self._whole_key(last), table)
+        yield from table.to_batches()
+
+    def _partition_outputs(self) -> Iterator[pa.Table]:
+        """Outputs of the partitioned stages per row group, computed across the worker pool"""
+        stages = self.plan.stages[:self.partitioned]
+        tasks = (
+            (
+                (stages, [output_key(key, fingerprint) for key in self.fingerprints[:self.partitioned]],
+                 partition, self.source.schema, self.cache),
+                partition.row_groups[0].total_byte_size * PARQUET_EXPANSION
+            )
+            for fingerprint, partition in self.partitions
+        )
+        for table, hit, start in partition_map(partition_output, tasks):
+            if hit is not None:
+                self.hits[hit] += 1
+            for index in range(start, self.partitioned):
+                self.computed[index] += 1
+            if start < self.partitioned:
+                self.recomputed_partitions += 1
+            yield table
+
+    def stats(self, step_count: int) -> Dict[str, Any]:
+        """Cache outcome of each of the pipeline's own steps, and how many partitions were recomputed"""
+        steps = []
+        for index, stage in enumerate(self.plan.stages):
+            hits, computed = self.hits[index], self.computed[index]
+            if hits and computed:
+                outcome = "partial"
+            elif computed:
+                outcome = "miss"
+            else:
+                outcome = "hit" if hits else "skipped"
+            for step in stage.steps:
+                if step >= step_count:
+                    continue
+                entry = {"step": step + 1, "type": self.steps[step]["type"], "stage": index, "cache": outcome}
+                if index < self.partitioned:
+                    entry["partitions_hit"] = hits
+                    entry["partitions_computed"] = computed
+                steps.append(entry)
+        return {
+            "steps": steps,
+            "partitions": {"total": len(self.partitions), "recomputed": self.recomputed_partitions}
+        }
+
+class PipelineRunner:
+    """Streams a pipeline from its source datasets into a new dataset"""
+
+    def __init__(self, file_service: Optional[FileService] = None):
+        self.file_service = file_service or FileService()
+
+    def run(
+        self,
+        steps: List[Dict[str, Any]],
+        target_schema: Dict[str, Any],
+        source_datasets: List[Dataset],
+        lock_object: Optional[Callable[[str], Any]] = None
+    ) -> Dict[str, Any]:
+        """Run the steps over the first source and return the output dataset's storage fields and run stats"""
+        sources = {
+            str(dataset.id): PipelineSource(dataset, self.file_service)
+            for dataset in source_datasets
+        }
+        source = sources[str(source_datasets[0].id)]
+        all_steps = list(steps) + target_steps(target_schema)
+        # The other sources are read by join and union steps
+        datasets = {str(dataset.id): dataset.schema_info or {} for dataset in source_datasets[1:]}
+        plan = compile_pipeline(all_steps, source.schema, datasets)
+        plan.bind(sources)
+        execution = None
+        if settings.PIPELINE_STEP_CACHE:
+            execution = IncrementalExecution(plan, all_steps, source, StepCache(self.file_service))
+            batches = execution.execute()
+        else:
+            batches = plan.execute(source)
+
+        rows = 0
+        with DatasetWriter(plan.schema, self.file_service) as writer:
+            for batch in batches:
+                writer.write(batch)
+                rows += batch.num_rows
+            output = writer.close(lock_object)
+
+        stats = {
+            "source": "parquet" if source.materialized else "raw",
+            "stages": plan.describe(),
+            "rows_written": rows
+        }
+        if execution:
+            stats.update(execution.stats(len(steps)))
+        return {"dataset": output, "stats": stats}
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import logging
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from minio.error import S3Error
+
+from app.core.config import settings
+from app.services.file_service import FileService
+from app.services.materialization import MaterializationService
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "pipeline-cache"
+
+def step_fingerprints(steps: List[Dict[str, Any]]) -> List[str]:
+    """Fingerprint of each step's definition chained with every step before it"""
+    fingerprints, previous = [], ""
+    for step in steps:
+        definition = json.dumps(step, sort_keys=True, default=str)
+        previous = hashlib.sha256(f"{previous}:{definition}".encode()).hexdigest()
+        fingerprints.append(previous)
+    return fingerprints
+
+def output_key(step_fingerprint: str, input_fingerprint: str) -> str:
+    """Cache key of a step's output over one input (a whole source or one partition)"""
+    return hashlib.sha256(f"{step_fingerprint}:{input_fingerprint}".encode()).hexdigest()
+
+def cache_object_name(key: str) -> str:
+    return f"{CACHE_PREFIX}/{key[:2]}/{key}.parquet"
+
+class StepCache:
+    """Pipeline step outputs stored as Parquet in the cache bucket.
+
+    Partition outputs are small (one source row group) and are read and written
+    whole; outputs over a whole source are streamed in and out, so neither
+    has to fit in memory. Entries expire through the bucket lifecycle rule.
+    """
+
+    def __init__(self, file_service: Optional[FileService] = None):
+        self.file_service = file_service or FileService()
+        self.materialization = MaterializationService(self.file_service)
+
+    def __reduce__(self):
+        # Partition workers open their own storage clients
+        return (StepCache, ())
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.file_service.minio_client.stat_object(settings.CACHE_BUCKET, cache_object_name(key))
+            return True
+        except S3Error:
+            return False
+
+    def get_table(self, key: str) -> Optional[pa.Table]:
+        try:
+            content = self.file_service.read_range(cache_object_name(key), 0, 0, bucket=settings.CACHE_BUCKET)
+        except Exception:
+            return None
+        return pq.read_table(pa.BufferReader(content))
+
+    def put_table(self, key: str, table: pa.Table):
+        buffer = pa.BufferOutputStream()
+        pq.write_table(table, buffer, compression="zstd")
+        try:
+            self.file_service.put_cache_object(
+                cache_object_name(key), buffer.getvalue().to_pybytes(), content_type="application/vnd.apache.parquet"
+            )
+        except Exception as e:
+            logger.warning(f"Could not cache pipeline step output {key}: {e}")
+
+    def scan(self, key: str) -> Iterator[pa.RecordBatch]:
+        return ds.dataset(
+            f"{settings.CACHE_BUCKET}/{cache_object_name(key)}",
+            filesystem=self.materialization.filesystem,
+            format="parquet"
+        ).to_batches()
+
+    def tee(self, key: str, schema: pa.Schema, batches: Iterator[pa.RecordBatch]) -> Iterator[pa.RecordBatch]:
+        """Pass batches through while spooling them; stored only once the stream is fully consumed"""
+        with tempfile.NamedTemporaryFile(suffix=".parquet") as spool:
+            with pq.ParquetWriter(spool.name, schema, compression="zstd") as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+                    yield batch
+            try:
+                self.file_service.minio_client.fput_object(
+                    settings.CACHE_BUCKET,
+                    cache_object_name(key),
+                    spool.name,
+                    content_type="application/vnd.apache.parquet"
+                )
+            except Exception as e:
+                logger.warning(f"Could not cache pipeline step output {key}: {e}")
@@ -0,0 +1,445 @@
+import itertools
+import logging
+import math
+import os
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.acero as acero
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+
+from app.core.config import settings
+from app.services.materialization import arrow_schema
+
+logger = logging.getLogger(__name__)
+
+# Join step "how" values and the Acero join types behind them
+JOIN_TYPES = {
+    "inner": "inner",
+    "left": "left outer",
+    "right": "right outer",
+    "outer": "full outer",
+    "semi": "left semi",
+    "anti": "left anti"
+}
+
+# Join types that keep unmatched rows of the joined dataset, so its null keys must be kept too
+KEEPS_RIGHT_ROWS = ("right", "outer")
+
+# Bytes per value of fixed-width column types, for estimating a dataset's size from its profile
+TYPE_WIDTHS = {"integer": 8, "float": 8, "datetime": 8, "boolean": 1}
+
+# Bounds on the number of partitions a spilled join is split into
+MIN_JOIN_PARTITIONS = 2
+MAX_JOIN_PARTITIONS = 256
+
+# Rows buffered per partition before a batch is written to its spill file
+SPILL_BATCH_ROWS = 16384
+
+# Bytes buffered across all partitions before every buffer is written out
+SPILL_BUFFER_BYTES = 64 * 1024 * 1024
+
+# Prefix of the names right-hand join keys take inside a join
+RIGHT_KEY_PREFIX = "__right_key_"
+
+# Times an oversized partition is split again, each time hashing with a new seed
+MAX_REPARTITION_DEPTH = 3
+
+def estimated_bytes(schema_info: Dict[str, Any], columns: Optional[Iterable[str]] = None) -> Optional[int]:
+    """In-memory size of a dataset's columns estimated from its profile, None if it was never profiled"""
+    rows = ((schema_info or {}).get("basic_stats") or {}).get("row_count")
+    profiles = (schema_info or {}).get("columns") or {}
+    if rows is None or not profiles:
+        return None
+    names = set(columns) if columns is not None else set(profiles)
+    width = 0.0
+    for name, info in profiles.items():
+        if name not in names:
+            continue
+        if info.get("type") in TYPE_WIDTHS:
+            width += TYPE_WIDTHS[info["type"]]
+        else:
+            # Average of the shortest and longest value, plus the 4-byte offset
+            width += (info.get("min_length", 0) + info.get("max_length", 0)) / 2 + 4
+    return int(rows * width)
+
+def conform(batch: pa.RecordBatch, schema: pa.Schema) -> pa.RecordBatch:
+    """Cast a batch to a schema by column name, filling columns it lacks with nulls"""
+    arrays = [
+        batch.column(field.name).cast(field.type) if field.name in batch.schema.names
+        else pa.nulls(batch.num_rows, field.type)
+        for field in schema
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def _remix(hashes: np.ndarray, seed: int) -> np.ndarray:
+    """Seeded splitmix64 finalizer; a bijection, so equal hashes stay equal and others scatter anew"""
+    mixed = hashes + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15)
+    mixed = (mixed ^ (mixed >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    mixed = (mixed ^ (mixed >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return mixed ^ (mixed >> np.uint64(31))
+
+def partition_ids(batch: pa.RecordBatch, keys: List[str], count: int, seed: int = 0) -> np.ndarray:
+    """Partition of each row by a hash of its key columns; equal keys of equal types agree across inputs.
+
+    A different seed changes the hash itself, not just an offset, so rows that
+    shared a partition are spread over new ones.
+    """
+    hashes = np.zeros(batch.num_rows, dtype=np.uint64)
+    for key in keys:
+        column = batch.column(key)
+        # Null keys never match, so any partition will do; filling keeps the numpy type stable
+        values = pc.fill_null(column, pa.scalar(0).cast(column.type)).to_numpy(zero_copy_only=False)
+        hashes = hashes * np.uint64(31) + pd.util.hash_array(values)
+    if seed:
+        hashes = _remix(hashes, seed)
+    return (hashes % np.uint64(count)).astype(np.int64)
+
+class PartitionSpill:
+    """Rows hash-partitioned by key into Arrow IPC files on local disk"""
+
+    def __init__(self, directory: str, name: str, schema: pa.Schema, keys: List[str], count: int, seed: int = 0):
+        self.directory = directory
+        self.name = name
+        self.schema = schema
+        self.keys = keys
+        self.seed = seed
+        self.paths = [os.path.join(directory, f"{name}-{index}.arrow") for index in range(count)]
+        # In-memory bytes written to each partition
+        self.sizes = [0] * count
+        self._writers: Dict[int, ipc.RecordBatchFileWriter] = {}
+        self._pending: Dict[int, List[pa.RecordBatch]] = {}
+        self._pending_rows: Dict[int, int] = {}
+        self._pending_bytes = 0
+
+    def write_all(self, batches: Iterable[pa.RecordBatch]):
+        for batch in batches:
+            self.write(batch)
+        self.close()
+
+    def write(self, batch: pa.RecordBatch):
+        if not batch.num_rows:
+            return
+        if len(self.paths) == 1:
+            self._buffer(0, batch)
+            return
+        ids = partition_ids(batch, self.keys, len(self.paths), self.seed)
+        counts = np.bincount(ids, minlength=len(self.paths))
+        ordered = batch.take(pa.array(np.argsort(ids, kind="stable")))
+        offset = 0
+        for partition, rows in enumerate(counts.tolist()):
+            if not rows:
+                continue
+            self._buffer(partition, ordered.slice(offset, rows))
+            offset += rows
+        if self._pending_bytes > SPILL_BUFFER_BYTES:
+            for partition in list(self._pending):
+                self._flush(partition)
+
+    def _buffer(self, partition: int, batch: pa.RecordBatch):
+        self._pending.setdefault(partition, []).append(batch)
+        self._pending_rows[partition] = self._pending_rows.get(partition, 0) + batch.num_rows
+        self._pending_bytes += batch.nbytes
+        if self._pending_rows[partition] >= SPILL_BATCH_ROWS:
+            self._flush(partition)
+
+    def _flush(self, partition: int):
+        if partition not in self._writers:
+            self._writers[partition] = ipc.new_file(self.paths[partition], self.schema)
+        table = pa.Table.from_batches(self._pending.pop(partition), schema=self.schema)
+        self._writers[partition].write_table(table)
+        self.sizes[partition] += table.nbytes
+        self._pending_rows[partition] = 0
+        self._pending_bytes -= table.nbytes
+
+    def close(self):
+        for partition in list(self._pending):
+            self._flush(partition)
+        for writer in self._writers.values():
+            writer.close()
+
+    def dataset(self, partition: int) -> ds.Dataset:
+        if partition not in self._writers:
+            return ds.InMemoryDataset(self.schema.empty_table())
+        return ds.dataset(self.paths[partition], format="ipc")
+
+    def read(self, partition: int) -> pa.Table:
+        if partition not in self._writers:
+            return self.schema.empty_table()
+        with ipc.open_file(self.paths[partition]) as reader:
+            return reader.read_all()
+
+    def batches(self, partition: int) -> Iterator[pa.RecordBatch]:
+        """Stream a partition back one spilled batch at a time"""
+        if partition not in self._writers:
+            return
+        with ipc.open_file(self.paths[partition]) as reader:
+            for index in range(reader.num_record_batches):
+                yield reader.get_batch(index)
+
+    def split(self, partition: int, count: int) -> "PartitionSpill":
+        """Spill one partition's rows into count new partitions, hashed with the next seed"""
+        spill = PartitionSpill(
+            self.directory, f"{self.name}-{partition}", self.schema, self.keys, count, self.seed + 1
+        )
+        spill.write_all(self.batches(partition))
+        if partition in self._writers:
+            os.remove(self.paths[partition])
+        return spill
+
+class JoinStage:
+    """Join with another source dataset, which is the build side.
+
+    The strategy is chosen from the joined dataset's profile: if its columns
+    fit in PIPELINE_JOIN_MEMORY_MB it is loaded into an Acero hash join, and
+    the pipeline's rows are spooled to local disk and streamed past it.
+    Otherwise both sides are hash-partitioned by key into spill files, sized
+    from the profile's row count and key statistics so each build partition
+    fits, and the partitions are joined one pair at a time. Memory stays
+    bounded by the build side of one partition either way.
+    """
+
+    def __init__(self, index: int, step: Dict[str, Any], input_schema: pa.Schema, schema_info: Dict[str, Any]):
+        self.steps = [index]
+        self.dataset_id = str(step["dataset"])
+        self.source = None
+        self.input_schema = input_schema
+        self.how = step.get("how", "inner")
+        if self.how not in JOIN_TYPES:
+            raise ValueError(f"Unsupported join type: {self.how}")
+
+        on = step.get("on")
+        if isinstance(on, str):
+            on = [on]
+        if isinstance(on, list) and on:
+            self.left_keys, self.right_keys = list(on), list(on)
+        else:
+            self.left_keys = list(step.get("left_on") or [])
+            self.right_keys = list(step.get("right_on") or [])
+        if not self.left_keys or len(self.left_keys) != len(self.right_keys):
+            raise ValueError("Join step needs 'on', or 'left_on' and 'right_on' of the same length")
+
+        right_schema = arrow_schema(schema_info)
+        missing = sorted(set(self.left_keys) - set(input_schema.names))
+        missing += sorted(set(self.right_keys) - set(right_schema.names))
+        if missing:
+            raise ValueError(f"Unknown columns: {', '.join(missing)}")
+        for left_key, right_key in zip(self.left_keys, self.right_keys):
+            left_type, right_type = input_schema.field(left_key).type, right_schema.field(right_key).type
+            if left_type != right_type:
+                raise ValueError(
+                    f"Join keys {left_key} ({left_type}) and {right_key} ({right_type}) differ in type; "
+                    f"cast one with a map step"
+                )
+
+        # Names the joined dataset's columns take in the output
+        suffix = step.get("suffix", "_right")
+        self.right_names: Dict[str, str] = {}
+        if self.how not in ("semi", "anti"):
+            for name in right_schema.names:
+                if name in self.right_keys:
+                    continue
+                output = f"{name}{suffix}" if name in input_schema.names else name
+                if output in input_schema.names or output in self.right_names.values():
+                    raise ValueError(f"Join output has duplicate column {output}")
+                self.right_names[name] = output
+        self.right_schema = pa.schema([right_schema.field(name) for name in self.right_keys + list(self.right_names)])
+
+        self.schema = pa.schema(
+            list(input_schema) + [right_schema.field(name).with_name(output) for name, output in self.right_names.items()]
+        )
+        self._plan_strategy(schema_info)
+
+    def _plan_strategy(self, schema_info: Dict[str, Any]):
+        budget = settings.PIPELINE_JOIN_MEMORY_MB * 1024 * 1024
+        size = estimated_bytes(schema_info, self.right_schema.names)
+        profiles = schema_info.get("columns") or {}
+        rows = (schema_info.get("basic_stats") or {}).get("row_count") or 0
+        if size is not None and self.how not in KEEPS_RIGHT_ROWS and rows:
+            # Rows with a null key never match and are dropped before the build
+            null_ratio = max(profiles.get(key, {}).get("null_count", 0) / rows for key in self.right_keys)
+            size = int(size * (1 - null_ratio))
+
+        self.estimated_build_bytes = size
+        if size is not None and size <= budget:
+            self.strategy, self.partitions = "hash", 1
+            return
+
+        # Unprofiled or too large: leave headroom for estimate error and uneven partitions
+        self.strategy = "partitioned"
+        partitions = math.ceil(2 * size / budget) if size is not None else MAX_JOIN_PARTITIONS
+        distinct = [profiles.get(key, {}).get("distinct_count") for key in self.right_keys]
+        if all(distinct):
+            # Beyond the number of distinct keys, extra partitions stay empty
+            partitions = min(partitions, math.prod(distinct))
+        self.partitions = max(MIN_JOIN_PARTITIONS, min(partitions, MAX_JOIN_PARTITIONS))
+
+        top_values = profiles.get(self.right_keys[0], {}).get("top_values") or []
+        if len(self.right_keys) == 1 and top_values and size is not None and rows:
+            heaviest = top_values[0]["count"] * size / rows
+            if heaviest > budget:
+                logger.warning(
+                    f"Join key {self.right_keys[0]} value {top_values[0]['value']!r} alone needs about "
+                    f"{heaviest / 1024 / 1024:.0f}MB, above PIPELINE_JOIN_MEMORY_MB; the run will fail "
+                    f"if its partition cannot be split below the limit"
+                )
+
+    def _right_batches(self) -> Iterator[pa.RecordBatch]:
+        expression = None
+        if self.how not in KEEPS_RIGHT_ROWS:
+            for key in self.right_keys:
+                term = pc.field(key).is_valid()
+                expression = term if expression is None else expression & term
+        for batch in self.source.scan(columns=self.right_schema.names, filter=expression):
+            yield conform(batch, self.right_schema)
+
+    def _build_table(self, batches: Iterable[pa.RecordBatch]) -> pa.Table:
+        table = pa.Table.from_batches(list(batches), schema=self.right_schema)
+        names = [f"{RIGHT_KEY_PREFIX}{index}" for index in range(len(self.right_keys))]
+        return table.rename_columns(names + [self.right_names[name] for name in table.column_names[len(names):]])
+
+    def _join(self, left: ds.Dataset, right: pa.Table) -> pa.RecordBatchReader:
+        right_keys = right.column_names[:len(self.right_keys)]
+        right_output = [] if self.how in ("semi", "anti") else right.column_names
+        options = acero.HashJoinNodeOptions(
+            JOIN_TYPES[self.how],
+            self.left_keys,
+            right_keys,
+            left_output=self.input_schema.names,
+            right_output=right_output
+        )
+        join = acero.Declaration("hashjoin", options, inputs=[
+            acero.Declaration("scan", acero.ScanNodeOptions(left)),
+            acero.Declaration("table_source", acero.TableSourceNodeOptions(right))
+        ])
+
+        # Drop the joined dataset's keys; outer joins take them where the pipeline's row is missing
+        coalesced = dict(zip(self.left_keys, right_keys)) if self.how in KEEPS_RIGHT_ROWS else {}
+        expressions = [
+            pc.coalesce(pc.field(name), pc.field(coalesced[name])) if name in coalesced else pc.field(name)
+            for name in self.input_schema.names
+        ]
+        names = list(self.input_schema.names)
+        if right_output:
+            expressions += [pc.field(name) for name in self.right_names.values()]
+            names += list(self.right_names.values())
+        project = acero.Declaration("project", acero.ProjectNodeOptions(expressions, names))
+        return acero.Declaration.from_sequence([join, project]).to_reader()
+
+    def scan(self, read) -> Iterator[pa.RecordBatch]:
+        return self.apply(read())
+
+    def apply(self, batches: Iterator[pa.RecordBatch]) -> Iterator[pa.RecordBatch]:
+        budget = settings.PIPELINE_JOIN_MEMORY_MB * 1024 * 1024
+        with tempfile.TemporaryDirectory(prefix="pipeline-join-") as spool:
+            right = self._right_batches()
+            partitions = self.partitions
+            if self.strategy == "hash":
+                build, build_bytes = [], 0
+                for batch in right:
+                    build.append(batch)
+                    build_bytes += batch.nbytes
+                    if build_bytes > budget:
+                        break
+                else:
+                    left = PartitionSpill(spool, "left", self.input_schema, self.left_keys, 1)
+                    left.write_all(batches)
+                    yield from self._join(left.dataset(0), self._build_table(build))
+                    return
+                # The profile underestimated the joined dataset: spill what was read and the rest
+                logger.warning(f"Join build side of dataset {self.dataset_id} exceeds its estimate, spilling")
+                right = itertools.chain(build, right)
+                partitions = MAX_JOIN_PARTITIONS
+
+            right_spill = PartitionSpill(spool, "right", self.right_schema, self.right_keys, partitions)
+            right_spill.write_all(right)
+            left_spill = PartitionSpill(spool, "left", self.input_schema, self.left_keys, partitions)
+            left_spill.write_all(batches)
+            for partition in range(partitions):
+                yield from self._join_spilled(left_spill, right_spill, partition, depth=0)
+
+    def _join_spilled(
+        self,
+        left: PartitionSpill,
+        right: PartitionSpill,
+        partition: int,
+        depth: int
+    ) -> Iterator[pa.RecordBatch]:
+        """Join one pair of spilled partitions, splitting them again while the build side is over budget"""
+        budget = settings.PIPELINE_JOIN_MEMORY_MB * 1024 * 1024
+        size = right.sizes[partition]
+        if size <= budget:
+            yield from self._join(left.dataset(partition), self._build_table(right.read(partition).to_batches()))
+            return
+
+        count = max(MIN_JOIN_PARTITIONS, min(math.ceil(2 * size / budget), MAX_JOIN_PARTITIONS))
+        right_split = right.split(partition, count) if depth < MAX_REPARTITION_DEPTH else None
+        # A partition a new hash cannot split holds one key value larger than the budget
+        if right_split is None or max(right_split.sizes) >= size:
+            raise ValueError(
+                f"Join with dataset {self.dataset_id} has a key partition of {size / 1024 / 1024:.0f}MB that "
+                f"cannot be split below PIPELINE_JOIN_MEMORY_MB ({settings.PIPELINE_JOIN_MEMORY_MB}MB); "
+                f"a single key value is too frequent. Join on more selective keys or raise the limit"
+            )
+        logger.info(
+            f"Join partition {right.name}-{partition} of {size / 1024 / 1024:.0f}MB exceeds the budget, "
+            f"splitting it into {count}"
+        )
+        left_split = left.split(partition, count)
+        for sub_partition in range(count):
+            yield from self._join_spilled(left_split, right_split, sub_partition, depth + 1)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "stage": "join",
+            "steps": self.steps,
+            "dataset": self.dataset_id,
+            "how": self.how,
+            "strategy": self.strategy,
+            "partitions": self.partitions,
+            "estimated_build_bytes": self.estimated_build_bytes
+        }
+
+class UnionStage:
+    """The pipeline's rows followed by another source dataset's, matched by column name.
+
+    Columns only one side has are null for the other side's rows; a column
+    that is integer on one side and float on the other becomes float.
+    """
+
+    def __init__(self, index: int, step: Dict[str, Any], input_schema: pa.Schema, schema_info: Dict[str, Any]):
+        self.steps = [index]
+        self.dataset_id = str(step["dataset"])
+        self.source = None
+        other_schema = arrow_schema(schema_info)
+        fields = {field.name: field for field in input_schema}
+        for field in other_schema:
+            current = fields.get(field.name)
+            if current is None:
+                fields[field.name] = field
+            elif current.type != field.type:
+                numeric = [pa.types.is_integer(t) or pa.types.is_floating(t) for t in (current.type, field.type)]
+                if not all(numeric):
+                    raise ValueError(
+                        f"Column {field.name} is {current.type} in the pipeline but {field.type} in dataset {self.dataset_id}"
+                    )
+                fields[field.name] = pa.field(field.name, pa.float64())
+        self.schema = pa.schema(list(fields.values()))
+        self.other_columns = list(other_schema.names)
+
+    def scan(self, read) -> Iterator[pa.RecordBatch]:
+        return self.apply(read())
+
+    def apply(self, batches: Iterator[pa.RecordBatch]) -> Iterator[pa.RecordBatch]:
+        for batch in batches:
+            yield conform(batch, self.schema)
+        for batch in self.source.scan(columns=self.other_columns):
+            yield conform(batch, self.schema)
+
+    def describe(self) -> Dict[str, Any]:
+        return {"stage": "union", "steps": self.steps, "dataset": self.dataset_id}
@@ -0,0 +1,137 @@
+import io
+import json
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from app.models.dataset import Dataset
+from app.services.file_service import FileService
+from app.services.materialization import MaterializationService
+from app.services.row_index import INDEX_ENTRY_SIZE, decode_offsets, row_index_object_name
+from app.services.schema_inference import iter_dataframe_chunks
+from app.core.config import settings
+
+# Parquet previews stream column chunks in reads of this size rather than whole row groups
+PARQUET_READ_BUFFER = 64 * 1024
+
+# Smallest batch decoded from Parquet while skipping to a page
+PARQUET_MIN_BATCH_ROWS = 1024
+
+class PreviewService:
+    """Paged dataset previews that read roughly one page of data per request"""
+
+    def __init__(self, file_service: Optional[FileService] = None):
+        self.file_service = file_service or FileService()
+
+    def get_preview(self, dataset: Dataset, offset: int, limit: int) -> Dict[str, Any]:
+        """Return rows [offset, offset + limit) in the DatasetPreview shape"""
+        schema_info = dataset.schema_info or {}
+
+        # The row index locates a CSV page with one ranged GET, the cheapest read there is
+        frame = None
+        if schema_info.get("row_index"):
+            frame = self._from_row_index(dataset, offset, limit)
+        if frame is None and dataset.content_hash:
+            frame = self._from_parquet(dataset.content_hash, offset, limit)
+        if frame is None:
+            frame = self._from_scan(dataset, offset, limit)
+
+        total_rows = schema_info.get("basic_stats", {}).get("row_count", offset + len(frame))
+        return {
+            "columns": [str(column) for column in frame.columns],
+            "data": json.loads(frame.to_json(orient="values", date_format="iso")),
+            "total_rows": total_rows,
+            "sample_size": len(frame)
+        }
+
+    def _from_parquet(self, content_hash: str, offset: int, limit: int) -> Optional[pd.DataFrame]:
+        """Stream the row groups that overlap the requested page, stopping once it is filled"""
+        try:
+            parquet_file = MaterializationService(self.file_service).open(content_hash, buffer_size=PARQUET_READ_BUFFER)
+        except (OSError, FileNotFoundError):
+            return None
+
+        metadata = parquet_file.metadata
+        groups: List[int] = []
+        first_row = None
+        start = 0
+        for index in range(metadata.num_row_groups):
+            rows = metadata.row_group(index).num_rows
+            if start + rows > offset and start < offset + limit:
+                groups.append(index)
+                if first_row is None:
+                    first_row = start
+            start += rows
+
+        if not groups:
+            return parquet_file.schema_arrow.empty_table().to_pandas()
+
+        batches = []
+        skip, wanted = offset - first_row, limit
+        for batch in parquet_file.iter_batches(batch_size=max(limit, PARQUET_MIN_BATCH_ROWS), row_groups=groups):
+            if skip >= batch.num_rows:
+                skip -= batch.num_rows
+                continue
+            batch = batch.slice(skip, wanted)
+            skip = 0
+            batches.append(batch)
+            wanted -= batch.num_rows
+            if wanted <= 0:
+                break
+        return pa.Table.from_batches(batches, schema=parquet_file.schema_arrow).to_pandas()
+
+    def _from_row_index(self, dataset: Dataset, offset: int, limit: int) -> Optional[pd.DataFrame]:
+        """Fetch the page with a ranged GET located through the CSV byte-offset index"""
+        row_index = dataset.schema_info["row_index"]
+        interval, entries = row_index["interval"], row_index["entries"]
+        columns = list(dataset.schema_info.get("columns", {}))
+        row_count = dataset.schema_info.get("basic_stats", {}).get("row_count")
+
+        first_entry = offset // interval
+        if first_entry >= entries or (row_count is not None and offset >= row_count):
+            return pd.DataFrame(columns=columns)
+        # The page ends before the entry following its last row, or at end of file
+        end_entry = (offset + limit - 1) // interval + 1
+        last_entry = end_entry if end_entry < entries else first_entry
+
+        offsets = decode_offsets(self.file_service.read_range(
+            row_index_object_name(dataset.file_path),
+            first_entry * INDEX_ENTRY_SIZE,
+            (last_entry - first_entry + 1) * INDEX_ENTRY_SIZE,
+            bucket=settings.CACHE_BUCKET
+        ))
+        start = offsets[0]
+        # The file's final newline marks an entry at end of file, where a ranged GET fails
+        if dataset.file_size is not None and start >= dataset.file_size:
+            return pd.DataFrame(columns=columns)
+        length = offsets[-1] - start if last_entry > first_entry else 0
+        content = self.file_service.read_range(dataset.file_path, start, length)
+
+        return pd.read_csv(
+            io.BytesIO(content),
+            header=None,
+            names=columns,
+            skiprows=offset - first_entry * interval,
+            nrows=limit
+        )
+
+    def _from_scan(self, dataset: Dataset, offset: int, limit: int) -> pd.DataFrame:
+        """Stream the raw file until the page is filled; cost grows with offset"""
+        pages = []
+        skipped = 0
+        wanted = limit
+        with self.file_service.open_file(dataset.file_path) as stream:
+            for chunk in iter_dataframe_chunks(stream, dataset.file_type):
+                if skipped + len(chunk) <= offset:
+                    skipped += len(chunk)
+                    continue
+                page = chunk.iloc[max(offset - skipped, 0):][:wanted]
+                skipped += len(chunk)
+                pages.append(page)
+                wanted -= len(page)
+                if wanted <= 0:
+                    break
+        if not pages:
+            return pd.DataFrame()
+        return pd.concat(pages, ignore_index=True)
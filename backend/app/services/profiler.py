@@ -0,0 +1,133 @@
+import io
+import math
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.services.parallel import csv_partitions, partition_map
+from app.services.row_index import RowIndexBuilder
+from app.services.schema_inference import ColumnAccumulator, iter_dataframe_chunks
+from app.utils.sketches import HyperLogLog, KLLQuantiles, ReservoirSample, TopK
+
+QUANTILE_FRACTIONS = {"p5": 0.05, "p25": 0.25, "p50": 0.5, "p75": 0.75, "p95": 0.95}
+
+# Heavy-hitter counters kept per reported top value
+TOP_K_CAPACITY_FACTOR = 10
+
+class ColumnProfile(ColumnAccumulator):
+    """Column statistics plus fixed-size sketches; memory does not grow with row count"""
+
+    def __init__(self):
+        super().__init__()
+        self.sample = ReservoirSample(settings.PROFILE_SAMPLE_SIZE)
+        self.distinct = HyperLogLog(settings.PROFILE_HLL_PRECISION)
+        self.quantiles = KLLQuantiles(settings.PROFILE_QUANTILE_K)
+        self.top_values = TopK(settings.PROFILE_TOP_K * TOP_K_CAPACITY_FACTOR)
+
+    def update_values(self, non_null: pd.Series):
+        super().update_values(non_null)
+        self.sample.update(non_null)
+        self.distinct.update(non_null)
+        self.top_values.update(non_null)
+        if non_null.dtype.kind in "iuf":
+            self.quantiles.update(non_null.to_numpy(dtype=np.float64))
+
+    def merge(self, other: "ColumnProfile"):
+        super().merge(other)
+        self.sample.merge(other.sample)
+        self.distinct.merge(other.distinct)
+        self.quantiles.merge(other.quantiles)
+        self.top_values.merge(other.top_values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        info = super().to_dict()
+        non_null = self.count - self.null_count
+        info["distinct_count"] = min(self.distinct.count(), non_null)
+        if self.quantiles.count:
+            estimates = self.quantiles.quantiles(list(QUANTILE_FRACTIONS.values()))
+            info["quantiles"] = dict(zip(QUANTILE_FRACTIONS, estimates))
+        info["top_values"] = [
+            {"value": _json_value(item["value"]), "count": item["count"]}
+            for item in self.top_values.top(settings.PROFILE_TOP_K)
+        ]
+        info["sample_values"] = [_json_value(value) for value in self.sample.items]
+        return info
+
+class DatasetProfile:
+    """Mergeable profile of a whole dataset, built one chunk at a time"""
+
+    def __init__(self):
+        self.columns: Dict[str, ColumnProfile] = {}
+        self.row_count = 0
+
+    def update(self, chunk: pd.DataFrame):
+        self.row_count += len(chunk)
+        for name in chunk.columns:
+            self.columns.setdefault(str(name), ColumnProfile()).update(chunk[name])
+
+    def merge(self, other: "DatasetProfile"):
+        self.row_count += other.row_count
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+
+    def to_schema(self) -> Dict[str, Any]:
+        """Render the profile in the DatasetSchema shape"""
+        column_info = {name: column.to_dict() for name, column in self.columns.items()}
+        total_cells = self.row_count * len(self.columns)
+        null_cells = sum(info["null_count"] for info in column_info.values())
+
+        return {
+            "columns": column_info,
+            "basic_stats": {
+                "row_count": self.row_count,
+                "column_count": len(self.columns)
+            },
+            "data_quality": {
+                "null_cells": null_cells,
+                "completeness": round(1 - null_cells / total_cells, 6) if total_cells else 1.0,
+                "columns_with_nulls": [name for name, info in column_info.items() if info["null_count"]],
+                "constant_columns": [name for name, info in column_info.items() if info["distinct_count"] == 1],
+                # Distinct estimates are approximate, so these are candidate keys only
+                "candidate_keys": [
+                    name for name, info in column_info.items()
+                    if not info["null_count"] and info["count"]
+                    and info["distinct_count"] >= info["count"] * 0.99
+                ]
+            }
+        }
+
+def profile_dataset(chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:
+    """Profile a stream of DataFrame chunks into a DatasetSchema-shaped dict"""
+    profile = DatasetProfile()
+    for chunk in chunks:
+        profile.update(chunk)
+    return profile.to_schema()
+
+def profile_partition(content: bytes) -> DatasetProfile:
+    """Profile one CSV byte range, header included; runs in a partition worker"""
+    profile = DatasetProfile()
+    for chunk in iter_dataframe_chunks(io.BytesIO(content), "csv"):
+        profile.update(chunk)
+    return profile
+
+def profile_csv(indexer: RowIndexBuilder) -> Dict[str, Any]:
+    """Profile a CSV stream split into byte ranges across the worker pool, merging their profiles"""
+    profile = DatasetProfile()
+    for partial in partition_map(profile_partition, csv_partitions(indexer)):
+        profile.merge(partial)
+    return profile.to_schema()
+
+def _json_value(value: Any) -> Optional[Any]:
+    """Convert sketch values into JSON-serializable scalars"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from pyinstrument import Profiler
+from starlette.datastructures import Headers
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.monitoring import RequestTimings, request_timings
+from app.core.redis import redis_client
+from app.core.security import decode_access_token
+from app.models.user import User
+from app.services.file_service import FileService
+from app.services.user_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_INDEX_KEY = "profiles"
+SAMPLE_RATE_KEY = "profiling:sample_rate"
+
+# How often each process re-reads the sample rate admins can set in Redis
+SAMPLE_RATE_REFRESH_SECONDS = 5.0
+
+def profile_object_name(profile_id: str) -> str:
+    return f"profiles/{profile_id}.html"
+
+async def list_profiles(limit: int) -> List[Dict[str, Any]]:
+    """Most recent profile summaries, newest first"""
+    return [json.loads(raw) for raw in await redis_client.lrange(PROFILE_INDEX_KEY, 0, limit - 1)]
+
+async def set_sample_rate(sample_rate: float):
+    await redis_client.set(SAMPLE_RATE_KEY, sample_rate)
+
+class RequestProfilerMiddleware:
+    """Wall-clock profiles of sampled requests, or of admin requests sent with an X-Profile header.
+
+    Profiles are rendered to HTML after the response is sent, stored in the cache
+    bucket, and summarized (with db/storage/serialization time) in a Redis list
+    that the admin API reads.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._sample_rate = settings.PROFILING_SAMPLE_RATE
+        self._sample_rate_read_at = 0.0
+        self._pending: Set[asyncio.Task] = set()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = await self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        state = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        profiler = Profiler(interval=settings.PROFILING_INTERVAL_MS / 1000, async_mode="enabled")
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            duration = time.perf_counter() - start
+            request_timings.reset(token)
+
+            route = scope.get("route")
+            summary = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None),
+                "status": state["status"],
+                "trigger": trigger,
+                "started_at": started_at.isoformat(),
+                "duration_ms": round(duration * 1000, 3),
+                **timings.to_dict()
+            }
+            task = asyncio.create_task(self._store(scope["app"].state.file_service, profiler, summary))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _trigger(self, scope) -> Optional[str]:
+        headers = Headers(scope=scope)
+        if headers.get(PROFILE_HEADER) and await self._is_admin(headers):
+            return "header"
+        if random.random() < await self._current_sample_rate():
+            return "sample"
+        return None
+
+    async def _is_admin(self, headers: Headers) -> bool:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        try:
+            user_id = decode_access_token(token).get("sub")
+            if user_id is None:
+                return False
+            user = await user_cache.get(user_id)
+            if user is None:
+                async with AsyncSessionLocal() as db:
+                    user = await db.get(User, uuid.UUID(user_id))
+        except Exception:
+            # Profiling is best effort; authentication itself is enforced by the endpoint
+            return False
+        return bool(user and user.is_active and user.is_admin)
+
+    async def _current_sample_rate(self) -> float:
+        now = time.monotonic()
+        if now - self._sample_rate_read_at > SAMPLE_RATE_REFRESH_SECONDS:
+            self._sample_rate_read_at = now
+            try:
+                value = await redis_client.get(SAMPLE_RATE_KEY)
+                if value is not None:
+                    self._sample_rate = float(value)
+            except Exception as e:
+                logger.warning(f"Could not read profiling sample rate: {e}")
+        return self._sample_rate
+
+    async def _store(self, file_service: FileService, profiler: Profiler, summary: Dict[str, Any]):
+        try:
+            # Rendering walks the whole call tree, so keep it off the event loop too
+            await file_service.storage.run(
+                "put_profile",
+                lambda: file_service.put_cache_object(
+                    profile_object_name(summary["id"]),
+                    profiler.output_html().encode(),
+                    content_type="text/html"
+                )
+            )
+            await redis_client.lpush(PROFILE_INDEX_KEY, json.dumps(summary))
+            evicted = await redis_client.lrange(PROFILE_INDEX_KEY, settings.PROFILING_MAX_STORED, -1)
+            await redis_client.ltrim(PROFILE_INDEX_KEY, 0, settings.PROFILING_MAX_STORED - 1)
+            for raw in evicted:
+                await file_service.storage.run(
+                    "remove_profile",
+                    file_service.minio_client.remove_object,
+                    settings.CACHE_BUCKET,
+                    profile_object_name(json.loads(raw)["id"])
+                )
+        except Exception as e:
+            logger.warning(f"Could not store request profile {summary['id']}: {e}")
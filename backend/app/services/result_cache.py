@@ -0,0 +1,135 @@
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+import orjson
+
+from app.core.config import settings
+from app.core.monitoring import ANALYSIS_CACHE_BYTES, ANALYSIS_CACHE_REQUESTS
+from app.core.redis import sync_redis_client
+from app.models.dataset import Dataset
+from app.services.file_service import FileService
+from app.utils.sized_cache import SizedLRUCache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "analysis"
+SPILL_PREFIX = "analysis-results"
+
+# Bumped when the engine's results change for the same plan, so older cached results are not served
+RESULT_VERSION = 2
+
+def normalize_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Canonical form of a plan: empty parts dropped, filters (which are ANDed) in a fixed order"""
+    normalized = {key: value for key, value in plan.items() if value not in (None, [], {})}
+    if "filters" in normalized:
+        normalized["filters"] = sorted(
+            normalized["filters"], key=lambda condition: orjson.dumps(condition, option=orjson.OPT_SORT_KEYS)
+        )
+    return normalized
+
+def plan_hash(plan: Dict[str, Any]) -> str:
+    return hashlib.sha256(orjson.dumps(normalize_plan(plan), option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+def dataset_version(dataset: Dataset) -> str:
+    """Changes whenever the dataset's content or row is updated"""
+    changed_at = dataset.updated_at or dataset.created_at
+    return f"{dataset.content_hash or ''}@{changed_at.isoformat() if changed_at else ''}"
+
+def cache_key(dataset: Dataset, plan: Dict[str, Any]) -> str:
+    digest = hashlib.sha256(
+        f"{RESULT_VERSION}:{dataset_version(dataset)}:{plan_hash(plan)}".encode()
+    ).hexdigest()[:32]
+    return f"{KEY_PREFIX}:{dataset.id}:{digest}"
+
+def spill_object_name(key: str) -> str:
+    _, dataset_id, digest = key.split(":")
+    return f"{SPILL_PREFIX}/{dataset_id}/{digest}.json"
+
+class AnalysisResultCache:
+    """Analysis outcomes keyed by dataset version and normalized plan.
+
+    Lookups go through an in-process LRU bounded by total bytes, then Redis.
+    Results too large for Redis are spilled to the cache bucket and Redis keeps
+    a pointer. Entries of a dataset are dropped when it is updated or deleted;
+    its version is also part of the key, so other processes' local tiers never
+    serve results for an older version.
+    """
+
+    def __init__(self, file_service: Optional[FileService] = None):
+        self._local = SizedLRUCache(
+            settings.ANALYSIS_CACHE_LOCAL_MB * 1024 * 1024,
+            max_entry_bytes=settings.ANALYSIS_CACHE_LOCAL_MB * 1024 * 1024 // 16
+        )
+        self._file_service = file_service
+        ANALYSIS_CACHE_BYTES.set_function(lambda: self._local.size)
+
+    @property
+    def file_service(self) -> FileService:
+        if self._file_service is None:
+            self._file_service = FileService()
+        return self._file_service
+
+    def get(self, dataset: Dataset, plan: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = cache_key(dataset, plan)
+        content = self._local.get(key)
+        if content is not None:
+            ANALYSIS_CACHE_REQUESTS.labels(tier="local", result="hit").inc()
+            return orjson.loads(content)
+
+        try:
+            stored = sync_redis_client.get(key)
+        except Exception as e:
+            logger.warning(f"Analysis cache Redis lookup failed: {e}")
+            stored = None
+        if stored is None:
+            ANALYSIS_CACHE_REQUESTS.labels(tier="redis", result="miss").inc()
+            return None
+
+        envelope = orjson.loads(stored)
+        if "spilled" in envelope:
+            try:
+                content = self.file_service.read_range(envelope["spilled"], 0, 0, bucket=settings.CACHE_BUCKET)
+            except Exception:
+                ANALYSIS_CACHE_REQUESTS.labels(tier="storage", result="miss").inc()
+                return None
+            ANALYSIS_CACHE_REQUESTS.labels(tier="storage", result="hit").inc()
+            outcome = orjson.loads(content)
+        else:
+            ANALYSIS_CACHE_REQUESTS.labels(tier="redis", result="hit").inc()
+            content, outcome = orjson.dumps(envelope), envelope
+        self._local.set(key, content)
+        return outcome
+
+    def set(self, dataset: Dataset, plan: Dict[str, Any], outcome: Dict[str, Any]):
+        key = cache_key(dataset, plan)
+        content = orjson.dumps(outcome)
+        self._local.set(key, content)
+        try:
+            if len(content) > settings.ANALYSIS_CACHE_REDIS_MAX_KB * 1024:
+                object_name = spill_object_name(key)
+                self.file_service.put_cache_object(object_name, content, content_type="application/json")
+                content = orjson.dumps({"spilled": object_name})
+            sync_redis_client.set(key, content.decode(), ex=settings.ANALYSIS_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Could not store analysis result in the shared cache: {e}")
+
+    def invalidate_dataset(self, dataset_id: Any):
+        """Drop every cached result of a dataset from all tiers"""
+        self._local.delete_prefix(f"{KEY_PREFIX}:{dataset_id}:")
+        try:
+            keys = list(sync_redis_client.scan_iter(match=f"{KEY_PREFIX}:{dataset_id}:*", count=500))
+            if keys:
+                sync_redis_client.delete(*keys)
+            client = self.file_service.minio_client
+            for item in client.list_objects(
+                settings.CACHE_BUCKET, prefix=f"{SPILL_PREFIX}/{dataset_id}/", recursive=True
+            ):
+                client.remove_object(settings.CACHE_BUCKET, item.object_name)
+        except Exception as e:
+            logger.warning(f"Could not invalidate cached analysis results of {dataset_id}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"local_entries": len(self._local), "local_bytes": self._local.size}
+
+result_cache = AnalysisResultCache()
@@ -0,0 +1,61 @@
+import io
+from typing import BinaryIO, List
+
+import numpy as np
+
+QUOTE = ord('"')
+NEWLINE = ord("\n")
+
+# Each index entry is a little-endian int64, so entry i lives at byte 8 * i
+INDEX_ENTRY_SIZE = 8
+
+def row_index_object_name(file_path: str) -> str:
+    return f"row-index/{file_path}.idx"
+
+class RowIndexBuilder(io.RawIOBase):
+    """Readable CSV stream wrapper that records the byte offset of every Nth data row.
+
+    Newlines inside quoted fields are skipped by tracking quote parity, which
+    also holds for escaped quotes ("") since they come in pairs.
+    """
+
+    def __init__(self, stream: BinaryIO, interval: int):
+        super().__init__()
+        self._stream = stream
+        self.interval = interval
+        self.offsets: List[int] = []
+        self._position = 0
+        self._quotes = 0
+        self._records = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        if size:
+            self._scan(data)
+        return size
+
+    def _scan(self, data: bytes):
+        block = np.frombuffer(data, dtype=np.uint8)
+        quotes = np.cumsum(block == QUOTE)
+        newlines = np.flatnonzero(block == NEWLINE)
+        separators = newlines[((self._quotes + quotes[newlines]) & 1) == 0]
+
+        # The first separator ends the header, so the row after separator k is data row k - 1
+        rows = self._records + np.arange(len(separators))
+        marked = separators[rows % self.interval == 0]
+        self.offsets.extend((self._position + marked + 1).tolist())
+
+        self._records += len(separators)
+        self._quotes += int(quotes[-1])
+        self._position += len(data)
+
+    def to_bytes(self) -> bytes:
+        return np.asarray(self.offsets, dtype="<i8").tobytes()
+
+def decode_offsets(content: bytes) -> List[int]:
+    return np.frombuffer(content, dtype="<i8").tolist()
@@ -0,0 +1,265 @@
+import io
+import json
+import math
+import shutil
+import tempfile
+import warnings
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from app.core.config import settings
+
+# Bytes read from storage per decode step when parsing JSON arrays
+JSON_READ_SIZE = 1024 * 1024
+
+# Non-null values checked when deciding whether a text column holds dates
+DATETIME_PROBE_SIZE = 100
+
+def iter_dataframe_chunks(
+    stream: BinaryIO,
+    file_type: str,
+    chunk_rows: Optional[int] = None
+) -> Iterator[pd.DataFrame]:
+    """Yield a dataset as DataFrames of at most chunk_rows rows"""
+    chunk_rows = chunk_rows or settings.SCHEMA_INFERENCE_CHUNK_ROWS
+
+    if file_type in ("csv", "text"):
+        yield from pd.read_csv(stream, chunksize=chunk_rows, low_memory=False)
+    elif file_type == "json":
+        yield from _iter_json_chunks(stream, chunk_rows)
+    elif file_type == "xlsx":
+        yield from _iter_excel_chunks(stream, chunk_rows)
+    else:
+        raise ValueError(f"Unsupported file type for schema inference: {file_type}")
+
+def _iter_json_chunks(stream: BinaryIO, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Parse JSON arrays of records or JSON Lines incrementally"""
+    reader = io.TextIOWrapper(stream, encoding="utf-8")
+    head = reader.read(1)
+    while head and head.isspace():
+        head = reader.read(1)
+    if not head:
+        return
+
+    if head != "[":
+        # JSON Lines
+        lines = pd.read_json(
+            _PrefixedReader(head, reader), lines=True, chunksize=chunk_rows
+        )
+        yield from lines
+        return
+
+    decoder = json.JSONDecoder()
+    buffer = ""
+    records: List[Dict[str, Any]] = []
+    exhausted = False
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if buffer.startswith("]"):
+            break
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if exhausted:
+                raise
+            data = reader.read(JSON_READ_SIZE)
+            exhausted = not data
+            buffer += data
+            continue
+        buffer = buffer[end:]
+        records.append(record if isinstance(record, dict) else {"value": record})
+        if len(records) >= chunk_rows:
+            yield pd.DataFrame.from_records(records)
+            records = []
+    if records:
+        yield pd.DataFrame.from_records(records)
+
+class _PrefixedReader(io.TextIOBase):
+    """Text reader that replays already-consumed characters before the stream"""
+
+    def __init__(self, prefix: str, reader: io.TextIOBase):
+        self._prefix = prefix
+        self._reader = reader
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        prefix, self._prefix = self._prefix, ""
+        if size is None or size < 0:
+            return prefix + self._reader.read()
+        return prefix + self._reader.read(max(size - len(prefix), 0))
+
+    def readline(self, size: int = -1) -> str:
+        prefix, self._prefix = self._prefix, ""
+        return prefix + self._reader.readline()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+def _iter_excel_chunks(stream: BinaryIO, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Read the first worksheet row by row from a disk-spooled copy"""
+    from openpyxl import load_workbook
+
+    # XLSX is a zip archive and needs random access, so spool it to disk first
+    with tempfile.TemporaryFile() as spool:
+        shutil.copyfileobj(stream, spool, length=JSON_READ_SIZE)
+        spool.seek(0)
+
+        workbook = load_workbook(spool, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [
+                str(name) if name is not None else f"column_{index}"
+                for index, name in enumerate(header)
+            ]
+
+            batch = []
+            for row in rows:
+                batch.append(row[:len(columns)])
+                if len(batch) >= chunk_rows:
+                    yield pd.DataFrame.from_records(batch, columns=columns)
+                    batch = []
+            if batch:
+                yield pd.DataFrame.from_records(batch, columns=columns)
+        finally:
+            workbook.close()
+
+def _column_type(series: pd.Series) -> str:
+    """Map a pandas series to a schema type name"""
+    kind = series.dtype.kind
+    if kind == "b":
+        return "boolean"
+    if kind in "iu":
+        return "integer"
+    if kind == "f":
+        non_null = series.dropna()
+        if len(non_null) and (non_null == non_null.round()).all():
+            # Integer columns with nulls are read as float
+            return "integer"
+        return "float"
+    if kind == "M":
+        return "datetime"
+
+    probe = series.dropna().head(DATETIME_PROBE_SIZE)
+    if len(probe) and probe.map(lambda value: isinstance(value, str)).all():
+        try:
+            with warnings.catch_warnings():
+                # Mixed formats fall back to dateutil; that is fine for a probe
+                warnings.simplefilter("ignore", UserWarning)
+                pd.to_datetime(probe, errors="raise")
+            return "datetime"
+        except (ValueError, TypeError, OverflowError):
+            pass
+    return "string"
+
+def _merge_types(current: Optional[str], new: str) -> str:
+    """Widen a column type when chunks disagree"""
+    if current is None or current == new:
+        return new
+    if {current, new} == {"integer", "float"}:
+        return "float"
+    return "string"
+
+class ColumnAccumulator:
+    """Running statistics for one column, updated chunk by chunk"""
+
+    def __init__(self):
+        self.type: Optional[str] = None
+        self.count = 0
+        self.null_count = 0
+        self.min: Any = None
+        self.max: Any = None
+        # Numeric values seen, their mean and summed squared deviations from it
+        self.numeric_count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min_length: Optional[int] = None
+        self.max_length: Optional[int] = None
+
+    def update(self, series: pd.Series):
+        non_null = series.dropna()
+        self.count += len(series)
+        self.null_count += len(series) - len(non_null)
+        if not non_null.empty:
+            self.update_values(non_null)
+
+    def update_values(self, non_null: pd.Series):
+        self.type = _merge_types(self.type, _column_type(non_null))
+
+        if non_null.dtype.kind in "iuf":
+            values = non_null.astype("float64")
+            self._update_range(values.min(), values.max())
+            mean = float(values.mean())
+            self._merge_moments(len(values), mean, float(((values - mean) ** 2).sum()))
+        else:
+            text = non_null.astype(str)
+            lengths = text.str.len()
+            self.min_length = int(lengths.min()) if self.min_length is None else min(self.min_length, int(lengths.min()))
+            self.max_length = int(lengths.max()) if self.max_length is None else max(self.max_length, int(lengths.max()))
+            self._update_range(text.min(), text.max())
+
+    def merge(self, other: "ColumnAccumulator"):
+        if other.type is not None:
+            self.type = _merge_types(self.type, other.type)
+        self.count += other.count
+        self.null_count += other.null_count
+        self._merge_moments(other.numeric_count, other.mean, other.m2)
+        if other.min is not None:
+            self._update_range(other.min, other.max)
+        if other.min_length is not None:
+            self.min_length = other.min_length if self.min_length is None else min(self.min_length, other.min_length)
+            self.max_length = other.max_length if self.max_length is None else max(self.max_length, other.max_length)
+
+    def _merge_moments(self, count: int, mean: float, m2: float):
+        """Combine count, mean and M2 with Chan's update; sums of squares would cancel for large values"""
+        if not count:
+            return
+        total = self.numeric_count + count
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.numeric_count * count / total
+        self.mean += delta * count / total
+        self.numeric_count = total
+
+    def _update_range(self, low: Any, high: Any):
+        if self.min is None or (type(low) is type(self.min) and low < self.min):
+            self.min = low
+        if self.max is None or (type(high) is type(self.max) and high > self.max):
+            self.max = high
+
+    def to_dict(self) -> Dict[str, Any]:
+        info: Dict[str, Any] = {
+            "type": self.type or "unknown",
+            "count": self.count,
+            "null_count": self.null_count,
+            "null_ratio": round(self.null_count / self.count, 6) if self.count else 0.0
+        }
+        if self.type in ("integer", "float") and self.numeric_count:
+            info.update({
+                "min": _json_number(self.min),
+                "max": _json_number(self.max),
+                "mean": _json_number(self.mean),
+                "std": _json_number(math.sqrt(self.m2 / self.numeric_count))
+            })
+        elif self.min_length is not None:
+            info.update({
+                "min": str(self.min),
+                "max": str(self.max),
+                "min_length": self.min_length,
+                "max_length": self.max_length
+            })
+        return info
+
+def _json_number(value: Any) -> Optional[float]:
+    value = float(value)
+    return value if math.isfinite(value) else None
@@ -0,0 +1,122 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Optional
+
+import urllib3
+from minio import Minio
+
+from app.core.config import settings
+from app.core.monitoring import pool_metrics, record_time
+
+class StorageBusyError(Exception):
+    """No storage connection or stream slot became free within STORAGE_POOL_TIMEOUT_SECONDS"""
+
+class BoundedPoolManager(urllib3.PoolManager):
+    """Pool manager whose requests wait a bounded time for a free connection.
+
+    An exhausted pool raises urllib3's EmptyPoolError after the timeout
+    instead of blocking its caller forever.
+    """
+
+    def urlopen(self, method, url, redirect=True, **kw):
+        kw.setdefault("pool_timeout", settings.STORAGE_POOL_TIMEOUT_SECONDS)
+        return super().urlopen(method, url, redirect=redirect, **kw)
+
+def create_minio_client() -> Minio:
+    """MinIO client with a connection pool shared by the storage threads, request threads and streams"""
+    http_client = BoundedPoolManager(
+        timeout=urllib3.Timeout(
+            connect=settings.STORAGE_CONNECT_TIMEOUT_SECONDS,
+            read=settings.STORAGE_READ_TIMEOUT_SECONDS
+        ),
+        maxsize=settings.STORAGE_MAX_CONNECTIONS,
+        block=True,
+        retries=urllib3.Retry(
+            total=5,
+            backoff_factor=0.2,
+            status_forcelist=[500, 502, 503, 504]
+        )
+    )
+    return Minio(
+        settings.MINIO_ENDPOINT,
+        access_key=settings.MINIO_ACCESS_KEY,
+        secret_key=settings.MINIO_SECRET_KEY,
+        secure=settings.MINIO_SECURE,
+        http_client=http_client
+    )
+
+class AsyncStorage:
+    """Runs blocking MinIO calls on a bounded thread pool so they never stall the event loop"""
+
+    def __init__(self, client: Optional[Minio] = None):
+        self.client = client or create_minio_client()
+        self.metrics = pool_metrics("storage")
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.STORAGE_THREAD_POOL_SIZE,
+            thread_name_prefix="storage"
+        )
+        self._slots = asyncio.Semaphore(settings.STORAGE_MAX_CONCURRENT_OPS)
+
+    async def run(self, operation: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking storage call off the event loop and record its latency"""
+        self.metrics.waiting += 1
+        async with self._slots:
+            self.metrics.waiting -= 1
+            self.metrics.in_flight += 1
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            error = False
+            try:
+                return await loop.run_in_executor(
+                    self._executor, functools.partial(func, *args, **kwargs)
+                )
+            except Exception:
+                error = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                self.metrics.in_flight -= 1
+                self.metrics.observe(operation, elapsed, error)
+                record_time("storage", elapsed)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+# Streams keep a connection checked out between reads, so fewer may be open than there are connections
+_stream_slots = threading.BoundedSemaphore(settings.STORAGE_MAX_STREAMS)
+
+@contextmanager
+def stream_slot():
+    """Hold one of STORAGE_MAX_STREAMS slots while a blocking caller streams an object"""
+    if not _stream_slots.acquire(timeout=settings.STORAGE_POOL_TIMEOUT_SECONDS):
+        raise StorageBusyError("Too many storage streams open")
+    try:
+        yield
+    finally:
+        _stream_slots.release()
+
+@asynccontextmanager
+async def async_stream_slot():
+    """Hold a stream slot from async code, waiting for one without blocking the event loop"""
+    deadline = time.monotonic() + settings.STORAGE_POOL_TIMEOUT_SECONDS
+    while not _stream_slots.acquire(blocking=False):
+        if time.monotonic() >= deadline:
+            raise StorageBusyError("Too many storage streams open")
+        await asyncio.sleep(0.05)
+    try:
+        yield
+    finally:
+        _stream_slots.release()
+
+_storage: Optional[AsyncStorage] = None
+
+def get_storage() -> AsyncStorage:
+    """Process-wide storage instance; the thread and connection pools are shared"""
+    global _storage
+    if _storage is None:
+        _storage = AsyncStorage()
+    return _storage
@@ -0,0 +1,91 @@
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.models.user import SkillLevel, User
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Columns cached for authenticated requests; the password hash never leaves the database
+CACHED_COLUMNS = ("id", "email", "skill_level", "preferences", "is_active", "created_at", "updated_at")
+
+def _redis_key(user_id: str) -> str:
+    return f"user:{user_id}"
+
+def _serialize(user: User) -> Dict[str, Any]:
+    return {
+        "id": str(user.id),
+        "email": user.email,
+        "skill_level": user.skill_level.value if user.skill_level else None,
+        "preferences": user.preferences,
+        "is_active": user.is_active,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+        "updated_at": user.updated_at.isoformat() if user.updated_at else None
+    }
+
+def _deserialize(values: Dict[str, Any]) -> User:
+    """Build a detached User; each request gets its own instance"""
+    return User(
+        id=uuid.UUID(values["id"]),
+        email=values["email"],
+        skill_level=SkillLevel(values["skill_level"]) if values["skill_level"] else None,
+        preferences=values["preferences"],
+        is_active=values["is_active"],
+        created_at=datetime.fromisoformat(values["created_at"]) if values["created_at"] else None,
+        updated_at=datetime.fromisoformat(values["updated_at"]) if values["updated_at"] else None
+    )
+
+class UserCache:
+    """Token subject -> user lookups: in-process LRU, then optionally Redis, then the database"""
+
+    def __init__(self):
+        self._local = TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: str) -> Optional[User]:
+        values = self._local.get(user_id)
+        if values is None and settings.USER_CACHE_REDIS_ENABLED:
+            try:
+                raw = await redis_client.get(_redis_key(user_id))
+            except Exception as e:
+                logger.warning(f"User cache Redis lookup failed: {e}")
+                raw = None
+            if raw:
+                values = json.loads(raw)
+                self._local.set(user_id, values)
+        
+        if values is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _deserialize(values)
+
+    async def set(self, user: User):
+        values = _serialize(user)
+        self._local.set(values["id"], values)
+        if settings.USER_CACHE_REDIS_ENABLED:
+            try:
+                await redis_client.set(
+                    _redis_key(values["id"]),
+                    json.dumps(values),
+                    ex=settings.USER_CACHE_REDIS_TTL_SECONDS
+                )
+            except Exception as e:
+                logger.warning(f"User cache Redis write failed: {e}")
+
+    async def invalidate(self, user_id: str):
+        """Drop a user after profile or status changes"""
+        self._local.delete(str(user_id))
+        if settings.USER_CACHE_REDIS_ENABLED:
+            try:
+                await redis_client.delete(_redis_key(str(user_id)))
+            except Exception as e:
+                logger.warning(f"User cache Redis invalidation failed: {e}")
+
+user_cache = UserCache()
@@ -0,0 +1,2 @@
+# Register every model so ORM relationships resolve in worker processes
+from app.models import user, dataset, analysis, pipeline, dashboard  # noqa: F401
@@ -0,0 +1,109 @@
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from celery.exceptions import SoftTimeLimitExceeded
+from sqlalchemy import update
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.database import SyncSessionLocal
+from app.models.analysis import AnalysisHistory, AnalysisStatus
+from app.models.dataset import Dataset
+from app.services.analysis import AnalysisEngine
+from app.services.analysis_jobs import CANCELLED_MESSAGE, AnalysisCancelled, JobProgress, stale_job_updates
+from app.services.result_cache import result_cache
+
+logger = logging.getLogger(__name__)
+
+@celery_app.task(
+    name="analysis.run",
+    soft_time_limit=settings.ANALYSIS_JOB_TIMEOUT_SECONDS,
+    # Hard kill for scans stuck in native code; the status endpoint fails those jobs
+    time_limit=settings.ANALYSIS_JOB_TIMEOUT_SECONDS + 30
+)
+def run_analysis_job(analysis_id: str):
+    """Run a queued analysis plan and store its results in the history row"""
+    with SyncSessionLocal() as db:
+        analysis = db.get(AnalysisHistory, analysis_id)
+        if analysis is None:
+            logger.warning(f"Analysis {analysis_id} no longer exists, skipping")
+            return
+        
+        # Claim the job; a job cancelled while queued is no longer pending, and one
+        # queued too long stopped counting toward its user's limit and is failed
+        started_at = datetime.now(timezone.utc)
+        queued_since = started_at - timedelta(seconds=settings.ANALYSIS_JOB_QUEUE_TIMEOUT_SECONDS)
+        claimed = db.execute(
+            update(AnalysisHistory)
+            .where(
+                AnalysisHistory.id == analysis.id,
+                AnalysisHistory.status == AnalysisStatus.PENDING,
+                AnalysisHistory.created_at >= queued_since
+            )
+            .values(
+                status=AnalysisStatus.RUNNING,
+                execution_plan={**analysis.execution_plan, "started_at": started_at.isoformat()}
+            )
+        ).rowcount
+        if not claimed:
+            for statement in stale_job_updates(AnalysisHistory.id == analysis.id):
+                db.execute(statement)
+        db.commit()
+        if not claimed:
+            return
+        
+        dataset = db.get(Dataset, analysis.dataset_id)
+        plan = analysis.execution_plan["plan"]
+        progress = JobProgress(analysis.id)
+        progress.publish("starting")
+        
+        start = time.perf_counter()
+        values = {}
+        cancelled = False
+        try:
+            outcome = result_cache.get(dataset, plan)
+            cache_status = "hit"
+            if outcome is None:
+                outcome = AnalysisEngine().execute(dataset, plan, progress=progress)
+                result_cache.set(dataset, plan, outcome)
+                cache_status = "miss"
+        except AnalysisCancelled:
+            # Recorded by the worker so the job holds its user's slot until it stops
+            cancelled = True
+        except SoftTimeLimitExceeded:
+            values["error_message"] = (
+                f"Analysis exceeded the {settings.ANALYSIS_JOB_TIMEOUT_SECONDS} second time limit"
+            )
+        except Exception as e:
+            logger.error(f"Analysis {analysis_id} failed: {e}")
+            values["error_message"] = str(e)
+        
+        values["execution_time"] = int((time.perf_counter() - start) * 1000)
+        if cancelled:
+            values["status"] = AnalysisStatus.ERROR
+            values["error_message"] = CANCELLED_MESSAGE
+            progress.publish("cancelled")
+        elif "error_message" in values:
+            values["status"] = AnalysisStatus.ERROR
+            progress.publish("failed")
+        else:
+            values["status"] = AnalysisStatus.COMPLETED
+            values["execution_plan"] = {
+                **analysis.execution_plan,
+                **outcome["execution_plan"],
+                "started_at": started_at.isoformat(),
+                "cache": cache_status
+            }
+            values["results"] = outcome["results"]
+            # A cancel that arrived after the last progress check came too late
+            values["error_message"] = None
+            progress.publish("completed")
+        
+        # Only a job still running is finished here, never one failed as stale meanwhile
+        db.execute(
+            update(AnalysisHistory)
+            .where(AnalysisHistory.id == analysis.id, AnalysisHistory.status == AnalysisStatus.RUNNING)
+            .values(**values)
+        )
+        db.commit()
@@ -0,0 +1,106 @@
+import logging
+
+from sqlalchemy import func, select
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.database import SyncSessionLocal, stored_object_lock
+from app.models.dataset import Dataset, DatasetStatus
+from app.services.file_service import FileService
+from app.services.materialization import MaterializationService
+from app.services.profiler import profile_csv, profile_dataset
+from app.services.row_index import RowIndexBuilder, row_index_object_name
+from app.services.schema_inference import iter_dataframe_chunks
+
+logger = logging.getLogger(__name__)
+
+# File types we know how to parse into tabular data
+INFERABLE_FILE_TYPES = {"csv", "text", "json", "xlsx"}
+
+# Line-oriented file types that get a byte-offset row index for paged previews
+ROW_INDEXED_FILE_TYPES = {"csv", "text"}
+
+@celery_app.task(name="datasets.infer_schema")
+def infer_dataset_schema(dataset_id: str):
+    """Stream a dataset from storage and profile it into schema_info"""
+    with SyncSessionLocal() as db:
+        dataset = db.get(Dataset, dataset_id)
+        if dataset is None:
+            logger.warning(f"Dataset {dataset_id} no longer exists, skipping schema inference")
+            return
+        
+        if dataset.file_type not in INFERABLE_FILE_TYPES:
+            dataset.status = DatasetStatus.READY
+            db.commit()
+            return
+        
+        dataset.status = DatasetStatus.PROCESSING
+        db.commit()
+        
+        try:
+            file_service = FileService()
+            with file_service.open_file(dataset.file_path) as stream:
+                indexer = None
+                if dataset.file_type in ROW_INDEXED_FILE_TYPES:
+                    # Build the preview row index in the same pass as profiling; its row
+                    # boundaries also split the file into ranges profiled in parallel
+                    indexer = RowIndexBuilder(stream, settings.ROW_INDEX_INTERVAL)
+                    schema = profile_csv(indexer)
+                else:
+                    schema = profile_dataset(iter_dataframe_chunks(stream, dataset.file_type))
+            
+            if indexer is not None:
+                file_service.put_cache_object(row_index_object_name(dataset.file_path), indexer.to_bytes())
+                schema["row_index"] = {"interval": indexer.interval, "entries": len(indexer.offsets)}
+        except Exception as e:
+            logger.error(f"Schema inference failed for dataset {dataset_id}: {e}")
+            dataset.status = DatasetStatus.ERROR
+            dataset.schema_info = {"error": str(e)}
+            db.commit()
+            return
+        
+        dataset.schema_info = schema
+        dataset.status = DatasetStatus.READY
+        db.commit()
+    
+    materialize_dataset.delay(dataset_id)
+
+@celery_app.task(name="datasets.materialize")
+def materialize_dataset(dataset_id: str):
+    """Write a typed Parquet copy of a profiled dataset to the cache bucket"""
+    with SyncSessionLocal() as db:
+        dataset = db.get(Dataset, dataset_id)
+        if dataset is None or dataset.status != DatasetStatus.READY:
+            return
+        
+        file_service = FileService()
+        try:
+            content_hash = MaterializationService(file_service).materialize(dataset)
+        except Exception as e:
+            # The raw file stays usable; analyses fall back to parsing it
+            logger.error(f"Materialization failed for dataset {dataset_id}: {e}")
+            return
+        
+        dataset.content_hash = content_hash
+        
+        # Uploads that bypassed the content-addressed path (multipart sessions) are
+        # deduplicated here, once their hash is known; the lock keeps the canonical
+        # object from being freed by a concurrent delete before this row points at it
+        db.execute(stored_object_lock(content_hash))
+        canonical_path = db.scalar(
+            select(Dataset.file_path).where(
+                Dataset.content_hash == content_hash,
+                Dataset.file_path != dataset.file_path
+            ).limit(1)
+        )
+        duplicate_path = None
+        if canonical_path:
+            duplicate_path, dataset.file_path = dataset.file_path, canonical_path
+        db.commit()
+        
+        if duplicate_path:
+            remaining = db.scalar(
+                select(func.count()).select_from(Dataset).where(Dataset.file_path == duplicate_path)
+            )
+            if not remaining:
+                file_service.remove_file_artifacts(duplicate_path)
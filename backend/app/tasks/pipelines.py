@@ -0,0 +1,81 @@
+import logging
+import time
+
+from celery.exceptions import SoftTimeLimitExceeded
+from sqlalchemy import update
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.database import SyncSessionLocal, stored_object_lock
+from app.models.dataset import Dataset, DatasetStatus
+from app.models.pipeline import PipelineRun, PipelineRunStatus, TransformationPipeline
+from app.services.pipeline import PipelineRunner
+
+logger = logging.getLogger(__name__)
+
+@celery_app.task(
+    name="pipelines.run",
+    soft_time_limit=settings.PIPELINE_RUN_TIMEOUT_SECONDS,
+    time_limit=settings.PIPELINE_RUN_TIMEOUT_SECONDS + 60
+)
+def run_pipeline(run_id: str):
+    """Execute a pipeline run and register its output as a new dataset"""
+    with SyncSessionLocal() as db:
+        run = db.get(PipelineRun, run_id)
+        if run is None:
+            logger.warning(f"Pipeline run {run_id} no longer exists, skipping")
+            return
+        
+        claimed = db.execute(
+            update(PipelineRun)
+            .where(PipelineRun.id == run.id, PipelineRun.status == PipelineRunStatus.PENDING)
+            .values(status=PipelineRunStatus.RUNNING)
+        ).rowcount
+        db.commit()
+        if not claimed:
+            return
+        
+        pipeline = db.get(TransformationPipeline, run.pipeline_id)
+        start = time.perf_counter()
+        try:
+            sources = [db.get(Dataset, dataset_id) for dataset_id in pipeline.source_datasets or []]
+            if not sources:
+                raise ValueError("Pipelines need at least one source dataset")
+            if any(source is None or source.status != DatasetStatus.READY for source in sources):
+                raise ValueError("Source dataset is missing or not ready")
+            # The output is stored content-addressed; hold its lock until the output row
+            # below is committed, so a delete of another copy cannot free the object first
+            outcome = PipelineRunner().run(
+                pipeline.steps or [],
+                pipeline.target_schema or {},
+                sources,
+                lock_object=lambda content_hash: db.execute(stored_object_lock(content_hash))
+            )
+        except SoftTimeLimitExceeded:
+            error_message = f"Pipeline run exceeded the {settings.PIPELINE_RUN_TIMEOUT_SECONDS} second time limit"
+        except Exception as e:
+            logger.error(f"Pipeline run {run_id} failed: {e}")
+            error_message = str(e)
+        else:
+            error_message = None
+        
+        run.execution_time = int((time.perf_counter() - start) * 1000)
+        if error_message:
+            run.status = PipelineRunStatus.ERROR
+            run.error_message = error_message
+            db.commit()
+            return
+        
+        output = Dataset(
+            user_id=pipeline.user_id,
+            name=run.stats.get("output_name") or f"{pipeline.name} output",
+            description=f"Output of pipeline {pipeline.name}",
+            status=DatasetStatus.READY,
+            **outcome["dataset"]
+        )
+        db.add(output)
+        db.flush()
+        run.output_dataset_id = output.id
+        run.stats = {**run.stats, **outcome["stats"]}
+        run.status = PipelineRunStatus.COMPLETED
+        db.commit()
@@ -0,0 +1,58 @@
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional
+
+# Recent latencies kept per operation for percentile estimates
+LATENCY_WINDOW = 1024
+
+class OperationMetrics:
+    """Per-operation call counts, errors and latency percentiles"""
+
+    def __init__(self, histogram=None, errors=None, labels: Optional[Dict[str, str]] = None):
+        # Optional Prometheus collectors every observation is mirrored to, labelled by operation
+        self._histogram = histogram
+        self._error_counter = errors
+        self._labels = labels or {}
+        self._lock = threading.Lock()
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._errors: Dict[str, int] = defaultdict(int)
+        self._total_seconds: Dict[str, float] = defaultdict(float)
+        self._recent: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self.waiting = 0
+        self.in_flight = 0
+
+    def observe(self, operation: str, seconds: float, error: bool = False):
+        with self._lock:
+            self._calls[operation] += 1
+            self._total_seconds[operation] += seconds
+            self._recent[operation].append(seconds)
+            if error:
+                self._errors[operation] += 1
+        if self._histogram is not None:
+            self._histogram.labels(operation=operation, **self._labels).observe(seconds)
+        if error and self._error_counter is not None:
+            self._error_counter.labels(operation=operation, **self._labels).inc()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            operations = {}
+            for operation, calls in self._calls.items():
+                recent = sorted(self._recent[operation])
+                operations[operation] = {
+                    "calls": calls,
+                    "errors": self._errors[operation],
+                    "avg_ms": round(self._total_seconds[operation] / calls * 1000, 3),
+                    "p50_ms": round(_percentile(recent, 0.50) * 1000, 3),
+                    "p95_ms": round(_percentile(recent, 0.95) * 1000, 3),
+                    "p99_ms": round(_percentile(recent, 0.99) * 1000, 3)
+                }
+            return {
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "operations": operations
+            }
+
+def _percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(int(len(values) * fraction), len(values) - 1)]
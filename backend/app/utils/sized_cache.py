@@ -0,0 +1,51 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+class SizedLRUCache:
+    """Thread-safe LRU cache of byte strings, evicting by total size rather than entry count"""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes or max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> bool:
+        """Store a value; returns False when it is too large to keep"""
+        if len(value) > self.max_entry_bytes:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+        return True
+
+    def delete(self, key: str):
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is not None:
+                self.size -= len(value)
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self.size -= len(self._entries.pop(key))
+        return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._entries)
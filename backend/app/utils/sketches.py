@@ -0,0 +1,192 @@
+# Fixed-size, mergeable summaries for profiling datasets in one streaming pass.
+# Each sketch is updated chunk by chunk and can be merged with a sketch of the
+# same kind, so partial profiles never require revisiting the data.
+import math
+import random
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+def hash_values(values: pd.Series) -> np.ndarray:
+    """Stable 64-bit hashes for a series of values"""
+    if values.dtype.kind in "iu":
+        # Integer columns with nulls arrive as float; hash both the same way
+        values = values.astype(np.float64)
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+class ReservoirSample:
+    """Uniform random sample of at most ``size`` values (Algorithm R)"""
+
+    def __init__(self, size: int = 20, seed: Optional[int] = None):
+        self.size = size
+        self.seen = 0
+        self.items: List[Any] = []
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: pd.Series):
+        start = 0
+        if len(self.items) < self.size:
+            start = min(self.size - len(self.items), len(values))
+            self.items.extend(values.iloc[:start].tolist())
+            self.seen += start
+        remaining = len(values) - start
+        if remaining <= 0:
+            return
+
+        # Value i replaces a random slot with probability size / i; draw all slots at once
+        positions = np.arange(self.seen + 1, self.seen + remaining + 1)
+        slots = (self._rng.random(remaining) * positions).astype(np.int64)
+        for offset in np.nonzero(slots < self.size)[0]:
+            self.items[slots[offset]] = values.iloc[start + offset]
+        self.seen += remaining
+
+    def merge(self, other: "ReservoirSample"):
+        total = self.seen + other.seen
+        if not other.seen:
+            return
+        if not self.seen:
+            self.items = list(other.items)
+        else:
+            # Draw from each side in proportion to the number of values it has seen
+            merged = []
+            mine = list(self._rng.permutation(np.array(self.items, dtype=object)))
+            theirs = list(self._rng.permutation(np.array(other.items, dtype=object)))
+            while len(merged) < self.size and (mine or theirs):
+                take_mine = mine and (not theirs or self._rng.random() < self.seen / total)
+                merged.append(mine.pop() if take_mine else theirs.pop())
+            self.items = merged
+        self.seen = total
+
+class HyperLogLog:
+    """Approximate distinct count with ~1.04/sqrt(2^precision) relative error"""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update_hashes(self, hashes: np.ndarray):
+        if not len(hashes):
+            return
+        shift = np.uint64(64 - self.precision)
+        index = (hashes >> shift).astype(np.int64)
+        remainder = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        # Rank = position of the leftmost 1-bit in the remaining bits
+        bits = np.zeros(len(remainder), dtype=np.int64)
+        nonzero = remainder > 0
+        bits[nonzero] = np.floor(np.log2(remainder[nonzero].astype(np.float64))).astype(np.int64) + 1
+        rank = (64 - self.precision) - bits + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def update(self, values: pd.Series):
+        self.update_hashes(hash_values(values))
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+class KLLQuantiles:
+    """KLL quantile sketch over numeric values with O(k log n) memory"""
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self.count = 0
+        self._random = random.Random(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLQuantiles"):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(self.levels[level])
+                if len(items) % 2:
+                    # Keep one item behind so the promoted half is exact
+                    self.levels[level], items = items[-1:], items[:-1]
+                else:
+                    self.levels[level] = np.empty(0, dtype=np.float64)
+                promoted = items[self._random.randint(0, 1)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def quantiles(self, fractions: List[float]) -> List[Optional[float]]:
+        if not self.count:
+            return [None for _ in fractions]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(values), 2 ** level, dtype=np.float64)
+            for level, values in enumerate(self.levels)
+        ])
+        order = np.argsort(items)
+        items, cumulative = items[order], np.cumsum(weights[order])
+        cumulative /= cumulative[-1]
+        positions = np.searchsorted(cumulative, fractions, side="left")
+        positions = np.clip(positions, 0, len(items) - 1)
+        return [float(items[position]) for position in positions]
+
+class TopK:
+    """Misra-Gries heavy hitters; counts are lower bounds within n/capacity"""
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counters: Dict[Any, int] = {}
+
+    def update(self, values: pd.Series):
+        counts = values.value_counts()
+        if len(counts) > self.capacity:
+            # Summarize the chunk first so only `capacity` entries reach the merge
+            threshold = counts.iloc[self.capacity]
+            counts = counts[counts > threshold] - threshold
+        for value, count in counts.items():
+            self.counters[value] = self.counters.get(value, 0) + int(count)
+        self._trim()
+
+    def merge(self, other: "TopK"):
+        for value, count in other.counters.items():
+            self.counters[value] = self.counters.get(value, 0) + count
+        self._trim()
+
+    def _trim(self):
+        if len(self.counters) <= self.capacity:
+            return
+        threshold = sorted(self.counters.values(), reverse=True)[self.capacity]
+        self.counters = {
+            value: count - threshold
+            for value, count in self.counters.items()
+            if count > threshold
+        }
+
+    def top(self, n: int) -> List[Dict[str, Any]]:
+        ranked = sorted(self.counters.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [{"value": value, "count": count} for value, count in ranked]
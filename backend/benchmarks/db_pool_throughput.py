@@ -0,0 +1,89 @@
+"""Database pool throughput benchmark
+
+Runs the same query from many concurrent tasks against engines built with
+different pool sizes and reports queries per second, latency and pool
+timeouts for each. Run it once per API process you plan to deploy; the total
+connections opened (workers x (pool size + overflow)) must stay below
+Postgres' max_connections.
+
+    python benchmarks/db_pool_throughput.py --pool-sizes 5,10,20,40 --concurrency 100
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from stats import describe
+
+async def client(engine, query: str, stop: asyncio.Event, results: dict):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text(query))
+        except PoolTimeout:
+            results["timeouts"] += 1
+            continue
+        results["latencies"].append(time.perf_counter() - start)
+
+async def measure(url: str, pool_size: int, args: argparse.Namespace):
+    engine = create_async_engine(
+        url,
+        pool_size=pool_size,
+        max_overflow=args.max_overflow,
+        pool_timeout=args.pool_timeout,
+        pool_pre_ping=True,
+        connect_args={"statement_cache_size": args.statement_cache_size}
+    )
+    # Open the pool before timing so connection setup is not counted
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+    stop = asyncio.Event()
+    results = {"latencies": [], "timeouts": 0}
+    tasks = [
+        asyncio.create_task(client(engine, args.query, stop, results))
+        for _ in range(args.concurrency)
+    ]
+    started = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+
+    print(
+        f"pool_size={pool_size:<4} max_overflow={args.max_overflow:<4} "
+        f"throughput={len(results['latencies']) / elapsed:8.1f} q/s "
+        f"timeouts={results['timeouts']}"
+    )
+    describe(f"  pool_size={pool_size}", results["latencies"])
+
+async def run(args: argparse.Namespace):
+    url = args.database_url.replace("postgresql://", "postgresql+asyncpg://")
+    print(f"concurrency={args.concurrency} duration={args.duration}s query={args.query!r}")
+    for pool_size in [int(size) for size in args.pool_sizes.split(",")]:
+        await measure(url, pool_size, args)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--pool-sizes", default="5,10,20,40")
+    parser.add_argument("--max-overflow", type=int, default=0)
+    parser.add_argument("--pool-timeout", type=float, default=5.0)
+    parser.add_argument("--statement-cache-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=15.0)
+    # A short server-side wait stands in for a typical indexed lookup
+    parser.add_argument("--query", default="SELECT pg_sleep(0.005)")
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
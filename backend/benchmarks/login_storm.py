@@ -0,0 +1,87 @@
+"""Login storm benchmark
+
+Measures login throughput and the latency of a cheap endpoint (/health) while
+many clients log in at once. With password hashing on the event loop the probe
+latency grows with the number of concurrent logins; with the hashing pool it
+should stay close to the idle baseline.
+
+    python benchmarks/login_storm.py --email admin@example.com --password secret
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+
+from stats import describe
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> List[float]:
+    """Hit /health at a steady rate and record each response time"""
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+async def login_worker(client: httpx.AsyncClient, stop: asyncio.Event, credentials: dict, results: dict):
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.post("/api/v1/auth/login", json=credentials)
+        elapsed = time.perf_counter() - start
+        if response.status_code == 200:
+            results["latencies"].append(elapsed)
+        else:
+            results["statuses"][response.status_code] = results["statuses"].get(response.status_code, 0) + 1
+
+async def run(args: argparse.Namespace):
+    credentials = {"email": args.email, "password": args.password}
+    limits = httpx.Limits(max_connections=args.concurrency + 4)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60.0) as client:
+        # Idle baseline for the probe endpoint
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, stop, args.probe_interval))
+        await asyncio.sleep(min(args.duration, 5))
+        stop.set()
+        baseline = await probe_task
+
+        stop = asyncio.Event()
+        results = {"latencies": [], "statuses": {}}
+        probe_task = asyncio.create_task(probe(client, stop, args.probe_interval))
+        workers = [
+            asyncio.create_task(login_worker(client, stop, credentials, results))
+            for _ in range(args.concurrency)
+        ]
+        started = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*workers)
+        elapsed = time.perf_counter() - started
+        during_storm = await probe_task
+
+    print(f"concurrency={args.concurrency} duration={elapsed:.1f}s")
+    print(f"login throughput         {len(results['latencies']) / elapsed:.1f} req/s")
+    if results["statuses"]:
+        print(f"non-200 responses        {results['statuses']}")
+    describe("login", results["latencies"])
+    describe("/health idle", baseline)
+    describe("/health during storm", during_storm)
+    if baseline and during_storm:
+        slowdown = statistics.median(during_storm) / statistics.median(baseline)
+        print(f"/health median slowdown  {slowdown:.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Partitioned execution scaling benchmark
+
+Profiles a CSV file and aggregates its Parquet copy with 1 to N worker
+processes. The data is a synthetic multi-million-row version of
+sample_data.csv: its categories, products and regions, with random dates,
+amounts and quantities. Files are written to a temporary directory and read
+from local disk, so no MinIO is needed.
+
+    python benchmarks/parallel_scaling.py --rows 5000000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pyarrow.csv as pcsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from app.core.config import settings
+from app.services.analysis import PartialAggregate, aggregate_row_groups
+from app.services.parallel import shutdown_partition_pool
+from app.services.profiler import profile_csv
+from app.services.row_index import RowIndexBuilder
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "sample_data.csv")
+
+# Rows generated per write, to keep the generator's memory flat
+GENERATE_CHUNK_ROWS = 500000
+
+def generate_csv(path: str, rows: int, seed: int = 0):
+    """Write rows drawn from sample_data.csv's value sets"""
+    sample = pd.read_csv(SAMPLE_PATH)
+    date, product, category, amount, quantity, region = sample.columns
+    pairs = sample[[product, category]].drop_duplicates().to_numpy()
+    regions = sample[region].unique()
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2020-01-01")
+
+    with open(path, "w", encoding="utf-8") as stream:
+        for offset in range(0, rows, GENERATE_CHUNK_ROWS):
+            size = min(GENERATE_CHUNK_ROWS, rows - offset)
+            picked = pairs[rng.integers(len(pairs), size=size)]
+            chunk = pd.DataFrame({
+                date: (start + rng.integers(0, 1500, size=size)).astype(str),
+                product: picked[:, 0],
+                category: picked[:, 1],
+                amount: rng.integers(1000, 500000, size=size),
+                quantity: rng.integers(1, 200, size=size),
+                region: regions[rng.integers(len(regions), size=size)]
+            })
+            chunk.to_csv(stream, index=False, header=offset == 0)
+
+def write_parquet(csv_path: str, parquet_path: str):
+    table = pcsv.read_csv(csv_path)
+    pq.write_table(table, parquet_path, row_group_size=settings.PARQUET_ROW_GROUP_ROWS, compression="zstd")
+
+def profile(csv_path: str) -> Any:
+    with open(csv_path, "rb") as stream:
+        return profile_csv(RowIndexBuilder(stream, settings.ROW_INDEX_INTERVAL))
+
+def aggregate(parquet_path: str) -> Any:
+    source = ds.dataset(parquet_path, format="parquet")
+    category, amount, quantity, region = (source.schema.names[i] for i in (2, 3, 4, 5))
+    plan = PartialAggregate(
+        [category, region],
+        [{"function": "sum", "column": amount}, {"function": "mean", "column": quantity}, {"function": "count"}]
+    )
+    partials = [partial for partial, _ in aggregate_row_groups(source, plan, plan.input_columns, None)]
+    return plan.finalize(plan.merge(partials))
+
+def timed(func: Callable[[], Any], repeat: int) -> float:
+    # The first call also starts the worker processes
+    func()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--partition-mb", type=int, default=settings.PARALLEL_PARTITION_MB)
+    args = parser.parse_args()
+    settings.PARALLEL_PARTITION_MB = args.partition_mb
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "sample_data.csv")
+        parquet_path = os.path.join(directory, "sample_data.parquet")
+        generate_csv(csv_path, args.rows)
+        write_parquet(csv_path, parquet_path)
+        print(
+            f"rows={args.rows} csv={os.path.getsize(csv_path) / 1e6:.0f}MB "
+            f"parquet={os.path.getsize(parquet_path) / 1e6:.0f}MB cpus={os.cpu_count()}"
+        )
+
+        baseline: List[float] = []
+        for workers in sorted(set(args.workers)):
+            settings.PARALLEL_WORKERS = workers
+            results = [timed(lambda: profile(csv_path), args.repeat), timed(lambda: aggregate(parquet_path), args.repeat)]
+            baseline = baseline or results
+            print(
+                f"workers={workers:<3} "
+                f"profile={results[0]:7.2f}s ({baseline[0] / results[0]:4.1f}x) "
+                f"aggregate={results[1]:7.2f}s ({baseline[1] / results[1]:4.1f}x)"
+            )
+            shutdown_partition_pool()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Response serialization microbenchmark
+
+Times the dataset list and get responses two ways: FastAPI's default path
+(response_model validation, jsonable_encoder, stdlib json) and orm_response
+(field pick plus orjson). The datasets are synthetic stand-ins for ORM rows, with
+a schema_info shaped like the profiler's output, so no database is needed.
+
+    python benchmarks/serialization.py --columns 200 --rows 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.status import DatasetStatus
+from app.schemas.dataset import Dataset as DatasetSchema, DatasetSummary
+from app.utils.responses import orm_response
+
+def column_profile(index: int) -> dict:
+    return {
+        "type": "float",
+        "null_count": index,
+        "null_percentage": 0.5,
+        "unique_count": 1000 + index,
+        "distinct_count": 1000 + index,
+        "min": 0.0,
+        "max": 100.0 + index,
+        "mean": 50.0,
+        "std": 12.5,
+        "quantiles": {f"p{p}": float(p) for p in (5, 25, 50, 75, 95)},
+        "top_values": [{"value": str(value), "count": 100 - value} for value in range(10)],
+        "sample_values": [float(value) for value in range(20)]
+    }
+
+def make_dataset(columns: int) -> SimpleNamespace:
+    now = datetime.now(timezone.utc)
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        name="benchmark dataset",
+        description="synthetic",
+        file_path="objects/ab/abcdef",
+        file_size=123456789,
+        file_type="csv",
+        content_hash="ab" * 32,
+        schema_info={
+            "columns": {f"column_{index}": column_profile(index) for index in range(columns)},
+            "basic_stats": {"row_count": 1000000, "column_count": columns},
+            "data_quality": {"completeness": 0.99, "constant_columns": [], "candidate_keys": []}
+        },
+        metadata={},
+        status=DatasetStatus.READY,
+        created_at=now,
+        updated_at=now
+    )
+
+def timed(func: Callable[[], Any], iterations: int) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+def default_path(response_model, content) -> Callable[[], bytes]:
+    field = create_response_field(name="response", type_=response_model)
+    loop = asyncio.new_event_loop()
+
+    def render() -> bytes:
+        serialized = loop.run_until_complete(serialize_response(field=field, response_content=content))
+        return JSONResponse(serialized).body
+    return render
+
+def report(label: str, default: float, fast: float):
+    print(
+        f"{label:<10} default={default * 1000:9.3f}ms "
+        f"orjson={fast * 1000:9.3f}ms speedup={default / fast:5.1f}x"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--columns", type=int, default=200, help="Columns in each dataset's schema_info")
+    parser.add_argument("--rows", type=int, default=50, help="Datasets in the list response")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    datasets: List[SimpleNamespace] = [make_dataset(args.columns) for _ in range(args.rows)]
+    dataset = datasets[0]
+    print(f"columns={args.columns} rows={args.rows} iterations={args.iterations}")
+
+    report(
+        "get",
+        timed(default_path(DatasetSchema, dataset), args.iterations),
+        timed(lambda: orm_response(dataset, DatasetSchema).body, args.iterations)
+    )
+    report(
+        "list",
+        timed(default_path(List[DatasetSummary], datasets), args.iterations),
+        timed(lambda: orm_response(datasets, DatasetSummary).body, args.iterations)
+    )
+
+if __name__ == "__main__":
+    main()
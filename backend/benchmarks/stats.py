@@ -0,0 +1,18 @@
+from typing import List
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def describe(label: str, latencies: List[float]):
+    """Print latency percentiles for a list of durations in seconds"""
+    millis = [value * 1000 for value in latencies]
+    print(
+        f"{label:<24} n={len(millis):<6} "
+        f"p50={percentile(millis, 0.50):7.1f}ms "
+        f"p95={percentile(millis, 0.95):7.1f}ms "
+        f"p99={percentile(millis, 0.99):7.1f}ms "
+        f"max={max(millis, default=0.0):7.1f}ms"
+    )
@@ -23,6 +23,7 @@ CREATE TABLE datasets (
     file_path VARCHAR(500),
     file_size INTEGER,
     file_type VARCHAR(50),
+    content_hash VARCHAR(64),
     schema_info JSONB DEFAULT '{}',
     metadata JSONB DEFAULT '{}',
     status VARCHAR(20) DEFAULT 'uploaded' CHECK (status IN ('uploaded', 'processing', 'ready', 'error')),
@@ -59,6 +60,19 @@ CREATE TABLE transformation_pipelines (
     updated_at TIMESTAMP DEFAULT NOW()
 );
 
+-- Create pipeline_runs table
+CREATE TABLE pipeline_runs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    pipeline_id UUID REFERENCES transformation_pipelines(id) ON DELETE CASCADE,
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    output_dataset_id UUID REFERENCES datasets(id) ON DELETE SET NULL,
+    status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'completed', 'error')),
+    stats JSONB DEFAULT '{}',
+    execution_time INTEGER, -- milliseconds
+    error_message TEXT,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
 -- Create dashboards table
 CREATE TABLE dashboards (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -83,12 +97,15 @@ CREATE TABLE user_sessions (
 );
 
 -- Create indexes for performance
-CREATE INDEX idx_datasets_user_id ON datasets(user_id);
+CREATE INDEX idx_datasets_user_created ON datasets(user_id, created_at, id);
+CREATE INDEX idx_datasets_user_status_created ON datasets(user_id, status, created_at, id);
 CREATE INDEX idx_datasets_status ON datasets(status);
+CREATE INDEX idx_datasets_content_hash ON datasets(content_hash);
 CREATE INDEX idx_analysis_history_user_id ON analysis_history(user_id);
 CREATE INDEX idx_analysis_history_dataset_id ON analysis_history(dataset_id);
 CREATE INDEX idx_analysis_history_created_at ON analysis_history(created_at);
 CREATE INDEX idx_transformation_pipelines_user_id ON transformation_pipelines(user_id);
+CREATE INDEX idx_pipeline_runs_pipeline_created ON pipeline_runs(pipeline_id, created_at);
 CREATE INDEX idx_dashboards_user_id ON dashboards(user_id);
 CREATE INDEX idx_user_sessions_user_id ON user_sessions(user_id);
 